@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Quote Rendering Throughput Benchmark
+====================================
+
+Renders synthetic campaign quotes against the catalog and reports
+documents per second for a single process and for process pools.
+
+Usage:
+    python3 scripts/benchmarks/bench_quote_render.py [--count 20000] [--format html]
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+
+DEFAULT_DB_PATH = "src/data/products.json"
+
+
+def synthetic_quotes(product_ids, count, seed=7):
+    rng = random.Random(seed)
+    quotes = []
+    for _ in range(count):
+        guests = rng.randint(1, 8)
+        vehicle_rate = rng.choice([250, 400, 650])
+        pickup_rate = rng.choice([0, 50, 75])
+        attractions = rng.choice([0, 0, 149, 298.5])
+        total = vehicle_rate + pickup_rate + attractions
+        quotes.append({
+            'tourType': rng.choice(['Dubai City Tour', 'Abu Dhabi City Tour', 'Desert Safari']),
+            'vehicle': rng.choice(['Sedan', 'SUV', 'Van']),
+            'zone': rng.choice('ABC'),
+            'zoneName': rng.choice(['Marina', 'Downtown', '']),
+            'guests': guests,
+            'vehicleRate': vehicle_rate,
+            'pickupRate': pickup_rate,
+            'attractionsCost': attractions,
+            'total': total,
+            'perPerson': total / guests,
+            'products': rng.sample(product_ids, k=min(len(product_ids), rng.randint(0, 3))),
+        })
+    return quotes
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Quote rendering throughput benchmark')
+    parser.add_argument('--db-path', default=DEFAULT_DB_PATH)
+    parser.add_argument('--count', type=int, default=20000)
+    parser.add_argument('--format', choices=['text', 'html'], default='html')
+    parser.add_argument('--workers', type=int, nargs='*', default=[1, 2, 4])
+    args = parser.parse_args()
+
+    manager = CatalogManager(db_path=os.path.join(project_root, args.db_path))
+    product_ids = sorted(p['product_id'] for p in manager.query()['items'])
+    quotes = synthetic_quotes(product_ids, args.count)
+    print(f"📦 {len(product_ids)} products, {args.count} quotes, format={args.format}")
+
+    for workers in args.workers:
+        started = time.perf_counter()
+        size = sum(len(doc) for doc in manager.render_quotes(quotes, fmt=args.format, workers=workers))
+        elapsed = time.perf_counter() - started
+        print(f"  workers={workers:<3d} {args.count / elapsed:>10,.0f} quotes/s  "
+              f"{size / elapsed / 1e6:>7.1f} MB/s")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -7,9 +7,15 @@ A single entry point for all catalog administrative operations.
 
 Usage:
     python3 manage.py ingest --file <path>
-    python3 manage.py stats
+    python3 manage.py stats [--prices] [--recompute]
     python3 manage.py backup
     python3 manage.py nuke
+    python3 manage.py render-quotes --file <path> --out-dir <dir>
+    python3 manage.py expire [--date YYYY-MM-DD] [--dry-run]
+    python3 manage.py patch --where <json> --set <json> [--dry-run]
+    python3 manage.py delete <product_id>... [--compact]
+    python3 manage.py rollback --batch <id> [--skip-conflicts] [--dry-run]
+    python3 manage.py serve [--host HOST] [--port PORT] [--workers N] [--allow-writes]
 
 Author: Senior Systems Engineer
 Version: 1.0.0
@@ -19,6 +25,9 @@ import sys
 import os
 import json
 import argparse
+import re
+import time
+import glob
 from datetime import datetime
 from pathlib import Path
 from typing import List, Dict, Any
@@ -30,7 +39,7 @@ try:
     from backend.lib.catalog_manager import CatalogManager, ValidationError
 except ImportError as e:
     print(f"ERROR: Failed to import CatalogManager: {e}", file=sys.stderr)
-    print("Ensure 'pydantic' is installed: pip install pydantic", file=sys.stderr)
+    print("Ensure dependencies are installed: pip install -r requirements.txt", file=sys.stderr)
     sys.exit(1)
 
 
@@ -74,6 +83,8 @@ class CatalogCLI:
             count = self.manager.upsert_batch(data)
             
             print(f"✅ Successfully ingested {count} products from {os.path.basename(file_path)}")
+            if self.manager.last_batch_id:
+                print(f"↩️  Batch id: {self.manager.last_batch_id} (undo with: rollback --batch {self.manager.last_batch_id})")
             return 0
             
         except ValidationError as e:
@@ -137,12 +148,19 @@ class CatalogCLI:
                     )
         return products
     
-    def stats(self) -> int:
+    def stats(self, prices: bool = False, recompute: bool = False) -> int:
         """
         Display catalog statistics.
         
+        Counts come from the stats sidecar, which every commit updates, so
+        the catalog is not parsed unless price analytics are requested.
+        
+        Args:
+            prices: Also show from-price ranges and a duration histogram
+            recompute: Recount from the catalog and verify the sidecar
+            
         Returns:
-            Exit code (0 for success, 1 for error)
+            Exit code (0 for success, 1 for error or sidecar drift)
         """
         try:
             if not os.path.exists(self.db_path):
@@ -153,14 +171,20 @@ class CatalogCLI:
                 print("\nRun 'python3 manage.py ingest --file <path>' to create it.")
                 return 1
             
-            data = self.manager._load_data()
+            differences = []
+            if recompute:
+                result = self.manager.recompute_stats()
+                counts, differences = result['stats'], result['differences']
+            else:
+                counts = self.manager.catalog_stats()
+            total = counts['total']
             
             print("\n📊 Catalog Statistics")
             print("=" * 60)
             
-            print(f"Total Products:      {len(data)}")
+            print(f"Total Products:      {total}")
             
-            if len(data) == 0:
+            if total == 0:
                 print("\nNo products in catalog.")
                 return 0
             
@@ -171,51 +195,51 @@ class CatalogCLI:
             file_size = os.path.getsize(self.db_path)
             print(f"Database Size:       {self._format_bytes(file_size)}")
             
-            categories = {}
-            cities = {}
-            suppliers = {}
-            active_count = 0
+            print(f"Active Products:     {counts['active']}")
+            print(f"Inactive Products:   {counts['inactive']}")
             
-            for product in data:
-                if product.get('active', True):
-                    active_count += 1
-                
-                cat = product.get('category') or 'Uncategorized'
-                categories[cat] = categories.get(cat, 0) + 1
-                
-                city = product.get('destination_city') or 'Unknown'
-                cities[city] = cities.get(city, 0) + 1
-                
-                supplier = product.get('supplier_name') or 'Unknown'
-                suppliers[supplier] = suppliers.get(supplier, 0) + 1
-            
-            print(f"Active Products:     {active_count}")
-            print(f"Inactive Products:   {len(data) - active_count}")
+            groups = counts['groups']
+            if prices:
+                summary = self.manager.catalog_summary()
+                if summary['priced']:
+                    print(f"From Price (AED):    {self._price_range(summary)}  (min / median / max)")
+                groups = {field: self.manager.group_stats(field) for field in groups}
             
             print("\n📁 By Category:")
-            for cat, count in sorted(categories.items(), key=lambda x: x[1], reverse=True):
-                percentage = (count / len(data)) * 100
-                print(f"  {cat:20s} {count:3d} ({percentage:5.1f}%)")
+            self._print_groups(groups['category'], 'Uncategorized', total, width=20)
             
             print("\n🌍 By Destination:")
-            for city, count in sorted(cities.items(), key=lambda x: x[1], reverse=True)[:5]:
-                percentage = (count / len(data)) * 100
-                print(f"  {city:20s} {count:3d} ({percentage:5.1f}%)")
+            self._print_groups(groups['destination_city'], 'Unknown', total, width=20, limit=5)
             
             print("\n🏢 Top Suppliers:")
-            for supplier, count in sorted(suppliers.items(), key=lambda x: x[1], reverse=True)[:5]:
-                percentage = (count / len(data)) * 100
-                print(f"  {supplier:30s} {count:3d} ({percentage:5.1f}%)")
+            self._print_groups(groups['supplier_name'], 'Unknown', total, width=30, limit=5)
+            
+            if prices:
+                histogram = self.manager.duration_histogram()
+                peak = max(histogram['counts']) or 1
+                print("\n⏱️  By Duration:")
+                for label, count in zip(histogram['bins'], histogram['counts']):
+                    print(f"  {label:8s} {count:4d} {'█' * round(20 * count / peak)}")
+                if histogram['unknown']:
+                    print(f"  {'unknown':8s} {histogram['unknown']:4d}")
             
             backup_dir = os.path.join(os.path.dirname(self.db_path), 'backups')
             if os.path.exists(backup_dir):
                 backups = [f for f in os.listdir(backup_dir) if f.startswith('products_')]
                 print(f"\n💾 Backups Available: {len(backups)}")
             
+            if recompute:
+                if differences:
+                    print(f"\n⚠️  Stats sidecar was out of date ({len(differences)} differences, rewritten):")
+                    for difference in differences[:10]:
+                        print(f"  {difference}  (sidecar != recount)")
+                else:
+                    print("\n✅ Stats sidecar matches a full recount")
+            
             print("=" * 60)
             print()
             
-            return 0
+            return 1 if differences else 0
             
         except Exception as e:
             print(f"ERROR: Failed to retrieve statistics:", file=sys.stderr)
@@ -291,6 +315,14 @@ class CatalogCLI:
                 os.remove(lock_path)
                 print(f"🔓 Lock file removed: {lock_path}")
             
+            removed = 0
+            for path in self._derived_files():
+                if os.path.exists(path):
+                    os.remove(path)
+                    removed += 1
+            if removed:
+                print(f"🧹 Removed {removed} derived file(s) (indexes, meta, image, price history, tombstones, undo log, index journal)")
+            
             return 0
             
         except Exception as e:
@@ -298,6 +330,20 @@ class CatalogCLI:
             print(f"  {str(e)}", file=sys.stderr)
             return 1
     
+    def _derived_files(self) -> List[str]:
+        """Files the manager keeps next to the database, which describe it
+        and are meaningless once it is gone."""
+        manager = self.manager
+        return [
+            manager.meta_path,
+            manager.image_path,
+            manager.prices.keys_path,
+            manager.prices.rows_path,
+            manager.tombstone_path,
+            manager.undo.path,
+            manager.journal.path,
+        ] + glob.glob(f"{glob.escape(self.db_path)}.*.idx")
+    
     def list_backups(self) -> int:
         """
         List all available backups.
@@ -340,6 +386,335 @@ class CatalogCLI:
             print(f"  {str(e)}", file=sys.stderr)
             return 1
     
+    def render_quotes(self, file_path: str, out_dir: str, fmt: str = 'text', workers: int = 1) -> int:
+        """
+        Render quote documents from a JSON or JSONL file of QuoteData objects.
+        
+        Each quote is written to its own file as soon as it is rendered,
+        named after its "id" field or its position in the input.
+        
+        Args:
+            file_path: Path to the quotes file
+            out_dir: Directory for the rendered documents
+            fmt: Output format ('text' or 'html')
+            workers: Number of renderer processes
+            
+        Returns:
+            Exit code (0 for success, 1 for error)
+        """
+        if not os.path.exists(file_path):
+            print(f"ERROR: File not found: {file_path}", file=sys.stderr)
+            return 1
+        
+        try:
+            quotes = self._parse_file(file_path)
+            os.makedirs(out_dir, exist_ok=True)
+            extension = 'html' if fmt == 'html' else 'txt'
+            
+            print(f"🧾 Rendering {len(quotes)} quote(s) as {fmt} with {workers} worker(s)...")
+            started = time.perf_counter()
+            
+            count = 0
+            for idx, document in enumerate(self.manager.render_quotes(quotes, fmt=fmt, workers=workers)):
+                name = self._safe_filename(str(quotes[idx].get('id') or f"quote-{idx + 1:05d}"))
+                with open(os.path.join(out_dir, f"{name}.{extension}"), 'w', encoding='utf-8') as f:
+                    f.write(document)
+                count += 1
+            
+            elapsed = time.perf_counter() - started
+            rate = count / elapsed if elapsed > 0 else float('inf')
+            print(f"✅ Rendered {count} quote(s) to {out_dir} in {elapsed:.2f}s ({rate:,.0f} quotes/s)")
+            return 0
+            
+        except json.JSONDecodeError as e:
+            print(f"ERROR: Invalid JSON format in {file_path}:", file=sys.stderr)
+            print(f"  Line {e.lineno}, Column {e.colno}: {e.msg}", file=sys.stderr)
+            return 1
+        except Exception as e:
+            print(f"ERROR: Failed to render quotes:", file=sys.stderr)
+            print(f"  {str(e)}", file=sys.stderr)
+            return 1
+    
+    def expire(self, day: str = None, dry_run: bool = False) -> int:
+        """
+        Deactivate products whose every pricing tier has passed validity_end.
+        
+        Args:
+            day: Expire relative to this date (YYYY-MM-DD, default: today)
+            dry_run: List the products that are due without changing anything
+            
+        Returns:
+            Exit code (0 for success, 1 for error)
+        """
+        try:
+            if not os.path.exists(self.db_path):
+                print("ERROR: Database does not exist. Nothing to expire.", file=sys.stderr)
+                return 1
+            
+            print(f"⏰ Checking for expired products{' (dry run)' if dry_run else ''}...")
+            expired = self.manager.expire(day, dry_run=dry_run)
+            
+            for product_id in expired[:20]:
+                print(f"  • {product_id}")
+            if len(expired) > 20:
+                print(f"  ... and {len(expired) - 20} more")
+            
+            if not expired:
+                print("✅ No products are due to expire")
+            elif dry_run:
+                print(f"📋 {len(expired)} product(s) would be deactivated")
+            else:
+                print(f"✅ Deactivated {len(expired)} expired product(s)")
+            
+            next_expiry = self.manager.get_index('expiry').next_expiry()
+            if next_expiry:
+                print(f"📅 Next expiry: {next_expiry}")
+            return 0
+            
+        except BlockingIOError:
+            print(f"ERROR: Database is locked by another process", file=sys.stderr)
+            print(f"  Please wait 30 seconds and try again", file=sys.stderr)
+            return 1
+        except Exception as e:
+            print(f"ERROR: Failed to expire products:", file=sys.stderr)
+            print(f"  {str(e)}", file=sys.stderr)
+            return 1
+    
+    def patch(self, where: str, changes: str, dry_run: bool = False) -> int:
+        """
+        Apply a partial update to every product matching a filter.
+        
+        Args:
+            where: JSON filter in query syntax, e.g. '{"supplier_name": "Emaar"}'
+            changes: JSON object of fields to set, e.g. '{"active": false}'
+            dry_run: Report matches without writing
+            
+        Returns:
+            Exit code (0 for success, 1 for error)
+        """
+        try:
+            if not os.path.exists(self.db_path):
+                print("ERROR: Database does not exist. Nothing to patch.", file=sys.stderr)
+                return 1
+            
+            try:
+                where_filter = json.loads(where)
+                field_changes = json.loads(changes)
+            except json.JSONDecodeError as e:
+                print(f"ERROR: --where and --set must be JSON objects: {e.msg}", file=sys.stderr)
+                return 1
+            
+            print(f"🩹 Patching {', '.join(sorted(field_changes))} where {where}{' (dry run)' if dry_run else ''}...")
+            result = self.manager.patch_where(where_filter, field_changes, dry_run=dry_run)
+            
+            print(f"  Matched:  {result['matched']}")
+            if dry_run:
+                print(f"📋 {result['updated']} product(s) would change")
+            elif result['updated']:
+                print(f"✅ Updated {result['updated']} product(s) in one write")
+            else:
+                print("✅ Matching products already have these values")
+            return 0
+            
+        except ValidationError as e:
+            print(f"ERROR: Validation failed for patch:", file=sys.stderr)
+            print(f"  {str(e)}", file=sys.stderr)
+            return 1
+        except BlockingIOError:
+            print(f"ERROR: Database is locked by another process", file=sys.stderr)
+            print(f"  Please wait 30 seconds and try again", file=sys.stderr)
+            return 1
+        except Exception as e:
+            print(f"ERROR: Failed to patch products:", file=sys.stderr)
+            print(f"  {str(e)}", file=sys.stderr)
+            return 1
+    
+    def delete(self, product_ids: List[str], compact: bool = False) -> int:
+        """
+        Delete products by id (tombstoned until the next snapshot rewrite).
+        
+        Args:
+            product_ids: Ids of the products to delete
+            compact: Rewrite the snapshot now to drop tombstoned records
+            
+        Returns:
+            Exit code (0 for success, 1 for error)
+        """
+        try:
+            if not os.path.exists(self.db_path):
+                print("ERROR: Database does not exist. Nothing to delete.", file=sys.stderr)
+                return 1
+            
+            print(f"🗑️  Deleting {len(product_ids)} product(s)...")
+            deleted = self.manager.delete(product_ids)
+            
+            missing = sorted(set(product_ids) - set(deleted))
+            for product_id in missing:
+                print(f"  ⚠️  Not found: {product_id}")
+            print(f"✅ Deleted {len(deleted)} product(s)")
+            
+            if compact:
+                print("🧹 Compacting catalog...")
+                dropped = self.manager.compact()
+                print(f"✅ Dropped {dropped} tombstoned record(s) from the snapshot")
+            return 0
+            
+        except BlockingIOError:
+            print(f"ERROR: Database is locked by another process", file=sys.stderr)
+            print(f"  Please wait 30 seconds and try again", file=sys.stderr)
+            return 1
+        except Exception as e:
+            print(f"ERROR: Failed to delete products:", file=sys.stderr)
+            print(f"  {str(e)}", file=sys.stderr)
+            return 1
+    
+    def rollback(self, batch_id: str = None, skip_conflicts: bool = False,
+                 dry_run: bool = False, list_batches: bool = False) -> int:
+        """
+        Undo one ingest/patch batch, restoring only the records it touched.
+        
+        Args:
+            batch_id: Id of the batch to roll back (printed by ingest)
+            skip_conflicts: Restore the other records when some were modified later
+            dry_run: Report what would be restored without writing
+            list_batches: List recent batches instead of rolling back
+            
+        Returns:
+            Exit code (0 for success, 1 for error)
+        """
+        try:
+            if list_batches:
+                batches = self.manager.undo.batches(limit=20)
+                print(f"↩️  Recent Batches ({len(batches)} shown)")
+                print("=" * 80)
+                print(f"{'Batch':<36} {'Committed':<22} {'Products':>8}")
+                print("-" * 80)
+                for batch in batches:
+                    committed = datetime.fromtimestamp(batch['committed_at']).strftime('%Y-%m-%d %H:%M:%S')
+                    print(f"{batch['batch']:<36} {committed:<22} {batch['products']:>8}")
+                print("=" * 80)
+                return 0
+            
+            if not batch_id:
+                print("ERROR: --batch is required (use --list to see recent batches)", file=sys.stderr)
+                return 1
+            
+            print(f"↩️  Rolling back batch {batch_id}{' (dry run)' if dry_run else ''}...")
+            result = self.manager.rollback(batch_id, skip_conflicts=skip_conflicts, dry_run=dry_run)
+            
+            for product_id in result['conflicts'][:20]:
+                print(f"  ⚠️  Modified since the batch: {product_id}")
+            if len(result['conflicts']) > 20:
+                print(f"  ... and {len(result['conflicts']) - 20} more")
+            
+            if result['conflicts'] and not skip_conflicts:
+                print(f"ERROR: {len(result['conflicts'])} product(s) changed after this batch; nothing was restored", file=sys.stderr)
+                print(f"  Re-run with --skip-conflicts to restore the others", file=sys.stderr)
+                return 1
+            if dry_run:
+                print(f"📋 {len(result['restored'])} product(s) would be restored")
+            elif result['restored']:
+                print(f"✅ Restored {len(result['restored'])} product(s)")
+                print(f"↩️  Rollback batch id: {result['rollback_batch']}")
+            else:
+                print("✅ Nothing to restore")
+            return 0
+            
+        except BlockingIOError:
+            print(f"ERROR: Database is locked by another process", file=sys.stderr)
+            print(f"  Please wait 30 seconds and try again", file=sys.stderr)
+            return 1
+        except Exception as e:
+            print(f"ERROR: Failed to roll back batch:", file=sys.stderr)
+            print(f"  {str(e)}", file=sys.stderr)
+            return 1
+    
+    def serve(self, host: str = None, port: int = None, access_log: bool = False,
+              workers: int = 1, allow_writes: bool = False) -> int:
+        """
+        Serve the HTTP API until interrupted.
+        
+        Args:
+            host: Interface to bind (default: API_HOST)
+            port: Port to bind (default: API_PORT)
+            access_log: Log every request to stderr
+            workers: Worker processes; more than one serve from a shared
+                     memory-mapped catalog image
+            allow_writes: Accept NDJSON uploads on POST /products/bulk
+            
+        Returns:
+            Exit code (0 for success, 1 for error)
+        """
+        try:
+            from backend.api import create_app
+            from backend.api.app import make_server, prepare_image, serve_workers
+            from backend.config import API_HOST, API_PORT
+            
+            if allow_writes:
+                if not os.getenv('API_SECRET_KEY'):
+                    print("❌ ERROR: --allow-writes needs API_SECRET_KEY to be set", file=sys.stderr)
+                    return 1
+                print("✍️  Bulk writes enabled: POST /products/bulk with 'Authorization: Bearer $API_SECRET_KEY'")
+            
+            if workers > 1:
+                image_path, generation = prepare_image(self.db_path)
+                server = make_server(None, host or API_HOST, port or API_PORT)
+                server.access_log = access_log
+                bound_host, bound_port = server.server_address[:2]
+                print(f"🗺️  Catalog image: {image_path} (generation {generation}, "
+                      f"{os.path.getsize(image_path):,} bytes, rebuilt on every commit)")
+                print(f"🌐 Serving {self.db_path} on http://{bound_host}:{bound_port} "
+                      f"with {workers} workers (Ctrl+C to stop)")
+                try:
+                    serve_workers(server, lambda: create_app(self.db_path, image=True, writable=allow_writes), workers)
+                finally:
+                    server.server_close()
+                return 0
+            
+            app = create_app(self.db_path, writable=allow_writes)
+            server = make_server(app, host or API_HOST, port or API_PORT)
+            server.access_log = access_log
+            bound_host, bound_port = server.server_address[:2]
+            print(f"🌐 Serving {self.db_path} on http://{bound_host}:{bound_port} (Ctrl+C to stop)")
+            print(f"🔄 Reloading automatically when the catalog changes (generation {app.holder.current.generation})")
+            app.start()
+            try:
+                server.serve_forever()
+            finally:
+                app.stop()
+                server.server_close()
+            return 0
+            
+        except BlockingIOError:
+            print(f"ERROR: Database is locked by another process", file=sys.stderr)
+            print(f"  Please wait 30 seconds and try again", file=sys.stderr)
+            return 1
+        except (OSError, ValueError) as e:
+            print(f"ERROR: Failed to start server:", file=sys.stderr)
+            print(f"  {str(e)}", file=sys.stderr)
+            return 1
+    
+    @staticmethod
+    def _safe_filename(name: str) -> str:
+        """Reduce a quote id to a safe file name."""
+        return re.sub(r'[^A-Za-z0-9._-]+', '_', name).strip('._') or 'quote'
+    
+    def _print_groups(self, groups: List[Dict[str, Any]], missing_label: str, total: int, width: int,
+                      limit: int = None):
+        """Print per-value counts, with from-price ranges when the groups carry them."""
+        for group in groups[:limit]:
+            label = group['value'] or missing_label
+            percentage = (group['count'] / total) * 100
+            line = f"  {label:{width}s} {group['count']:3d} ({percentage:5.1f}%)"
+            if group.get('min_price') is not None:
+                line += f"  AED {self._price_range(group)}"
+            print(line)
+    
+    @staticmethod
+    def _price_range(stats: Dict[str, Any]) -> str:
+        """Format min / median / max prices."""
+        return " / ".join(f"{stats[key]:,.0f}" for key in ('min_price', 'median_price', 'max_price'))
+    
     @staticmethod
     def _format_bytes(bytes_num: int) -> str:
         """Format bytes to human-readable string."""
@@ -367,6 +742,9 @@ Examples:
   # View catalog statistics
   python3 manage.py stats
   
+  # Include price analytics and verify the stats sidecar
+  python3 manage.py stats --prices --recompute
+  
   # Create a manual backup
   python3 manage.py backup
   
@@ -375,6 +753,30 @@ Examples:
   
   # Reset the database (with confirmation)
   python3 manage.py nuke
+  
+  # Render quote documents for a campaign
+  python3 manage.py render-quotes --file quotes.jsonl --format html --out-dir out/ --workers 4
+  
+  # Deactivate products whose pricing has fully expired
+  python3 manage.py expire --dry-run
+  
+  # Deactivate every product of a supplier
+  python3 manage.py patch --where '{"supplier_name": "Emaar"}' --set '{"active": false}'
+  
+  # Delete products (dropped from the file at the next write, or now with --compact)
+  python3 manage.py delete Dubai_DubaiFrame Dubai_MuseumOfTheFuture
+  
+  # Undo a bad ingest (the batch id is printed by ingest; --list shows recent ones)
+  python3 manage.py rollback --batch 20261019_101500_g42
+  
+  # Serve the read API (products, query, stats) with ETags
+  python3 manage.py serve --port 8000
+  
+  # Serve from 4 processes sharing one memory-mapped catalog image
+  python3 manage.py serve --workers 4
+  
+  # Also accept streamed NDJSON uploads (POST /products/bulk)
+  API_SECRET_KEY=... python3 manage.py serve --allow-writes
 
 For more information, see the documentation.
         """
@@ -398,10 +800,20 @@ For more information, see the documentation.
         help='Path to the JSON or JSONL file containing products'
     )
     
-    subparsers.add_parser(
+    stats_parser = subparsers.add_parser(
         'stats',
         help='Display catalog statistics and metrics'
     )
+    stats_parser.add_argument(
+        '--prices',
+        action='store_true',
+        help='Also show from-price ranges and a duration histogram (parses the catalog)'
+    )
+    stats_parser.add_argument(
+        '--recompute',
+        action='store_true',
+        help='Recount from the catalog and verify (and repair) the stats sidecar'
+    )
     
     subparsers.add_parser(
         'backup',
@@ -423,6 +835,137 @@ For more information, see the documentation.
         help='Skip confirmation prompt'
     )
     
+    render_parser = subparsers.add_parser(
+        'render-quotes',
+        help='Render quote documents (text or HTML) from a JSON or JSONL file'
+    )
+    render_parser.add_argument(
+        '--file',
+        required=True,
+        help='Path to the JSON or JSONL file containing quotes'
+    )
+    render_parser.add_argument(
+        '--out-dir',
+        required=True,
+        help='Directory to write the rendered documents to'
+    )
+    render_parser.add_argument(
+        '--format',
+        choices=['text', 'html'],
+        default='text',
+        help='Output format (default: text)'
+    )
+    render_parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Number of renderer processes (default: 1)'
+    )
+    
+    expire_parser = subparsers.add_parser(
+        'expire',
+        help='Deactivate products whose every pricing tier has expired'
+    )
+    expire_parser.add_argument(
+        '--date',
+        help='Expire relative to this date (YYYY-MM-DD, default: today)'
+    )
+    expire_parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='List products that are due without deactivating them'
+    )
+    
+    patch_parser = subparsers.add_parser(
+        'patch',
+        help='Set fields on every product matching a filter'
+    )
+    patch_parser.add_argument(
+        '--where',
+        required=True,
+        help='JSON filter in query syntax, e.g. \'{"category": "Cultural"}\''
+    )
+    patch_parser.add_argument(
+        '--set',
+        dest='changes',
+        required=True,
+        help='JSON object of fields to set, e.g. \'{"booking_policy": "..."}\''
+    )
+    patch_parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Report matching products without writing'
+    )
+    
+    delete_parser = subparsers.add_parser(
+        'delete',
+        help='Delete products by id'
+    )
+    delete_parser.add_argument(
+        'product_ids',
+        nargs='+',
+        help='Ids of the products to delete'
+    )
+    delete_parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Rewrite the catalog now instead of at the next write'
+    )
+    
+    rollback_parser = subparsers.add_parser(
+        'rollback',
+        help='Undo an ingest or patch batch'
+    )
+    rollback_parser.add_argument(
+        '--batch',
+        help='Id of the batch to roll back'
+    )
+    rollback_parser.add_argument(
+        '--skip-conflicts',
+        action='store_true',
+        help='Restore the other records when some were modified after the batch'
+    )
+    rollback_parser.add_argument(
+        '--dry-run',
+        action='store_true',
+        help='Report what would be restored without writing'
+    )
+    rollback_parser.add_argument(
+        '--list',
+        action='store_true',
+        help='List recent batches'
+    )
+    
+    serve_parser = subparsers.add_parser(
+        'serve',
+        help='Serve the HTTP API'
+    )
+    serve_parser.add_argument(
+        '--host',
+        help='Interface to bind (default: API_HOST or 0.0.0.0)'
+    )
+    serve_parser.add_argument(
+        '--port',
+        type=int,
+        help='Port to bind (default: API_PORT or 8000)'
+    )
+    serve_parser.add_argument(
+        '--access-log',
+        action='store_true',
+        help='Log every request to stderr'
+    )
+    serve_parser.add_argument(
+        '--workers',
+        type=int,
+        default=1,
+        help='Worker processes sharing one memory-mapped catalog image (default: 1)'
+    )
+    serve_parser.add_argument(
+        '--allow-writes',
+        action='store_true',
+        help='Accept NDJSON bulk uploads on POST /products/bulk (bearer API_SECRET_KEY)'
+    )
+    
     args = parser.parse_args()
     
     if not args.command:
@@ -435,7 +978,7 @@ For more information, see the documentation.
         return cli.ingest(args.file)
     
     elif args.command == 'stats':
-        return cli.stats()
+        return cli.stats(prices=args.prices, recompute=args.recompute)
     
     elif args.command == 'backup':
         return cli.backup()
@@ -446,6 +989,26 @@ For more information, see the documentation.
     elif args.command == 'nuke':
         return cli.nuke(confirmed=args.yes)
     
+    elif args.command == 'render-quotes':
+        return cli.render_quotes(args.file, args.out_dir, fmt=args.format, workers=args.workers)
+    
+    elif args.command == 'expire':
+        return cli.expire(args.date, dry_run=args.dry_run)
+    
+    elif args.command == 'patch':
+        return cli.patch(args.where, args.changes, dry_run=args.dry_run)
+    
+    elif args.command == 'delete':
+        return cli.delete(args.product_ids, compact=args.compact)
+    
+    elif args.command == 'rollback':
+        return cli.rollback(args.batch, skip_conflicts=args.skip_conflicts,
+                            dry_run=args.dry_run, list_batches=args.list)
+    
+    elif args.command == 'serve':
+        return cli.serve(args.host, args.port, access_log=args.access_log, workers=args.workers,
+                         allow_writes=args.allow_writes)
+    
     else:
         print(f"ERROR: Unknown command: {args.command}", file=sys.stderr)
         return 1
@@ -1 +1 @@
-from .catalog_manager import CatalogManager, Product, PricingTier
+from .lib.catalog_manager import CatalogManager, Product, PricingTier
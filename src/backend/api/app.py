@@ -0,0 +1,625 @@
+"""
+HTTP API for the product catalog, on the standard library's
+``http.server``.
+
+Routes (GET and HEAD):
+    /products               all products; ?category=, destination_city=,
+                            supplier_name=, active=, fields=, limit=, offset=
+    /products/<product_id>  one product; ?fields=
+    /query                  CatalogManager.query(); ?where=<json>, fields=,
+                            order_by=, limit=, offset=, cursor=, currency=,
+                            rate_date=
+    /stats                  counts from the stats sidecar
+
+POST /products/bulk (only with a BulkWriter, and ``Authorization: Bearer
+<key>``) takes NDJSON product records, chunked or with a Content-Length,
+and streams back one NDJSON result per record and a final summary; see
+CatalogApp.bulk.
+
+Every response carries a strong ETag built from the catalog generation
+and content digest (for one product: that product's content hash) plus
+the request; a matching ``If-None-Match`` is answered with 304 before
+anything is looked up or serialised. Single products and the full and
+per-category product lists are written from pre-encoded bytes (lists
+gzipped when the client accepts it); see ResponseCache.
+
+``serve_workers`` runs several forked worker processes on one socket;
+their apps read a shared, memory-mapped catalog image (CatalogImage)
+that the writer rebuilds on every commit.
+"""
+
+import hashlib
+import hmac
+import json
+import os
+import signal
+import threading
+import traceback
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, BinaryIO, Callable, Deque, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from ..config import API_HOST, API_PORT, CATALOG_DB_PATH
+from ..lib.bulk_writer import BulkWriter, iter_lines, parse_record
+from ..lib.catalog_image import FACET_FIELDS, CatalogImage
+from ..lib.catalog_manager import CatalogManager
+from ..lib.catalog_query import project
+from ..lib.hot_reload import CatalogHolder, ImageHolder
+from ..lib.response_cache import encode_json
+
+FILTER_PARAMS = FACET_FIELDS
+
+BULK_PATH = '/products/bulk'
+# Records per chunk an upload hands to the writer, chunks it may have
+# queued or in flight at once, and the longest accepted NDJSON line.
+BULK_CHUNK = 500
+BULK_IN_FLIGHT = 2
+MAX_LINE_BYTES = 1 << 20
+# How long an upload waits for room in a saturated write queue, and
+# for the result of a chunk it queued.
+BULK_SUBMIT_TIMEOUT = 30.0
+BULK_RESULT_TIMEOUT = 120.0
+
+# (line number, product_id if the line had one, record or None if it
+# failed to parse, parse error)
+BulkEntry = Tuple[int, Optional[str], Optional[Dict[str, Any]], Optional[str]]
+
+
+class Response:
+    def __init__(self, status: int, body: bytes = b'', headers: Optional[List[Tuple[str, str]]] = None):
+        self.status = status
+        self.body = body
+        self.headers = headers or []
+
+
+def json_response(status: int, data: Any, etag: Optional[str] = None) -> Response:
+    return bytes_response(status, encode_json(data), etag)
+
+
+def bytes_response(status: int, body: bytes, etag: Optional[str] = None, gzipped: bool = False) -> Response:
+    headers = [('Content-Type', 'application/json; charset=utf-8')]
+    if gzipped:
+        headers.append(('Content-Encoding', 'gzip'))
+    if etag:
+        headers += [('ETag', etag), ('Cache-Control', 'no-cache')]
+    return Response(status, body, headers)
+
+
+def accepts_gzip(header: Optional[str]) -> bool:
+    for coding in (header or '').split(','):
+        name, _, params = coding.strip().partition(';')
+        if name.strip().lower() in ('gzip', '*'):
+            quality = params.strip().lower()
+            return not (quality.startswith('q=') and float(quality[2:] or 0) == 0)
+    return False
+
+
+def iter_body(rfile: BinaryIO, headers: Mapping[str, str], block_size: int = 65536) -> Iterator[bytes]:
+    """A request body in pieces as it arrives, decoding chunked transfer
+    coding. Raises ValueError for a malformed or truncated body."""
+    if 'chunked' in (headers.get('Transfer-Encoding') or '').lower():
+        while True:
+            size_line = rfile.readline(1024)
+            try:
+                size = int(size_line.split(b';')[0].strip(), 16)
+            except ValueError:
+                raise ValueError("Malformed chunk size in request body")
+            if size == 0:
+                while rfile.readline(1024).strip():
+                    pass  # trailers
+                return
+            data = rfile.read(size)
+            if len(data) < size:
+                raise ValueError("Request body ended inside a chunk")
+            rfile.readline(1024)
+            yield data
+    else:
+        remaining = int(headers.get('Content-Length') or 0)
+        while remaining > 0:
+            data = rfile.read(min(block_size, remaining))
+            if not data:
+                raise ValueError("Request body shorter than its Content-Length")
+            remaining -= len(data)
+            yield data
+
+
+def error_response(status: int, message: str) -> Response:
+    return json_response(status, {'error': message})
+
+
+def etag_matches(header: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` check (weak comparison, as RFC 9110 requires)."""
+    for tag in (header or '').split(','):
+        tag = tag.strip()
+        if tag == '*' or (tag[2:] if tag.startswith('W/') else tag) == etag:
+            return True
+    return False
+
+
+class CatalogApp:
+    """Routes requests to the catalog.
+
+    With a CatalogHolder every request reads the holder's current pinned
+    generation without locking, and reloads happen in the background.
+    With a plain CatalogManager (tests, embedding) calls are serialised by
+    a lock and the manager reloads inline when the snapshot changes.
+
+    With an ImageHolder as well, products, unpaginated product lists and
+    stats are answered from the mapped catalog image and only other
+    requests reach the holder's manager (create it ``lazy`` so workers
+    that never get one don't load the catalog).
+    """
+
+    def __init__(self, manager: Optional[CatalogManager] = None, holder: Optional[CatalogHolder] = None,
+                 image: Optional[ImageHolder] = None, writer: Optional[BulkWriter] = None,
+                 write_key: Optional[str] = None):
+        if (manager is None) == (holder is None):
+            raise ValueError("CatalogApp needs either a manager or a holder")
+        if writer is not None and not write_key:
+            raise ValueError("A writable CatalogApp needs a write key")
+        self.manager = manager
+        self.holder = holder
+        self.image = image
+        self.writer = writer
+        self.write_key = write_key
+        self._lock = threading.Lock()
+        self._routes: Dict[str, Callable[[CatalogManager, Dict[str, str]], Any]] = {
+            '/products': self._list_products,
+            '/query': self._query,
+            '/stats': self._stats,
+        }
+
+    def start(self):
+        """Start following catalog changes (and writing uploads) in the background."""
+        for holder in (self.holder, self.image):
+            if holder is not None:
+                holder.start()
+        if self.writer is not None and not self.writer.is_alive():
+            self.writer.start()
+
+    def stop(self):
+        if self.writer is not None and self.writer.is_alive():
+            self.writer.stop()
+        for holder in (self.holder, self.image):
+            if holder is not None:
+                holder.stop()
+
+    def _catch_up(self):
+        # Let uploads read their own writes without waiting for a poll.
+        # Runs on the upload's thread, not the writer's, so reloads stay
+        # off the commit path.
+        for holder in (self.holder, self.image):
+            if holder is not None:
+                holder.check()
+
+    def authorized(self, header: Optional[str]) -> bool:
+        scheme, _, token = (header or '').partition(' ')
+        return (self.writer is not None and scheme.lower() == 'bearer'
+                and hmac.compare_digest(token.strip().encode('utf-8'), self.write_key.encode('utf-8')))
+
+    def bulk(self, chunks: Iterable[bytes]) -> Iterator[Dict[str, Any]]:
+        """Write an NDJSON upload, yielding results as they are known.
+
+        Lines are parsed and checked as they arrive and handed to the
+        writer ``BULK_CHUNK`` records at a time, where they share group
+        commits with other uploads. Results come back in input order
+        (the summary only once reads see the upload's writes):
+        ``{"line", "product_id", "status": "ok", "batch"}`` or ``{"line",
+        "product_id", "status": "error", "error"}``, then ``{"summary":
+        {"written", "failed", "batches"[, "error"]}}``. An upload with more
+        than ``BULK_IN_FLIGHT`` chunks outstanding waits for the oldest, so
+        it stops reading (backpressure) while the writer is behind. A
+        malformed body, an overlong line, a write queue that stays full
+        for ``BULK_SUBMIT_TIMEOUT`` or a writer that stopped or gave no
+        result in ``BULK_RESULT_TIMEOUT`` ends the upload early with an
+        error in the summary; records after that point were not read.
+        """
+        summary: Dict[str, Any] = {'written': 0, 'failed': 0, 'batches': []}
+        in_flight: Deque[Tuple[List[BulkEntry], Optional[Future]]] = deque()
+        entries: List[BulkEntry] = []
+        # The write failure that ended the upload, if any.
+        failure: List[Exception] = []
+
+        def settle(chunk: List[BulkEntry], future: Optional[Future]) -> Iterator[Dict[str, Any]]:
+            batch_id: Optional[str] = None
+            errors: List[Optional[str]] = []
+            if future is not None:
+                try:
+                    batch_id, errors = self.writer.result(future, BULK_RESULT_TIMEOUT)
+                except Exception as e:
+                    if not failure:
+                        failure.append(e)
+                        summary.setdefault('error', str(e))
+                    errors = [f"not written: {e}"] * sum(1 for _, _, record, _ in chunk if record is not None)
+            outcomes = iter(errors)
+            for number, product_id, record, problem in chunk:
+                if record is not None:
+                    problem = next(outcomes)
+                result: Dict[str, Any] = {'line': number, 'product_id': product_id}
+                if problem is None:
+                    result.update(status='ok', batch=batch_id)
+                    summary['written'] += 1
+                else:
+                    result.update(status='error', error=problem)
+                    summary['failed'] += 1
+                yield result
+            if batch_id and any(error is None for error in errors) and batch_id not in summary['batches']:
+                summary['batches'].append(batch_id)
+
+        def submit():
+            records = [record for _, _, record, _ in entries if record is not None]
+            future = None
+            if records:
+                try:
+                    if failure:
+                        raise failure[0]
+                    future = self.writer.submit(records, BULK_SUBMIT_TIMEOUT)
+                except Exception as e:
+                    future = Future()
+                    future.set_exception(e)
+                    if not failure:
+                        failure.append(e)
+                        summary['error'] = str(e)
+            in_flight.append((list(entries), future))
+            entries.clear()
+
+        try:
+            for number, line in iter_lines(chunks, MAX_LINE_BYTES):
+                entries.append((number,) + parse_record(line))
+                if len(entries) >= BULK_CHUNK:
+                    submit()
+                while in_flight and (len(in_flight) > BULK_IN_FLIGHT or in_flight[0][1] is None
+                                     or in_flight[0][1].done()):
+                    yield from settle(*in_flight.popleft())
+                if 'error' in summary:
+                    break
+        except ValueError as e:
+            summary['error'] = str(e)
+        if entries:
+            submit()
+        while in_flight:
+            yield from settle(*in_flight.popleft())
+        if summary['batches']:
+            self._catch_up()
+        yield {'summary': summary}
+
+    @contextmanager
+    def _catalog(self) -> Iterator[CatalogManager]:
+        if self.holder is not None:
+            yield self.holder.current
+        else:
+            with self._lock:
+                yield self.manager
+
+    def handle(self, method: str, target: str, headers: Mapping[str, str]) -> Response:
+        if method not in ('GET', 'HEAD'):
+            response = error_response(405, f"Method {method} not allowed")
+            response.headers.append(('Allow', 'GET, HEAD'))
+            return response
+        url = urlsplit(target)
+        path = url.path.rstrip('/') or '/'
+        try:
+            params = {key: values[-1] for key, values in parse_qs(url.query, strict_parsing=False).items()}
+        except ValueError as e:
+            return error_response(400, str(e))
+
+        product_id = None
+        if path.startswith('/products/'):
+            product_id = unquote(path[len('/products/'):])
+            handler = None
+        else:
+            handler = self._routes.get(path)
+            if handler is None:
+                return error_response(404, f"No route for {path}")
+        # The full list and one category's list are served pre-encoded.
+        cached_list = path == '/products' and set(params) <= {'category'}
+        try:
+            gzipped = cached_list and accepts_gzip(headers.get('Accept-Encoding'))
+        except ValueError:
+            gzipped = False
+
+        response = None
+        if self.image is not None and not params.get('currency'):
+            response = self._from_image(self.image.current, path, product_id, params,
+                                        self._request_key(f"{path}?{url.query}", gzipped), gzipped, headers)
+        if response is None:
+            with self._catalog() as manager:
+                request = f"{path}?{url.query}"
+                if params.get('currency'):
+                    # Converted prices also depend on the rate table and, by
+                    # default, today's date.
+                    try:
+                        request += repr(manager.conversion(params['currency'], params.get('rate_date') or None).key)
+                    except ValueError as e:
+                        return error_response(400, str(e))
+                request_key = self._request_key(request, gzipped)
+                if product_id is not None:
+                    version = manager.product_hash(product_id)
+                    if version is None:
+                        return error_response(404, f"Product not found: {product_id}")
+                    etag = f'"{version}-{request_key}"'
+                else:
+                    generation, digest = manager.catalog_version()
+                    etag = f'"{generation}-{digest}-{request_key}"'
+                if etag_matches(headers.get('If-None-Match'), etag):
+                    response = Response(304, headers=[('ETag', etag), ('Cache-Control', 'no-cache')])
+                elif product_id is not None and 'fields' not in params:
+                    response = bytes_response(200, manager.get_index('responses').product(product_id), etag)
+                elif cached_list:
+                    body = manager.get_index('responses').listing(params.get('category'), gzipped)
+                    response = bytes_response(200, body, etag, gzipped)
+                else:
+                    try:
+                        if product_id is not None:
+                            data = self._get_product(manager, product_id, params)
+                        else:
+                            data = handler(manager, params)
+                    except (ValueError, TypeError) as e:
+                        return error_response(400, str(e))
+                    return json_response(200, data, etag)
+        if cached_list:
+            response.headers.append(('Vary', 'Accept-Encoding'))
+        return response
+
+    @staticmethod
+    def _request_key(request: str, gzipped: bool) -> str:
+        request_key = hashlib.sha256(request.encode('utf-8')).hexdigest()[:8]
+        return request_key + '-gz' if gzipped else request_key
+
+    def _from_image(self, image: CatalogImage, path: str, product_id: Optional[str], params: Dict[str, str],
+                    request_key: str, gzipped: bool, headers: Mapping[str, str]) -> Optional[Response]:
+        """The response from the catalog image, or None if the request
+        needs the query engine."""
+        if product_id is not None:
+            version = image.product_hash(product_id)
+            if version is None:
+                return error_response(404, f"Product not found: {product_id}")
+            etag = f'"{version}-{request_key}"'
+        elif path == '/stats' or (path == '/products' and set(params) <= set(FILTER_PARAMS)):
+            etag = f'"{image.generation}-{image.digest}-{request_key}"'
+        else:
+            return None
+        if etag_matches(headers.get('If-None-Match'), etag):
+            return Response(304, headers=[('ETag', etag), ('Cache-Control', 'no-cache')])
+        if product_id is not None:
+            if 'fields' not in params:
+                return bytes_response(200, image.product(product_id), etag)
+            try:
+                return json_response(200, self._get_product(image, product_id, params), etag)
+            except (ValueError, TypeError) as e:
+                return error_response(400, str(e))
+        if path == '/stats':
+            return bytes_response(200, image.stats(), etag)
+        filters = {field: value.lower() == 'true' if field == 'active' else value for field, value in params.items()}
+        return bytes_response(200, image.listing(filters, gzipped), etag, gzipped)
+
+    @staticmethod
+    def _fields(params: Dict[str, str]) -> Optional[List[str]]:
+        return [field for field in params['fields'].split(',') if field] if params.get('fields') else None
+
+    @staticmethod
+    def _int(params: Dict[str, str], name: str) -> Optional[int]:
+        if params.get(name) in (None, ''):
+            return None
+        try:
+            return int(params[name])
+        except ValueError:
+            raise ValueError(f"{name} must be an integer")
+
+    def _get_product(self, manager: Any, product_id: str, params: Dict[str, str]) -> Dict[str, Any]:
+        record = manager.get(product_id)
+        fields = self._fields(params)
+        return project(record, fields) if fields else record
+
+    def _list_products(self, manager: CatalogManager, params: Dict[str, str]) -> Dict[str, Any]:
+        where: Dict[str, Any] = {}
+        for field in FILTER_PARAMS:
+            if field in params:
+                value = params[field]
+                where[field] = value.lower() == 'true' if field == 'active' else value
+        result = manager.query(
+            where=where or None, fields=self._fields(params),
+            limit=self._int(params, 'limit'), offset=self._int(params, 'offset') or 0,
+        )
+        # Same shape as the pre-encoded lists; the plan is for /query.
+        del result['plan']
+        return result
+
+    def _query(self, manager: CatalogManager, params: Dict[str, str]) -> Dict[str, Any]:
+        try:
+            where = json.loads(params['where']) if params.get('where') else None
+        except json.JSONDecodeError as e:
+            raise ValueError(f"where must be a JSON object: {e.msg}")
+        order_by = [key for key in params['order_by'].split(',') if key] if params.get('order_by') else None
+        return manager.query(
+            where=where, fields=self._fields(params), order_by=order_by,
+            limit=self._int(params, 'limit'), offset=self._int(params, 'offset') or 0,
+            cursor=params.get('cursor') or None, currency=params.get('currency') or None,
+            rate_date=params.get('rate_date') or None,
+        )
+
+    def _stats(self, manager: CatalogManager, params: Dict[str, str]) -> Dict[str, Any]:
+        return manager.catalog_stats()
+
+
+class CatalogRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    server_version = 'CatalogAPI/1.0'
+    app: CatalogApp
+
+    def _respond(self):
+        if self.command not in ('GET', 'HEAD'):
+            # The body is not read, so the connection can't be reused.
+            self.close_connection = True
+        try:
+            response = self.app.handle(self.command, self.path, self.headers)
+        except Exception as e:
+            self.log_error("Unhandled error for %s %s: %r", self.command, self.path, e)
+            response = error_response(500, "Internal server error")
+        self.send_response(response.status)
+        for name, value in response.headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(response.body)))
+        self.end_headers()
+        if self.command != 'HEAD' and response.body:
+            self.wfile.write(response.body)
+
+    def do_POST(self):
+        if urlsplit(self.path).path.rstrip('/') != BULK_PATH or self.app.writer is None:
+            return self._respond()
+        self.close_connection = True
+        if not self.app.authorized(self.headers.get('Authorization')):
+            response = error_response(401, "A valid bearer token is required to write")
+            response.headers.append(('WWW-Authenticate', 'Bearer'))
+        elif ('chunked' not in (self.headers.get('Transfer-Encoding') or '').lower()
+              and self.headers.get('Content-Length') is None):
+            response = error_response(411, "Send a Content-Length or a chunked body")
+        else:
+            response = None
+        if response is not None:
+            self._discard_body()
+            self.send_response(response.status)
+            for name, value in response.headers:
+                self.send_header(name, value)
+            self.send_header('Content-Length', str(len(response.body)))
+            self.end_headers()
+            self.wfile.write(response.body)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/x-ndjson; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        for result in self.app.bulk(iter_body(self.rfile, self.headers)):
+            data = encode_json(result) + b'\n'
+            self.wfile.write(b'%x\r\n%s\r\n' % (len(data), data))
+        self.wfile.write(b'0\r\n\r\n')
+
+    def _discard_body(self, limit: int = 65536):
+        """Read a small refused body, so the client gets to see the
+        response rather than a reset; larger ones are cut off."""
+        seen = 0
+        try:
+            for data in iter_body(self.rfile, self.headers):
+                seen += len(data)
+                if seen > limit:
+                    break
+        except ValueError:
+            pass
+
+    do_GET = do_HEAD = do_PUT = do_PATCH = do_DELETE = _respond
+
+    def log_message(self, format: str, *args: Any):
+        if self.server.access_log:
+            super().log_message(format, *args)
+
+
+class CatalogServer(ThreadingHTTPServer):
+    daemon_threads = True
+    access_log = False
+
+
+def create_app(db_path: Optional[str] = None, manager: Optional[CatalogManager] = None,
+               reload_interval: float = 1.0, image: bool = False, writable: bool = False,
+               write_key: Optional[str] = None) -> CatalogApp:
+    """An app over ``manager`` if given, else over a CatalogHolder for
+    ``db_path`` (call ``app.start()`` to follow writes). With ``image``,
+    reads come from ``<db_path>.image`` (see CatalogManager.write_image)
+    and the catalog is only loaded for requests the image can't answer.
+    With ``writable``, POST /products/bulk is served by a BulkWriter with
+    its own manager, for clients presenting ``write_key`` (default: the
+    API_SECRET_KEY environment variable). Raises ValueError for a
+    writable app without a key: the development default never accepts
+    writes."""
+    writer = None
+    if writable:
+        write_key = write_key or os.getenv('API_SECRET_KEY')
+        if not write_key:
+            raise ValueError("Writes need a key: set API_SECRET_KEY")
+        writer = BulkWriter(CatalogManager(db_path or (manager.db_path if manager else CATALOG_DB_PATH)))
+    if manager is not None:
+        return CatalogApp(manager=manager, writer=writer, write_key=write_key)
+    db_path = db_path or CATALOG_DB_PATH
+    if not image:
+        return CatalogApp(holder=CatalogHolder(db_path, interval=reload_interval),
+                          writer=writer, write_key=write_key)
+    return CatalogApp(
+        holder=CatalogHolder(db_path, interval=reload_interval, lazy=True),
+        image=ImageHolder(f"{db_path}.image", interval=reload_interval),
+        writer=writer, write_key=write_key,
+    )
+
+
+def make_server(app: Optional[CatalogApp], host: str = API_HOST, port: int = API_PORT) -> CatalogServer:
+    """Bind a server for ``app`` (which may be set later, per process, on
+    ``server.RequestHandlerClass.app``)."""
+    handler = type('BoundCatalogRequestHandler', (CatalogRequestHandler,), {'app': app})
+    return CatalogServer((host, port), handler)
+
+
+def _interrupt(signum, frame):
+    raise KeyboardInterrupt
+
+
+def _write_image(db_path: str) -> Tuple[str, int]:
+    manager = CatalogManager(db_path)
+    return manager.write_image(), manager.generation
+
+
+def prepare_image(db_path: str) -> Tuple[str, int]:
+    """Build ``db_path``'s catalog image in a separate process, so a
+    server about to fork workers never holds the parsed catalog itself.
+    Returns the image path and its generation."""
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        return pool.submit(_write_image, db_path).result()
+
+
+def serve_workers(server: CatalogServer, create: Callable[[], CatalogApp], workers: int):
+    """Serve ``server``'s socket from ``workers`` forked processes, each
+    with its own app from ``create()``, until they exit or the parent is
+    interrupted (POSIX only). Create apps with ``image=True`` so the
+    workers share one mapped catalog rather than each parsing their own."""
+    if not hasattr(os, 'fork'):
+        raise ValueError("Multiple workers need os.fork(), which this platform lacks")
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+    children = []
+    for _ in range(workers):
+        pid = os.fork()
+        if pid == 0:
+            status = 0
+            try:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                app = create()
+                server.RequestHandlerClass.app = app
+                app.start()
+                server.serve_forever()
+            except KeyboardInterrupt:
+                pass
+            except BaseException:
+                traceback.print_exc()
+                status = 1
+            finally:
+                os._exit(status)
+        children.append(pid)
+    # SIGTERM to the parent stops the workers too.
+    previous = signal.signal(signal.SIGTERM, _interrupt)
+    try:
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        for pid in children:
+            try:
+                os.waitpid(pid, 0)
+            except ChildProcessError:
+                pass
+    finally:
+        signal.signal(signal.SIGTERM, previous)
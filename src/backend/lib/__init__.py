@@ -1 +1,2 @@
 from .catalog_manager import CatalogManager, Product, PricingTier
+from .catalog_index import CatalogIndex, SecondaryIndex
@@ -0,0 +1,175 @@
+import json
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError as FutureTimeout
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .catalog_manager import ValidationError, validate_fields, validation_message
+
+
+def parse_record(line: bytes) -> Tuple[Optional[str], Optional[Dict[str, Any]], Optional[str]]:
+    """Parse and check one NDJSON line on its own: a JSON object with a
+    product_id whose other fields are individually valid. Whether the
+    merged product is complete is only known at commit time.
+
+    Returns ``(product_id, record, error)``: the record is None if the
+    line failed, and the product_id is reported whenever the line had a
+    valid one, so a client can tell which product was rejected."""
+    try:
+        record = json.loads(line)
+    except ValueError as e:
+        return None, None, f"invalid JSON: {e}"
+    if not isinstance(record, dict):
+        return None, None, "expected a JSON object"
+    product_id = record.get('product_id')
+    if not isinstance(product_id, str) or not product_id:
+        return None, None, "product_id must be a non-empty string"
+    fields = {field: value for field, value in record.items() if field != 'product_id'}
+    if fields:
+        try:
+            validate_fields(fields)
+        except ValidationError as e:
+            return product_id, None, validation_message(e)
+        except ValueError as e:
+            return product_id, None, str(e)
+    return product_id, record, None
+
+
+def iter_lines(chunks: Iterable[bytes], max_length: int) -> Iterator[Tuple[int, bytes]]:
+    """Numbered non-blank lines from a stream of byte chunks. Raises
+    ValueError for a line longer than ``max_length``."""
+    buffer = b''
+    number = 0
+    for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            number += 1
+            if len(line) > max_length:
+                raise ValueError(f"Line {number} is longer than {max_length} bytes")
+            if line.strip():
+                yield number, line
+        if len(buffer) > max_length:
+            raise ValueError(f"Line {number + 1} is longer than {max_length} bytes")
+    if buffer.strip():
+        yield number + 1, buffer
+
+
+class BulkWriter(threading.Thread):
+    """Group-commit writer for streamed uploads.
+
+    Uploads ``submit()`` chunks of records and get a Future of per-record
+    errors. The thread takes the oldest queued chunk plus whatever else
+    is queued, up to ``max_batch`` records, and writes them with one
+    ``upsert_each()`` commit, so concurrent uploads share commits. The
+    queue holds at most ``max_pending`` chunks: when it is full,
+    ``submit()`` blocks (and the upload stops reading its socket) until
+    the writer catches up, or raises TimeoutError after ``timeout``.
+
+    Give it its own CatalogManager. A commit that finds the catalog
+    locked by another writer is retried for up to ``lock_timeout``
+    seconds. ``on_commit(batch_id)`` runs after a group's Futures are
+    resolved; an exception from it is kept in ``last_error`` rather than
+    stopping the writer.
+    """
+
+    def __init__(self, manager, max_batch: int = 5000, max_pending: int = 8,
+                 lock_timeout: float = 30.0,
+                 on_commit: Optional[Callable[[Optional[str]], None]] = None):
+        super().__init__(name='catalog-writer', daemon=True)
+        self.manager = manager
+        self.max_batch = max_batch
+        self.lock_timeout = lock_timeout
+        self.on_commit = on_commit
+        self.commits = 0
+        self.last_error: Optional[Exception] = None
+        self._queue: 'queue.Queue[Optional[Tuple[List[Dict[str, Any]], Future]]]' = queue.Queue(max_pending)
+
+    def submit(self, records: List[Dict[str, Any]], timeout: Optional[float] = None) -> Future:
+        """Queue ``records`` for the next commit. The Future resolves to
+        ``(batch_id, errors)``: the batch they were written in and one
+        error message per record (None if written)."""
+        if self.ident is not None and not self.is_alive():
+            raise RuntimeError("Writer is not running")
+        future: Future = Future()
+        try:
+            self._queue.put((records, future), timeout=timeout)
+        except queue.Full:
+            raise TimeoutError("Write pipeline saturated; retry later")
+        return future
+
+    def result(self, future: Future, timeout: Optional[float] = None) -> Tuple[Optional[str], List[Optional[str]]]:
+        """Wait for a Future from ``submit()``. Raises TimeoutError after
+        ``timeout`` and RuntimeError if the writer stops without
+        resolving it."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            wait = 1.0 if deadline is None else min(1.0, max(0.0, deadline - time.monotonic()))
+            try:
+                return future.result(wait)
+            except FutureTimeout:
+                if future.done():
+                    continue
+                if not self.is_alive():
+                    raise RuntimeError("Writer stopped before the records were written")
+                if deadline is not None and time.monotonic() >= deadline:
+                    raise TimeoutError(f"No write result after {timeout} seconds")
+
+    def _take(self) -> Optional[List[Tuple[List[Dict[str, Any]], Future]]]:
+        item = self._queue.get()
+        if item is None:
+            return None
+        group = [item]
+        size = len(item[0])
+        while size < self.max_batch:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is None:
+                # Finish this group, then stop.
+                self._queue.put(None)
+                break
+            group.append(item)
+            size += len(item[0])
+        return group
+
+    def _write(self, records: List[Dict[str, Any]]) -> Tuple[Optional[str], List[Optional[str]]]:
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                errors = self.manager.upsert_each(records)
+                return self.manager.last_batch_id, errors
+            except BlockingIOError:
+                if time.monotonic() >= deadline:
+                    raise
+                time.sleep(0.05)
+
+    def run(self):
+        while True:
+            group = self._take()
+            if group is None:
+                return
+            records = [record for chunk, _ in group for record in chunk]
+            try:
+                batch_id, errors = self._write(records)
+            except Exception as e:
+                for _, future in group:
+                    future.set_exception(e)
+                continue
+            self.commits += 1
+            start = 0
+            for chunk, future in group:
+                future.set_result((batch_id, errors[start:start + len(chunk)]))
+                start += len(chunk)
+            if self.on_commit is not None:
+                try:
+                    self.on_commit(batch_id)
+                except Exception as e:
+                    self.last_error = e
+
+    def stop(self, timeout: Optional[float] = None):
+        """Write what is already queued, then stop."""
+        self._queue.put(None)
+        self.join(timeout)
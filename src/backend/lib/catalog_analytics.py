@@ -0,0 +1,195 @@
+import math
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .catalog_index import CatalogIndex
+
+GROUP_FIELDS = ('category', 'destination_city', 'supplier_name')
+
+# Left edges in hours; the last bin is open-ended.
+DURATION_BINS = (0.0, 2.0, 4.0, 6.0, 8.0, 12.0, 24.0)
+
+# (category, city, supplier, active, min price, duration)
+Row = Tuple[Optional[str], Optional[str], Optional[str], bool, float, float]
+
+
+def _row(product: Dict[str, Any]) -> Row:
+    prices = [float(tier['price_aed']) for tier in product.get('pricing') or []]
+    duration = product.get('duration_hours')
+    return (
+        product.get('category') or None,
+        product.get('destination_city') or None,
+        product.get('supplier_name') or None,
+        bool(product.get('active', True)),
+        min(prices) if prices else math.nan,
+        float(duration) if duration is not None else math.nan,
+    )
+
+
+def _bin_label(low: float, high: Optional[float]) -> str:
+    if high is None:
+        return f"{low:g}h+"
+    return f"{low:g}-{high:g}h"
+
+
+def _grouped_quantiles(codes: np.ndarray, values: np.ndarray, n_groups: int) -> Dict[str, np.ndarray]:
+    """Per-code min/median/max of ``values`` (NaN ignored) from one lexsort."""
+    known = ~np.isnan(values)
+    codes, values = codes[known], values[known]
+    order = np.lexsort((values, codes))
+    codes, values = codes[order], values[order]
+    counts = np.bincount(codes, minlength=n_groups)
+    starts = np.cumsum(counts) - counts
+    has = counts > 0
+    result = {name: np.full(n_groups, np.nan) for name in ('min', 'median', 'max')}
+    result['min'][has] = values[starts[has]]
+    result['max'][has] = values[starts[has] + counts[has] - 1]
+    lower = starts + (counts - 1) // 2
+    upper = starts + counts // 2
+    result['median'][has] = (values[lower[has]] + values[upper[has]]) / 2.0
+    return result
+
+
+def _number(value: float) -> Optional[float]:
+    return None if math.isnan(value) else round(float(value), 2)
+
+
+class CatalogAnalytics(CatalogIndex):
+    """Columnar snapshot of the catalog for grouped aggregates.
+
+    Commits only update a small per-product row; the first aggregate after a
+    change materialises NumPy columns (dictionary-encoded category, city and
+    supplier codes, active flag, "from" price and duration) once, and every
+    group-by afterwards is ``bincount`` / ``lexsort`` work on those arrays.
+    Prices are each product's cheapest tier in AED, as in ``query()``.
+    """
+
+    name = "analytics"
+    persistent = False
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._rows: Dict[str, Row] = {}
+        self._columns: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def add(self, product: Dict[str, Any]):
+        self._rows[product['product_id']] = _row(product)
+        self._columns = None
+
+    def remove(self, product: Dict[str, Any]):
+        self._rows.pop(product['product_id'], None)
+        self._columns = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+
+    def columns(self) -> Dict[str, Any]:
+        if self._columns is not None:
+            return self._columns
+        rows = list(self._rows.values())
+        columns: Dict[str, Any] = {}
+        for position, field in enumerate(GROUP_FIELDS):
+            labels: Dict[Optional[str], int] = {}
+            columns[field] = np.fromiter(
+                (labels.setdefault(row[position], len(labels)) for row in rows), dtype=np.int32, count=len(rows)
+            )
+            columns[f"{field}_labels"] = list(labels)
+        columns['active'] = np.fromiter((row[3] for row in rows), dtype=bool, count=len(rows))
+        columns['price'] = np.fromiter((row[4] for row in rows), dtype=np.float64, count=len(rows))
+        columns['duration'] = np.fromiter((row[5] for row in rows), dtype=np.float64, count=len(rows))
+        self._columns = columns
+        return columns
+
+    def summary(self) -> Dict[str, Any]:
+        columns = self.columns()
+        active = int(np.count_nonzero(columns['active']))
+        prices = columns['price'][~np.isnan(columns['price'])]
+        return {
+            'total': len(columns['active']),
+            'active': active,
+            'inactive': len(columns['active']) - active,
+            'priced': len(prices),
+            'min_price': _number(prices.min()) if len(prices) else None,
+            'median_price': _number(np.median(prices)) if len(prices) else None,
+            'max_price': _number(prices.max()) if len(prices) else None,
+        }
+
+    def _selection(self, active_only: bool) -> Optional[np.ndarray]:
+        return self.columns()['active'] if active_only else None
+
+    def group_by(self, field: str, active_only: bool = False) -> List[Dict[str, Any]]:
+        """Count, active count and min/median/max price per value of
+        ``field``, largest groups first. Missing values group under None."""
+        if field not in GROUP_FIELDS:
+            raise ValueError(f"Cannot group by {field} (expected one of {', '.join(GROUP_FIELDS)})")
+        columns = self.columns()
+        labels = columns[f"{field}_labels"]
+        codes, active, prices = columns[field], columns['active'], columns['price']
+        selection = self._selection(active_only)
+        if selection is not None:
+            codes, active, prices = codes[selection], active[selection], prices[selection]
+
+        counts = np.bincount(codes, minlength=len(labels))
+        active_counts = np.bincount(codes, weights=active, minlength=len(labels))
+        quantiles = _grouped_quantiles(codes, prices, len(labels))
+        groups = [
+            {
+                'value': label,
+                'count': int(counts[code]),
+                'active': int(active_counts[code]),
+                'min_price': _number(quantiles['min'][code]),
+                'median_price': _number(quantiles['median'][code]),
+                'max_price': _number(quantiles['max'][code]),
+            }
+            for code, label in enumerate(labels) if counts[code]
+        ]
+        groups.sort(key=lambda group: (-group['count'], group['value'] is None, group['value'] or ''))
+        return groups
+
+    def duration_histogram(self, by: Optional[str] = None, bins: Sequence[float] = DURATION_BINS,
+                           active_only: bool = False) -> Dict[str, Any]:
+        """Product counts per duration bin (left-closed; the last bin is
+        open-ended), overall or per value of ``by``."""
+        if by is not None and by not in GROUP_FIELDS:
+            raise ValueError(f"Cannot group by {by} (expected one of {', '.join(GROUP_FIELDS)})")
+        edges = np.asarray(bins, dtype=np.float64)
+        if len(edges) == 0 or np.any(np.diff(edges) <= 0):
+            raise ValueError("Histogram bins must be a non-empty increasing sequence")
+        columns = self.columns()
+        durations = columns['duration']
+        codes = columns[by] if by else np.zeros(len(durations), dtype=np.int32)
+        labels = columns[f"{by}_labels"] if by else [None]
+        selection = self._selection(active_only)
+        if selection is not None:
+            durations, codes = durations[selection], codes[selection]
+
+        known = ~np.isnan(durations) & (durations >= edges[0])
+        slots = np.digitize(durations[known], edges) - 1
+        n_bins = len(edges)
+        matrix = np.bincount(codes[known] * n_bins + slots, minlength=len(labels) * n_bins)
+        matrix = matrix.reshape(len(labels), n_bins)
+        unknown = np.bincount(codes[~known], minlength=len(labels))
+
+        highs = edges.tolist()[1:] + [None]
+        histogram: Dict[str, Any] = {
+            'bins': [_bin_label(low, high) for low, high in zip(edges.tolist(), highs)],
+        }
+        if by is None:
+            histogram['counts'] = matrix[0].tolist()
+            histogram['unknown'] = int(unknown[0])
+        else:
+            histogram['groups'] = {
+                label: {'counts': matrix[code].tolist(), 'unknown': int(unknown[code])}
+                for code, label in enumerate(labels)
+                if matrix[code].any() or unknown[code]
+            }
+        return histogram
@@ -0,0 +1,243 @@
+import gzip
+import json
+import mmap
+import os
+import struct
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .response_cache import encode_json
+
+MAGIC = b'CATIMG01'
+# Magic, then the length of the JSON header that follows it.
+PREFIX = struct.Struct('<8sI')
+HASH_WIDTH = 16
+ALIGN = 8
+
+# Fields with posting lists in the image (the /products filters).
+FACET_FIELDS = ('category', 'destination_city', 'supplier_name', 'active')
+
+Filters = Dict[str, Any]
+
+
+def facet_key(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False)
+
+
+class _Sections:
+    """Data area under construction: aligned sections and their offsets."""
+
+    def __init__(self):
+        self.chunks: List[bytes] = []
+        self.size = 0
+
+    def add(self, data: bytes) -> int:
+        offset = self.size
+        self.chunks.append(data)
+        self.size += len(data)
+        padding = -self.size % ALIGN
+        if padding:
+            self.chunks.append(b'\0' * padding)
+            self.size += padding
+        return offset
+
+
+def write_image(path: str, generation: int, digest: str, records: Dict[str, Dict[str, Any]],
+                fragment: Callable[[str], bytes], product_hash: Callable[[str], Optional[str]],
+                stats: Dict[str, Any]):
+    """Write a catalog image to ``path`` (atomically, via ``<path>.tmp``).
+
+    ``fragment`` returns a product's encoded JSON (see ResponseCache) and
+    ``product_hash`` its content hash (see ContentDigest), so the image
+    serves byte-for-byte what a manager-backed API would.
+    """
+    ids = sorted(records)
+    sections = _Sections()
+
+    # The records are laid out as the full /products body, so that list
+    # is one contiguous slice of the file.
+    items = [fragment(product_id) for product_id in ids]
+    head = b'{"items":['
+    starts = np.zeros(len(ids), dtype='<u8')
+    ends = np.zeros(len(ids), dtype='<u8')
+    position = len(head)
+    for number, encoded in enumerate(items):
+        starts[number] = position
+        ends[number] = position + len(encoded)
+        position += len(encoded) + 1
+    listing = b''.join([head, b','.join(items), b'],"total":', str(len(ids)).encode('ascii'),
+                        b',"next_cursor":null}'])
+    list_offset = sections.add(listing)
+    starts += list_offset
+    ends += list_offset
+
+    encoded_ids = [product_id.encode('utf-8') for product_id in ids]
+    id_bounds = np.zeros(len(ids) + 1, dtype='<u8')
+    np.cumsum([len(e) for e in encoded_ids], out=id_bounds[1:])
+    hashes = b''.join((product_hash(product_id) or '0' * HASH_WIDTH).encode('ascii') for product_id in ids)
+
+    postings: Dict[str, Dict[str, List[int]]] = {field: {} for field in FACET_FIELDS}
+    for number, product_id in enumerate(ids):
+        record = records[product_id]
+        for field in FACET_FIELDS:
+            # A missing ``active`` means active, as in SecondaryIndex.
+            value = bool(record.get('active', True)) if field == 'active' else record.get(field)
+            if isinstance(value, (str, bool)):
+                postings[field].setdefault(facet_key(value), []).append(number)
+
+    stats_body = encode_json(stats)
+    header = {
+        'generation': generation,
+        'digest': digest,
+        'count': len(ids),
+        'list': [list_offset, len(listing)],
+        'starts': sections.add(starts.tobytes()),
+        'ends': sections.add(ends.tobytes()),
+        'ids': sections.add(b''.join(encoded_ids)),
+        'id_bounds': sections.add(id_bounds.tobytes()),
+        'hashes': sections.add(hashes),
+        'stats': [sections.add(stats_body), len(stats_body)],
+        'facets': {
+            field: {
+                key: [sections.add(np.array(numbers, dtype='<u4').tobytes()), len(numbers)]
+                for key, numbers in values.items()
+            }
+            for field, values in postings.items()
+        },
+    }
+    encoded_header = json.dumps(header, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    encoded_header += b' ' * (-(PREFIX.size + len(encoded_header)) % ALIGN)
+
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'wb') as f:
+        f.write(PREFIX.pack(MAGIC, len(encoded_header)))
+        f.write(encoded_header)
+        for chunk in sections.chunks:
+            f.write(chunk)
+    os.replace(tmp_path, path)
+
+
+class CatalogImage:
+    """Read-only view of a catalog image, mapped with mmap.
+
+    Nothing but the small JSON header is parsed: product lookups binary
+    search the sorted id table, and product bodies, the full product list
+    and the stats are slices of the mapping. Processes that map the same
+    file share its pages, so N API workers cost about one copy of the
+    catalog between them. Filtered lists are spliced per request from the
+    posting lists; gzipped lists are the only thing cached per process.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if len(self._map) < PREFIX.size:
+            raise ValueError(f"Not a catalog image: {path}")
+        magic, header_length = PREFIX.unpack_from(self._map)
+        if magic != MAGIC:
+            raise ValueError(f"Not a catalog image: {path}")
+        header = json.loads(self._map[PREFIX.size:PREFIX.size + header_length])
+        self._data = PREFIX.size + header_length
+        self._view = memoryview(self._map)
+
+        self.generation: int = header['generation']
+        self.digest: str = header['digest']
+        self.count: int = header['count']
+        self._list = self._slice(*header['list'])
+        self._stats = self._slice(*header['stats'])
+        self._starts = self._array('<u8', header['starts'], self.count)
+        self._ends = self._array('<u8', header['ends'], self.count)
+        self._id_bounds = self._array('<u8', header['id_bounds'], self.count + 1)
+        self._ids = self._data + header['ids']
+        self._hashes = self._data + header['hashes']
+        self._facets: Dict[str, Dict[str, Tuple[int, int]]] = {
+            field: {key: (offset, length) for key, (offset, length) in values.items()}
+            for field, values in header['facets'].items()
+        }
+        self._gzipped: Dict[Tuple[Tuple[str, str], ...], bytes] = {}
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _slice(self, offset: int, length: int) -> memoryview:
+        return self._view[self._data + offset:self._data + offset + length]
+
+    def _array(self, dtype: str, offset: int, count: int) -> np.ndarray:
+        if not count:
+            return np.zeros(0, dtype=dtype)
+        return np.frombuffer(self._map, dtype=dtype, count=count, offset=self._data + offset)
+
+    def _find(self, product_id: str) -> Optional[int]:
+        key = product_id.encode('utf-8')
+        bounds = self._id_bounds
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            candidate = self._map[self._ids + int(bounds[middle]):self._ids + int(bounds[middle + 1])]
+            if candidate < key:
+                low = middle + 1
+            elif candidate > key:
+                high = middle
+            else:
+                return middle
+        return None
+
+    def _record_bytes(self, number: int) -> memoryview:
+        return self._view[self._data + int(self._starts[number]):self._data + int(self._ends[number])]
+
+    def product(self, product_id: str) -> Optional[memoryview]:
+        number = self._find(product_id)
+        return None if number is None else self._record_bytes(number)
+
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        encoded = self.product(product_id)
+        return None if encoded is None else json.loads(bytes(encoded))
+
+    def product_hash(self, product_id: str) -> Optional[str]:
+        number = self._find(product_id)
+        if number is None:
+            return None
+        start = self._hashes + number * HASH_WIDTH
+        return self._map[start:start + HASH_WIDTH].decode('ascii')
+
+    def stats(self) -> memoryview:
+        return self._stats
+
+    def select(self, filters: Filters) -> np.ndarray:
+        """Record numbers (in product_id order) whose fields equal every
+        value in ``filters``. Raises ValueError for a field without
+        posting lists."""
+        selected: Optional[np.ndarray] = None
+        for field, value in filters.items():
+            if field not in self._facets:
+                raise ValueError(f"No posting lists for {field}")
+            posting = self._facets[field].get(facet_key(value))
+            numbers = self._array('<u4', *posting) if posting else np.zeros(0, dtype='<u4')
+            selected = numbers if selected is None else np.intersect1d(selected, numbers, assume_unique=True)
+        return np.arange(self.count, dtype='<u4') if selected is None else selected
+
+    def listing(self, filters: Optional[Filters] = None, compressed: bool = False):
+        """The /products body for equality ``filters`` (all products if
+        none), ordered by product_id: a slice of the image when
+        unfiltered, spliced from the record slices otherwise."""
+        if not filters:
+            body = self._list
+            numbers = None
+        else:
+            numbers = self.select(filters)
+            body = b''.join([
+                b'{"items":[', b','.join([self._record_bytes(int(n)) for n in numbers]),
+                b'],"total":', str(len(numbers)).encode('ascii'), b',"next_cursor":null}',
+            ])
+        if not compressed:
+            return body
+        key = tuple(sorted((field, facet_key(value)) for field, value in (filters or {}).items()))
+        cached = self._gzipped.get(key)
+        if cached is None:
+            cached = gzip.compress(body, 6, mtime=0)
+            if numbers is None or len(numbers):
+                self._gzipped[key] = cached
+        return cached
+
@@ -0,0 +1,97 @@
+from typing import Any, Dict, Iterable, List, Set
+
+
+class CatalogIndex:
+    """Base class for indexes that CatalogManager keeps in sync on commit.
+
+    Persistent indexes are written next to the snapshot as
+    ``<db_path>.<name>.idx`` and reloaded when their generation matches
+    the catalog generation; the rest are rebuilt in memory on first use.
+    """
+
+    name: str = ""
+    persistent: bool = True
+    version: int = 1
+
+    def clear(self):
+        raise NotImplementedError
+
+    def add(self, product: Dict[str, Any]):
+        raise NotImplementedError
+
+    def remove(self, product: Dict[str, Any]):
+        raise NotImplementedError
+
+    def to_dict(self) -> Dict[str, Any]:
+        raise NotImplementedError
+
+    def load_dict(self, data: Dict[str, Any]):
+        raise NotImplementedError
+
+    def build(self, products: Iterable[Dict[str, Any]]):
+        self.clear()
+        for product in products:
+            self.add(product)
+
+
+class SecondaryIndex(CatalogIndex):
+    name = "secondary"
+    FIELDS = ("category", "destination_city", "supplier_name", "active")
+
+    def __init__(self):
+        self._postings: Dict[str, Dict[Any, Set[str]]] = {}
+        self.clear()
+
+    @staticmethod
+    def _value(product: Dict[str, Any], field: str) -> Any:
+        if field == "active":
+            return bool(product.get("active", True))
+        return product.get(field)
+
+    def clear(self):
+        self._postings = {field: {} for field in self.FIELDS}
+
+    def add(self, product: Dict[str, Any]):
+        product_id = product["product_id"]
+        for field in self.FIELDS:
+            value = self._value(product, field)
+            self._postings[field].setdefault(value, set()).add(product_id)
+
+    def remove(self, product: Dict[str, Any]):
+        product_id = product["product_id"]
+        for field in self.FIELDS:
+            value = self._value(product, field)
+            ids = self._postings[field].get(value)
+            if ids is None:
+                continue
+            ids.discard(product_id)
+            if not ids:
+                del self._postings[field][value]
+
+    def lookup(self, field: str, value: Any) -> Set[str]:
+        if field not in self._postings:
+            raise KeyError(f"Field is not indexed: {field}")
+        return self._postings[field].get(value, set())
+
+    def counts(self, field: str) -> Dict[Any, int]:
+        if field not in self._postings:
+            raise KeyError(f"Field is not indexed: {field}")
+        return {value: len(ids) for value, ids in self._postings[field].items()}
+
+    def values(self, field: str) -> List[Any]:
+        return list(self.counts(field))
+
+    def __len__(self) -> int:
+        return sum(len(ids) for ids in self._postings["active"].values())
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            field: [[value, sorted(ids)] for value, ids in postings.items()]
+            for field, postings in self._postings.items()
+        }
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+        for field in self.FIELDS:
+            for value, ids in data.get(field, []):
+                self._postings[field][value] = set(ids)
@@ -1,12 +1,37 @@
+import copy
 import json
 import os
 import shutil
 import glob
+import threading
 import time
-from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from datetime import date, datetime, timedelta
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Set, Tuple
 from contextlib import contextmanager
-from pydantic import BaseModel, Field, field_validator, ValidationError
+from pydantic import BaseModel, Field, field_validator, ValidationError, ValidationInfo
+
+from .catalog_index import CatalogIndex, SecondaryIndex
+from .text_index import TextIndex
+from .validity_index import ValidityIndex, DateLike, to_ordinal
+from .price_index import PriceIndex
+from .fx import BASE_CURRENCY, Conversion, FxTable
+from .name_lookup import NameLookup
+from .related_index import RelatedIndex
+from .recommender import RecommenderIndex, tips_for
+from .comparison import ComparisonIndex
+from .quote_pricing import Pax, QuotePricer
+from .quote_render import QuoteFragments, render_quotes
+from .catalog_analytics import DURATION_BINS, CatalogAnalytics
+from .catalog_stats import CatalogStats
+from .price_history import Moment, PriceHistory
+from .expiry import ExpiryIndex
+from .content_digest import ContentDigest
+from .response_cache import ResponseCache
+from .catalog_image import write_image
+from .undo_log import UndoLog
+from .index_journal import IndexJournal
+from .time_travel import CatalogHistory, CatalogView
+from . import catalog_query
 
 
 class PricingTier(BaseModel):
@@ -23,6 +48,25 @@ class PricingTier(BaseModel):
             raise ValueError('price_aed must be non-negative')
         return v
 
+    @field_validator('validity_start', 'validity_end')
+    @classmethod
+    def validate_validity_date(cls, v):
+        if v is None or v == "":
+            return None
+        try:
+            date.fromisoformat(v)
+        except ValueError:
+            raise ValueError('validity dates must be ISO formatted (YYYY-MM-DD)')
+        return v
+
+    @field_validator('validity_end')
+    @classmethod
+    def validate_validity_window(cls, v, info: ValidationInfo):
+        start = info.data.get('validity_start')
+        if v is not None and start is not None and v < start:
+            raise ValueError('validity_end must not be before validity_start')
+        return v
+
 
 class Product(BaseModel):
     product_id: str
@@ -50,6 +94,29 @@ class Product(BaseModel):
         return [PricingTier(**tier) if isinstance(tier, dict) else tier for tier in v]
 
 
+def validate_fields(changes: Dict[str, Any]) -> Dict[str, Any]:
+    """Validate a partial update field by field against ``Product`` and
+    return the values as they would be stored."""
+    if not isinstance(changes, dict) or not changes:
+        raise ValueError("changes must be a non-empty mapping of field to value")
+    if 'product_id' in changes:
+        raise ValueError("product_id cannot be patched")
+    unknown = sorted(field for field in changes if field not in Product.model_fields)
+    if unknown:
+        raise ValueError(f"Unknown product fields: {', '.join(unknown)}")
+    scratch = Product.model_construct()
+    for field, value in changes.items():
+        Product.__pydantic_validator__.validate_assignment(scratch, field, value)
+    return scratch.model_dump(include=set(changes))
+
+
+def validation_message(error: ValidationError) -> str:
+    """One-line summary of a pydantic ValidationError."""
+    return '; '.join(
+        f"{'.'.join(str(part) for part in item['loc']) or 'record'}: {item['msg']}" for item in error.errors()
+    )
+
+
 class CatalogLock:
     STALE_LOCK_SECONDS = 30
 
@@ -59,17 +126,35 @@ class CatalogLock:
         self.lock_acquired = False
 
     def __enter__(self):
-        if os.path.exists(self.lock_path):
-            lock_age = time.time() - os.path.getmtime(self.lock_path)
+        # O_EXCL makes taking the lock one atomic step, so concurrent
+        # writers (e.g. the API's bulk writer in every worker) can't both
+        # see it free and both create it.
+        try:
+            fd = self._create()
+        except FileExistsError:
+            try:
+                lock_age = time.time() - os.path.getmtime(self.lock_path)
+            except FileNotFoundError:
+                lock_age = self.STALE_LOCK_SECONDS
             if lock_age < self.STALE_LOCK_SECONDS:
                 raise BlockingIOError(f"Database is locked by another process")
-            os.remove(self.lock_path)
+            try:
+                os.remove(self.lock_path)
+            except FileNotFoundError:
+                pass
+            try:
+                fd = self._create()
+            except FileExistsError:
+                raise BlockingIOError(f"Database is locked by another process")
 
-        with open(self.lock_path, 'w') as f:
+        with os.fdopen(fd, 'w') as f:
             f.write(str(os.getpid()))
         self.lock_acquired = True
         return self
 
+    def _create(self) -> int:
+        return os.open(self.lock_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o644)
+
     def __exit__(self, exc_type, exc_val, exc_tb):
         if self.lock_acquired and os.path.exists(self.lock_path):
             os.remove(self.lock_path)
@@ -77,10 +162,599 @@ class CatalogLock:
 
 
 class CatalogManager:
-    def __init__(self, db_path: str):
+    # Sidecars are rewritten (and the index journal cleared) once the
+    # journal grows past this share of the snapshot's size.
+    JOURNAL_COMPACT_RATIO = 0.25
+
+    def __init__(self, db_path: str, fx_path: Optional[str] = None):
         self.db_path = db_path
+        self.meta_path = f"{db_path}.meta"
+        self.tombstone_path = f"{db_path}.tombstones"
+        self.image_path = f"{db_path}.image"
         self.backup_dir = os.path.join(os.path.dirname(db_path), 'backups')
         os.makedirs(self.backup_dir, exist_ok=True)
+        self.fx = FxTable(fx_path or os.path.join(os.path.dirname(db_path), 'fx_rates.json'))
+        self.prices = PriceHistory(f"{db_path}.prices")
+        self.undo = UndoLog(f"{db_path}.undo")
+        self.journal = IndexJournal(f"{db_path}.journal")
+        self.history = CatalogHistory(self.undo)
+        self.last_batch_id: Optional[str] = None
+
+        self.generation = 0
+        self._base_generation = 0
+        self.indexes: Dict[str, CatalogIndex] = {}
+        self._fingerprint: Optional[Tuple[int, int, int]] = None
+        self._meta_valid = False
+        self._records: Optional[Dict[str, Dict[str, Any]]] = None
+        self._ready_indexes: Set[str] = set()
+        # Generation of each sidecar this manager loaded or wrote.
+        self._sidecar_generations: Dict[str, int] = {}
+        self._tombstones: Dict[str, Dict[str, Any]] = {}
+        self._tombstone_batches: List[Tuple[int, List[Dict[str, Any]]]] = []
+        self._tombstone_offset = 0
+        self._pinned = False
+        self._build_lock = threading.RLock()
+
+        self.register_index(SecondaryIndex())
+        self.register_index(TextIndex())
+        self.register_index(ValidityIndex())
+        self.register_index(PriceIndex())
+        self.register_index(NameLookup())
+        self.register_index(RelatedIndex())
+        self.register_index(RecommenderIndex())
+        self.register_index(ComparisonIndex())
+        self.register_index(QuotePricer())
+        self.register_index(QuoteFragments())
+        self.register_index(CatalogAnalytics())
+        self.register_index(CatalogStats())
+        self.register_index(ExpiryIndex())
+        self.register_index(ContentDigest())
+        self.register_index(ResponseCache())
+
+    def register_index(self, index: CatalogIndex) -> CatalogIndex:
+        self.indexes[index.name] = index
+        self._ready_indexes.discard(index.name)
+        return index
+
+    def _index_path(self, index: CatalogIndex) -> str:
+        return f"{self.db_path}.{index.name}.idx"
+
+    def _snapshot_fingerprint(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.db_path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read_json(self, path: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) else None
+
+    def _write_json(self, path: str, data: Dict[str, Any]):
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        # dumps() runs the C encoder; dump() streams through the Python one.
+        encoded = json.dumps(data, ensure_ascii=False, separators=(',', ':'))
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(encoded)
+        os.replace(tmp_path, path)
+
+    def pin(self):
+        """Load the current snapshot and stop following later writes, so
+        every read sees this one generation (see CatalogHolder). A pinned
+        manager is read-only."""
+        self._records_by_id()
+        self._pinned = True
+
+    def _refresh(self):
+        if self._pinned:
+            return
+        fingerprint = self._snapshot_fingerprint()
+        tombstone_size = self._tombstone_size()
+        if fingerprint == self._fingerprint and (fingerprint is not None or self._records is not None):
+            if tombstone_size == self._tombstone_offset:
+                return
+            if tombstone_size > self._tombstone_offset:
+                self._read_tombstones()
+                return
+
+        meta = self._read_meta()
+        previous = self.generation
+        if fingerprint is None:
+            self.generation = meta.get('generation', 0) if meta else 0
+            self._base_generation = self.generation
+            self._meta_valid = False
+        elif meta is not None and meta.get('fingerprint') == list(fingerprint):
+            self.generation = self._base_generation = meta.get('base', meta['generation'])
+            self._meta_valid = True
+        else:
+            # The snapshot was written behind our back (restore, hand edit):
+            # treat it as a new generation and rebuild derived state.
+            self.generation = (meta.get('generation', 0) if meta else 0) + 1
+            self._base_generation = self.generation
+            self._meta_valid = False
+        if self._fingerprint is not None and self.generation <= previous:
+            self.generation = self._base_generation = previous + 1
+
+        self._fingerprint = fingerprint
+        self._records = None
+        self._ready_indexes = set()
+        self._sidecar_generations = {}
+        self._tombstones = {}
+        self._tombstone_batches = []
+        self._tombstone_offset = 0
+        self._read_tombstones()
+
+    def _tombstone_size(self) -> int:
+        try:
+            return os.path.getsize(self.tombstone_path)
+        except FileNotFoundError:
+            return 0
+
+    def _read_tombstones(self):
+        """Apply delete batches appended since the last read. Batches
+        written against another snapshot (it was rewritten or restored
+        since) no longer apply and are skipped."""
+        try:
+            with open(self.tombstone_path, 'rb') as f:
+                f.seek(self._tombstone_offset)
+                data = f.read()
+        except FileNotFoundError:
+            return
+        # A torn trailing line (crash mid-append) is left for the next read.
+        complete = data[:data.rfind(b'\n') + 1]
+        self._tombstone_offset += len(complete)
+        for line in complete.splitlines():
+            try:
+                batch = json.loads(line)
+            except ValueError:
+                continue
+            if isinstance(batch, dict) and batch.get('base') == self._base_generation:
+                self._apply_tombstones(batch['generation'], batch['records'])
+
+    def _apply_tombstones(self, generation: int, records: List[Dict[str, Any]]):
+        for record in records:
+            product_id = record['product_id']
+            self._tombstones[product_id] = record
+            if self._records is not None:
+                self._records.pop(product_id, None)
+            for name in self._ready_indexes:
+                self.indexes[name].remove(record)
+        self._tombstone_batches.append((generation, records))
+        self.generation = max(self.generation, generation)
+
+    def _read_meta(self) -> Optional[Dict[str, Any]]:
+        meta = self._read_json(self.meta_path)
+        if meta is None or not isinstance(meta.get('generation'), int):
+            return None
+        return meta
+
+    def _write_meta(self):
+        self._write_json(self.meta_path, {
+            'generation': self.generation,
+            'base': self._base_generation,
+            'fingerprint': list(self._fingerprint) if self._fingerprint else None,
+        })
+        self._meta_valid = True
+
+    def _records_by_id(self) -> Dict[str, Dict[str, Any]]:
+        self._refresh()
+        if self._records is None:
+            self._records = {
+                p["product_id"]: p for p in self._load_data()
+                if isinstance(p, dict) and p.get("product_id") and p["product_id"] not in self._tombstones
+            }
+        return self._records
+
+    def _load_index(self, index: CatalogIndex) -> bool:
+        data = self._read_json(self._index_path(index))
+        if data is None:
+            return False
+        generation = data.get('generation')
+        if not isinstance(generation, int) or data.get('version') != index.version:
+            return False
+        if generation > self.generation:
+            return False
+        replay: List[List[Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]] = []
+        if generation < self._base_generation:
+            # Commits since the sidecar was written are in the journal.
+            replay = self.journal.changes_since(generation, self._base_generation)
+            if replay is None:
+                return False
+        index.load_dict(data.get('data', {}))
+        self._sidecar_generations[index.name] = generation
+        for changes in replay:
+            for _, before, after in changes:
+                if before is not None:
+                    index.remove(before)
+                if after is not None:
+                    index.add(after)
+        # The sidecar may predate deletes made since; replay them.
+        for batch_generation, records in self._tombstone_batches:
+            if batch_generation > generation:
+                for record in records:
+                    index.remove(record)
+        return True
+
+    def _save_index(self, index: CatalogIndex):
+        self._write_json(self._index_path(index), {
+            'version': index.version,
+            'generation': self.generation,
+            'data': index.to_dict(),
+        })
+        self._sidecar_generations[index.name] = self.generation
+
+    def get_index(self, name: str) -> CatalogIndex:
+        self._refresh()
+        index = self.indexes[name]
+        if name in self._ready_indexes:
+            return index
+        with self._build_lock:
+            if name not in self._ready_indexes:
+                self._prepare_index(name, index)
+        return index
+
+    def _prepare_index(self, name: str, index: CatalogIndex):
+        if not (index.persistent and self._meta_valid and self._load_index(index)):
+            index.build(self._records_by_id().values())
+            # A pinned snapshot may be stale by now; leave sidecars to writers.
+            if index.persistent and not self._pinned:
+                if not self._meta_valid and self._fingerprint is not None:
+                    # Adopt a snapshot that has no matching meta (first run,
+                    # restore, hand edit) so its sidecars can be reused.
+                    try:
+                        self._write_meta()
+                    except OSError:
+                        pass
+                if self._meta_valid:
+                    try:
+                        self._save_index(index)
+                    except OSError:
+                        pass
+        self._ready_indexes.add(name)
+
+    def _commit(self, product_dict: Dict[str, Dict[str, Any]],
+                changes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+                batch_id: Optional[str] = None) -> Optional[str]:
+        """Write a new snapshot and apply ``changes`` (id -> (before, after))
+        to every index that is already loaded. Non-empty changes are logged
+        to the undo log under ``batch_id`` (generated if not given), which
+        is returned. Must be called under CatalogLock."""
+        if self._pinned:
+            raise RuntimeError("A pinned catalog is read-only")
+        for name, index in self.indexes.items():
+            if index.persistent:
+                self.get_index(name)
+        ready = [self.indexes[name] for name in self._ready_indexes]
+
+        batch_id = (batch_id or self._new_batch_id()) if changes else None
+        persistent = [index for index in ready if index.persistent]
+        # Appending to the journal keeps the sidecars current only if each
+        # one is on disk and the journal already reaches it; otherwise
+        # (first commit, a gap) they are rewritten.
+        sidecars = [self._sidecar_generations.get(index.name) for index in persistent]
+        journal_usable = None not in sidecars and self.journal.covers(
+            min(sidecars, default=self._base_generation), self._base_generation)
+        # Pending deletes are folded into this snapshot, so the journal
+        # records them along with the commit.
+        journal = [
+            (generation, [(record['product_id'], record, None) for record in records])
+            for generation, records in self._tombstone_batches
+        ]
+
+        previous_write = self._fingerprint[1] / 1e9 if self._fingerprint else None
+        self._create_backup()
+        # Tombstoned records are not in product_dict, so rewriting the
+        # snapshot compacts them away.
+        self._save_data(list(product_dict.values()))
+        # Only log generations that were actually written, so as_of() and
+        # rollback never resolve against a batch whose save failed.
+        if changes:
+            self.undo.append(batch_id, self.generation + 1, changes)
+        self.prices.record(changes, time.time(), baseline=previous_write)
+
+        for before, after in changes.values():
+            for index in ready:
+                if before is not None:
+                    index.remove(before)
+                if after is not None:
+                    index.add(after)
+
+        self._records = product_dict
+        self._fingerprint = self._snapshot_fingerprint()
+        self.generation += 1
+        self._base_generation = self.generation
+        self._write_meta()
+        journal.append((self.generation, [(pid, before, after) for pid, (before, after) in changes.items()]))
+        if journal_usable:
+            self.journal.append(journal)
+        snapshot_size = self._fingerprint[2] if self._fingerprint else 0
+        if not journal_usable or self.journal.size() > self.JOURNAL_COMPACT_RATIO * snapshot_size:
+            for index in persistent:
+                self._save_index(index)
+            self.journal.clear()
+        if self._tombstone_batches or self._tombstone_offset:
+            try:
+                os.remove(self.tombstone_path)
+            except FileNotFoundError:
+                pass
+        self._tombstones = {}
+        self._tombstone_batches = []
+        self._tombstone_offset = 0
+        self._refresh_image()
+        return batch_id
+
+    def _refresh_image(self):
+        if os.path.exists(self.image_path):
+            self._write_image()
+
+    def _write_image(self):
+        responses = self.get_index('responses')
+        digest = self.get_index('digest')
+        write_image(
+            self.image_path, self.generation, digest.digest(), self._records_by_id(),
+            responses.product, digest.product_hash, self.catalog_stats(),
+        )
+
+    def write_image(self) -> str:
+        """Build the shared read-only catalog image (``<db>.image``) that
+        multi-process API workers map instead of loading the catalog (see
+        CatalogImage). Once it exists, every commit and delete rebuilds
+        it; remove the file to stop that. Returns its path."""
+        with CatalogLock(self.db_path):
+            self._write_image()
+        return self.image_path
+
+    def _new_batch_id(self) -> str:
+        return f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_g{self.generation + 1}"
+
+    def _lookup(self, field: str, value: Any) -> List[Dict[str, Any]]:
+        ids = self.get_index('secondary').lookup(field, value)
+        records = self._records_by_id()
+        return [copy.deepcopy(records[pid]) for pid in sorted(ids) if pid in records]
+
+    def by_category(self, category: Optional[str]) -> List[Dict[str, Any]]:
+        return self._lookup('category', category)
+
+    def by_city(self, city: Optional[str]) -> List[Dict[str, Any]]:
+        return self._lookup('destination_city', city)
+
+    def by_supplier(self, supplier: Optional[str]) -> List[Dict[str, Any]]:
+        return self._lookup('supplier_name', supplier)
+
+    def by_status(self, active: bool = True) -> List[Dict[str, Any]]:
+        return self._lookup('active', active)
+
+    def facet_counts(self, field: str) -> Dict[Any, int]:
+        return self.get_index('secondary').counts(field)
+
+    def count(self) -> int:
+        return len(self.get_index('stats'))
+
+    def catalog_stats(self) -> Dict[str, Any]:
+        """Totals and per-category/city/supplier counts from the stats
+        sidecar; the catalog itself is only parsed if the sidecar is stale."""
+        return self.get_index('stats').snapshot()
+
+    def recompute_stats(self) -> Dict[str, Any]:
+        """Recount from the catalog, compare with the sidecar and rewrite it
+        if they differ. Returns the fresh counts and the differences found."""
+        with CatalogLock(self.db_path):
+            stored = self.get_index('stats')
+            fresh = CatalogStats()
+            fresh.build(self._records_by_id().values())
+            differences = stored.diff(fresh)
+            if differences:
+                stored.load_dict(fresh.to_dict())
+                if self._meta_valid:
+                    self._save_index(stored)
+        return {'stats': fresh.snapshot(), 'differences': differences}
+
+    def catalog_summary(self) -> Dict[str, Any]:
+        """Totals, active/inactive counts and overall min/median/max price."""
+        return self.get_index('analytics').summary()
+
+    def group_stats(self, field: str, active_only: bool = False) -> List[Dict[str, Any]]:
+        """Per-value counts and min/median/max price for category,
+        destination_city or supplier_name."""
+        return self.get_index('analytics').group_by(field, active_only)
+
+    def duration_histogram(self, by: Optional[str] = None, bins: Optional[List[float]] = None,
+                           active_only: bool = False) -> Dict[str, Any]:
+        return self.get_index('analytics').duration_histogram(by, bins or DURATION_BINS, active_only)
+
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        """A copy of the product's record (changing it doesn't change the
+        catalog; use upsert_batch for that), or None."""
+        record = self._records_by_id().get(product_id)
+        return None if record is None else copy.deepcopy(record)
+
+    def catalog_version(self) -> Tuple[int, str]:
+        """Generation and content digest of the catalog, for cache
+        validators; read from the digest sidecar without parsing the catalog."""
+        digest = self.get_index('digest').digest()
+        return self.generation, digest
+
+    def product_hash(self, product_id: str) -> Optional[str]:
+        """Content hash of one product (changes only when it does)."""
+        return self.get_index('digest').product_hash(product_id)
+
+    def as_of(self, at: Optional[Moment] = None, generation: Optional[int] = None) -> CatalogView:
+        """Read-only view (``get``/``query``/``count``) of the catalog as it
+        was at a timestamp or generation, rebuilt from the undo log and
+        cached. Raises ValueError outside the retained history."""
+        if (at is None) == (generation is None):
+            raise ValueError("as_of needs either a timestamp or a generation")
+        self._refresh()
+        if generation is None:
+            generation = self.history.generation_at(at)
+        return self.history.view(self, generation)
+
+    def conversion(self, currency: Optional[str] = None, on: Optional[DateLike] = None) -> Conversion:
+        """The AED -> ``currency`` rate effective on ``on`` (default today)."""
+        return self.fx.conversion(currency or BASE_CURRENCY, on)
+
+    def query(self, where: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+              order_by: Optional[List[str]] = None, limit: Optional[int] = None, offset: int = 0,
+              cursor: Optional[str] = None, currency: Optional[str] = None,
+              rate_date: Optional[DateLike] = None) -> Dict[str, Any]:
+        return catalog_query.execute(
+            self, where=where, fields=fields, order_by=order_by,
+            limit=limit, offset=offset, cursor=cursor,
+            conversion=self.conversion(currency, rate_date),
+        )
+
+    def available_on(self, day: DateLike, filters: Optional[Dict[str, Any]] = None,
+                     fields: Optional[List[str]] = None,
+                     include_inactive: bool = False) -> List[Dict[str, Any]]:
+        """Products that can be sold on ``day``: active, with a pricing
+        tier valid that day. ``include_inactive`` also returns inactive
+        products with a valid tier."""
+        accept = catalog_query.compile_filter(self, filters)
+        ids = self.get_index('validity').products_on(day)
+        if not include_inactive:
+            ids = ids & self.get_index('secondary').lookup('active', True)
+        records = self._records_by_id()
+        return [
+            catalog_query.project(records[pid], fields) for pid in sorted(ids)
+            if pid in records and (accept is None or accept(pid))
+        ]
+
+    def in_price_range(self, low: Optional[float] = None, high: Optional[float] = None,
+                       filters: Optional[Dict[str, Any]] = None,
+                       fields: Optional[List[str]] = None, currency: Optional[str] = None,
+                       rate_date: Optional[DateLike] = None) -> List[Dict[str, Any]]:
+        """Products with at least one tier priced within [low, high], cheapest
+        first. Bounds (and ``price`` filters/fields) are in ``currency``."""
+        conversion = self.conversion(currency, rate_date)
+        accept = catalog_query.compile_filter(self, filters, conversion)
+        virtual = catalog_query.virtual_fields(conversion)
+        records = self._records_by_id()
+        seen: Set[str] = set()
+        results = []
+        for _, product_id, _ in self.get_index('price').tiers_between(low, high, conversion=conversion):
+            if product_id in seen or product_id not in records:
+                continue
+            seen.add(product_id)
+            if accept is None or accept(product_id):
+                results.append(catalog_query.project(records[product_id], fields, virtual))
+        return results
+
+    def cheapest_tier(self, product_id: str, currency: Optional[str] = None,
+                      rate_date: Optional[DateLike] = None) -> Optional[Dict[str, Any]]:
+        """The cheapest pricing tier; outside AED it also carries
+        ``converted_price`` and ``converted_currency``."""
+        conversion = self.conversion(currency, rate_date)
+        found = self.get_index('price').cheapest_tier(product_id)
+        product = self.get(product_id)
+        if found is None or product is None:
+            return None
+        tier = product['pricing'][found[1]]
+        if conversion.identity:
+            return tier
+        return dict(tier, converted_price=conversion.convert(found[0]), converted_currency=conversion.currency)
+
+    def suggest(self, prefix: str, k: int = 10) -> List[Dict[str, Any]]:
+        return [
+            {'product_id': pid, 'product_name': name}
+            for pid, name in self.get_index('names').suggest(prefix, k)
+        ]
+
+    def fuzzy(self, name: str, k: int = 10, min_similarity: float = 0.45) -> List[Dict[str, Any]]:
+        return [
+            {'product_id': pid, 'product_name': product_name, 'score': score}
+            for pid, product_name, score in self.get_index('names').fuzzy(name, k, min_similarity)
+        ]
+
+    def related(self, product_id: str, k: int = 5, filters: Optional[Dict[str, Any]] = None,
+                fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Most similar products to ``product_id`` by TF-IDF cosine similarity."""
+        accept = catalog_query.compile_filter(self, filters)
+        hits = self.get_index('related').related(product_id, k=k, accept=accept)
+        records = self._records_by_id()
+        results = []
+        for other, score in hits:
+            item = catalog_query.project(records[other], fields)
+            item['score'] = round(score, 4)
+            results.append(item)
+        return results
+
+    def compare(self, product_ids: List[str], fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        """Side-by-side view of up to three products: records with derived
+        price/tier/duration fields, inclusion and exclusion set differences
+        across all of them, and pairwise diffs."""
+        result = self.get_index('comparison').compare(product_ids)
+        records = self._records_by_id()
+        products = []
+        for product_id, derived in result.pop('derived').items():
+            item = catalog_query.project(records[product_id], fields)
+            item.update(derived)
+            products.append(item)
+        result['products'] = products
+        return result
+
+    def price_history(self, product_id: str, since: Optional[Moment] = None) -> List[Dict[str, Any]]:
+        """Recorded tier prices of a product (timestamp, tier, price_aed), oldest first."""
+        return self.prices.history(product_id, since)
+
+    def price_movers(self, since: Moment, k: int = 10, by: str = 'amount') -> List[Dict[str, Any]]:
+        """Tiers whose price moved most since ``since``, by absolute amount or percent."""
+        return self.prices.movers(since, k, by)
+
+    def price_quote(self, lines: List[Dict[str, Any]], travel_date: DateLike, pax: Pax = 1,
+                    currency: Optional[str] = None, rate_date: Optional[DateLike] = None) -> Dict[str, Any]:
+        """Price quote lines (product_id, optional tier_name/quantity) for a
+        travel date, in ``currency`` at the rate effective on ``rate_date``
+        (default today)."""
+        conversion = self.conversion(currency, rate_date)
+        return self.get_index('quotes').price_quote(lines, travel_date, pax, conversion)
+
+    def price_quotes(self, quotes: List[Dict[str, Any]], currency: Optional[str] = None,
+                     rate_date: Optional[DateLike] = None) -> List[Dict[str, Any]]:
+        return self.get_index('quotes').price_quotes(quotes, self.conversion(currency, rate_date))
+
+    def render_quotes(self, quotes: Iterable[Dict[str, Any]], fmt: str = 'text',
+                      workers: Optional[int] = None) -> Iterator[str]:
+        """Render QuoteData dicts as the frontend's text or HTML export,
+        with catalog fragments for any ``products`` they list."""
+        quotes = list(quotes)
+        product_ids = {pid for quote in quotes for pid in quote.get('products') or []}
+        fragments = self.get_index('fragments').fragments(product_ids, fmt)
+        return render_quotes(quotes, fmt, fragments, workers)
+
+    def recommend_many(self, answers_list: List[Dict[str, str]], k: int = 3,
+                       fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        """Score several questionnaires (group/interest/budget/time, optional city) in one pass."""
+        ranked = self.get_index('recommender').recommend_many(answers_list, k=k)
+        records = self._records_by_id()
+        results = []
+        for answers, hits in zip(answers_list, ranked):
+            products = []
+            for product_id, score in hits:
+                item = catalog_query.project(records[product_id], fields)
+                item['score'] = round(score, 4)
+                products.append(item)
+            results.append({'products': products, 'tips': tips_for(answers)})
+        return results
+
+    def recommend(self, answers: Dict[str, str], k: int = 3,
+                  fields: Optional[List[str]] = None) -> Dict[str, Any]:
+        return self.recommend_many([answers], k=k, fields=fields)[0]
+
+    def search(self, text: str, filters: Optional[Dict[str, Any]] = None, k: int = 10,
+               fields: Optional[List[str]] = None) -> List[Dict[str, Any]]:
+        accept = catalog_query.compile_filter(self, filters)
+        hits = self.get_index('text').search(text, k=k, accept=accept)
+        records = self._records_by_id()
+        results = []
+        for product_id, score in hits:
+            item = catalog_query.project(records[product_id], fields)
+            item['score'] = round(score, 4)
+            results.append(item)
+        return results
 
     def _create_backup(self) -> Optional[str]:
         if not os.path.exists(self.db_path):
@@ -103,6 +777,11 @@ class CatalogManager:
             except (OSError, ValueError):
                 pass
 
+        try:
+            self.undo.prune(cutoff.timestamp())
+        except (OSError, ValueError):
+            pass
+
     def _load_data(self) -> List[Dict[str, Any]]:
         if not os.path.exists(self.db_path):
             return []
@@ -121,12 +800,151 @@ class CatalogManager:
         
         os.replace(tmp_path, self.db_path)
 
-    def upsert_batch(self, new_products: List[Dict[str, Any]]) -> int:
+    def expire(self, today: Optional[DateLike] = None, dry_run: bool = False) -> List[str]:
+        """Deactivate active products whose every tier ended before ``today``
+        (default: the current date) in one commit and return their ids.
+        Only due entries are popped from the expiry heap; the catalog is not
+        read unless something is due."""
+        day = date.today().toordinal() if today is None else to_ordinal(today)
         with CatalogLock(self.db_path):
-            existing_data = self._load_data()
-            product_dict = {
-                p["product_id"]: p for p in existing_data if isinstance(p, dict) and p.get("product_id")
+            index = self.get_index('expiry')
+            due = index.pop_due(day)
+            if dry_run or not due:
+                index.restore(due)
+                return sorted(due)
+            try:
+                existing = self._records_by_id()
+                product_dict = dict(existing)
+                changes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = {}
+                for product_id in due:
+                    record = dict(existing[product_id], active=False)
+                    product_dict[product_id] = record
+                    changes[product_id] = (existing[product_id], record)
+                self._commit(product_dict, changes)
+            finally:
+                index.restore(due)
+            self._cleanup_old_backups()
+        return sorted(due)
+
+    def patch_where(self, where: Dict[str, Any], changes: Dict[str, Any],
+                    dry_run: bool = False) -> Dict[str, Any]:
+        """Apply the same partial update to every product matching ``where``
+        (``query()`` syntax, planned on the indexes) in one commit.
+
+        ``changes`` is validated once per field instead of re-validating each
+        record; products it would not alter are left out of the commit.
+        Returns the matched and updated counts and the updated ids.
+        """
+        if not where:
+            raise ValueError("patch_where needs a non-empty filter")
+        values = validate_fields(changes)
+        predicates = catalog_query.parse_where(where, Product.model_fields)
+        with CatalogLock(self.db_path):
+            candidate_ids, residual, _ = catalog_query.plan(self, predicates)
+            existing = self._records_by_id()
+            candidates = existing if candidate_ids is None else candidate_ids
+            matched = sorted(
+                pid for pid in candidates
+                if pid in existing and catalog_query.matches(existing[pid], residual)
+            )
+            updated = [
+                pid for pid in matched
+                if any(existing[pid].get(field) != value for field, value in values.items())
+            ]
+            if updated and not dry_run:
+                product_dict = dict(existing)
+                commit_changes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = {}
+                for product_id in updated:
+                    record = dict(existing[product_id])
+                    record.update(copy.deepcopy(values))
+                    product_dict[product_id] = record
+                    commit_changes[product_id] = (existing[product_id], record)
+                self._commit(product_dict, commit_changes)
+                self._cleanup_old_backups()
+        return {'matched': len(matched), 'updated': len(updated), 'ids': updated}
+
+    def delete(self, product_ids: Iterable[str]) -> List[str]:
+        """Delete products by appending one tombstone batch (their current
+        records) to ``<db>.tombstones`` instead of rewriting the snapshot.
+        Readers and indexes skip tombstoned products from then on, and the
+        next snapshot rewrite drops them. Returns the ids that existed."""
+        with CatalogLock(self.db_path):
+            existing = self._records_by_id()
+            deleted = sorted({pid for pid in product_ids if pid in existing})
+            if not deleted:
+                return []
+            if not self._meta_valid:
+                self._write_meta()
+            records = [existing[pid] for pid in deleted]
+            batch = {
+                'generation': self.generation + 1,
+                'base': self._base_generation,
+                'deleted_at': time.time(),
+                'records': records,
             }
+            line = json.dumps(batch, ensure_ascii=False).encode('utf-8') + b'\n'
+            if self._tombstone_size() != self._tombstone_offset:
+                # Drop a torn trailing line so this batch starts on its own line.
+                os.truncate(self.tombstone_path, self._tombstone_offset)
+            with open(self.tombstone_path, 'ab') as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self._tombstone_offset += len(line)
+            self.undo.append(self._new_batch_id(), batch['generation'], {pid: (existing[pid], None) for pid in deleted})
+            self._apply_tombstones(batch['generation'], records)
+            self._write_meta()
+            self._refresh_image()
+        return deleted
+
+    def compact(self) -> int:
+        """Rewrite the snapshot without tombstoned products now rather than
+        at the next write. Returns how many records were dropped."""
+        with CatalogLock(self.db_path):
+            existing = self._records_by_id()
+            dropped = len(self._tombstones)
+            if dropped:
+                self._commit(dict(existing), {})
+                self._cleanup_old_backups()
+        return dropped
+
+    def rollback(self, batch_id: str, skip_conflicts: bool = False,
+                 dry_run: bool = False) -> Dict[str, Any]:
+        """Restore the records a logged batch touched to their state before
+        it, reading only that batch's undo entry. Products modified since
+        the batch are conflicts: by default nothing is restored if there
+        are any, with ``skip_conflicts`` the rest are. The rollback is
+        itself a logged batch (``rollback_batch``)."""
+        with CatalogLock(self.db_path):
+            entry = self.undo.find(batch_id)
+            if entry is None:
+                raise ValueError(f"Unknown batch: {batch_id}")
+            existing = self._records_by_id()
+            changes, conflicts = UndoLog.plan(entry, existing)
+            result = {'batch': batch_id, 'restored': [], 'conflicts': conflicts, 'rollback_batch': None}
+            if (conflicts and not skip_conflicts) or not changes:
+                return result
+            result['restored'] = sorted(changes)
+            if dry_run:
+                return result
+            product_dict = dict(existing)
+            for product_id, (_, before) in changes.items():
+                if before is None:
+                    del product_dict[product_id]
+                else:
+                    product_dict[product_id] = before
+            result['rollback_batch'] = self._commit(product_dict, changes)
+            self._cleanup_old_backups()
+        return result
+
+    def upsert_batch(self, new_products: List[Dict[str, Any]], batch_id: Optional[str] = None) -> int:
+        """Validate and merge ``new_products`` into the catalog in one
+        commit, logged for ``rollback()`` under ``batch_id`` (generated if
+        not given; see ``last_batch_id``)."""
+        with CatalogLock(self.db_path):
+            existing = self._records_by_id()
+            product_dict = dict(existing)
+            changes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = {}
 
             validated_count = 0
 
@@ -135,25 +953,56 @@ class CatalogManager:
                     raise ValueError(f"Invalid product record at index {idx}: expected object")
 
                 product_id = product_data.get("product_id")
-                base = product_dict.get(product_id, {}) if product_id else {}
-                merged: Dict[str, Any] = dict(base)
-                merged.update(product_data)
-
                 try:
-                    product = Product(**merged)
+                    self._merge(product_data, existing, product_dict, changes)
                 except ValidationError as e:
                     raise ValidationError.from_exception_data(
                         title=f"Validation failed for product: {product_id or '<missing product_id>'}",
                         line_errors=e.errors(),
                     )
-
-                product_dict[product.product_id] = product.model_dump()
                 validated_count += 1
 
-            self._create_backup()
-            updated_list = list(product_dict.values())
-            self._save_data(updated_list)
+            self.last_batch_id = self._commit(product_dict, changes, batch_id)
 
             self._cleanup_old_backups()
 
         return validated_count
+
+    def upsert_each(self, new_products: List[Dict[str, Any]], batch_id: Optional[str] = None) -> List[Optional[str]]:
+        """Like ``upsert_batch``, but a record that fails validation is
+        skipped rather than failing the batch; the rest are written in one
+        commit. Returns one error message per record (None if written)."""
+        with CatalogLock(self.db_path):
+            existing = self._records_by_id()
+            product_dict = dict(existing)
+            changes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]] = {}
+            errors: List[Optional[str]] = []
+            for product_data in new_products:
+                if not isinstance(product_data, dict):
+                    errors.append("expected a JSON object")
+                    continue
+                try:
+                    self._merge(product_data, existing, product_dict, changes)
+                except ValidationError as e:
+                    errors.append(validation_message(e))
+                else:
+                    errors.append(None)
+
+            self.last_batch_id = self._commit(product_dict, changes, batch_id) if changes else None
+            if changes:
+                self._cleanup_old_backups()
+        return errors
+
+    @staticmethod
+    def _merge(product_data: Dict[str, Any], existing: Dict[str, Dict[str, Any]],
+               product_dict: Dict[str, Dict[str, Any]],
+               changes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]):
+        """Validate one (possibly partial) record over its current version
+        in ``product_dict`` and stage it there and in ``changes``."""
+        product_id = product_data.get("product_id")
+        base = product_dict.get(product_id, {}) if product_id else {}
+        merged: Dict[str, Any] = dict(base)
+        merged.update(product_data)
+        record = Product(**merged).model_dump()
+        product_dict[record['product_id']] = record
+        changes[record['product_id']] = (existing.get(record['product_id']), record)
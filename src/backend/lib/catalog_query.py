@@ -0,0 +1,293 @@
+import base64
+import copy
+import heapq
+import json
+from functools import total_ordering
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+from .fx import IDENTITY, Conversion
+
+OPERATORS: Dict[str, Callable[[Any, Any], bool]] = {
+    'eq': lambda value, operand: value == operand,
+    'ne': lambda value, operand: value != operand,
+    'in': lambda value, operand: value in operand,
+    'nin': lambda value, operand: value not in operand,
+    'gt': lambda value, operand: value is not None and value > operand,
+    'gte': lambda value, operand: value is not None and value >= operand,
+    'lt': lambda value, operand: value is not None and value < operand,
+    'lte': lambda value, operand: value is not None and value <= operand,
+    'contains': lambda value, operand: operand in (value or []),
+    'contains_all': lambda value, operand: set(operand) <= set(value or []),
+}
+
+# Fields derived from the record rather than stored on it.
+VIRTUAL_FIELDS: Dict[str, Callable[[Dict[str, Any]], Any]] = {
+    'price': lambda p: min((t['price_aed'] for t in p.get('pricing') or []), default=None),
+}
+
+Predicate = Tuple[str, str, Any]
+Getters = Dict[str, Callable[[Dict[str, Any]], Any]]
+
+
+def virtual_fields(conversion: Conversion = IDENTITY) -> Getters:
+    """VIRTUAL_FIELDS with ``price`` reported in the conversion's currency."""
+    if conversion.identity:
+        return VIRTUAL_FIELDS
+    base_price = VIRTUAL_FIELDS['price']
+    return dict(VIRTUAL_FIELDS, price=lambda p: conversion.convert(base_price(p)))
+
+
+@total_ordering
+class _Descending:
+    __slots__ = ('value',)
+
+    def __init__(self, value):
+        self.value = value
+
+    def __eq__(self, other):
+        return self.value == other.value
+
+    def __lt__(self, other):
+        return other.value < self.value
+
+
+def field_value(product: Dict[str, Any], field: str, virtual: Getters = VIRTUAL_FIELDS) -> Any:
+    getter = virtual.get(field)
+    if getter is not None:
+        return getter(product)
+    if field == 'active':
+        return product.get('active', True)
+    return product.get(field)
+
+
+def parse_where(where: Optional[Dict[str, Any]], known_fields: Iterable[str]) -> List[Predicate]:
+    if where is not None and not isinstance(where, dict):
+        raise ValueError("where must be a JSON object")
+    known = set(known_fields) | set(VIRTUAL_FIELDS)
+    predicates: List[Predicate] = []
+    for field, condition in (where or {}).items():
+        if field not in known:
+            raise ValueError(f"Unknown query field: {field}")
+        if isinstance(condition, dict):
+            for op, operand in condition.items():
+                if op not in OPERATORS:
+                    raise ValueError(f"Unknown operator '{op}' for field {field}")
+                if op in ('in', 'nin', 'contains_all'):
+                    operand = list(operand)
+                predicates.append((field, op, operand))
+        else:
+            predicates.append((field, 'eq', condition))
+    return predicates
+
+
+def matches(product: Dict[str, Any], predicates: Sequence[Predicate], virtual: Getters = VIRTUAL_FIELDS) -> bool:
+    for field, op, operand in predicates:
+        try:
+            if not OPERATORS[op](field_value(product, field, virtual), operand):
+                return False
+        except TypeError:
+            return False
+    return True
+
+
+PRICE_RANGE_OPERATORS = ('eq', 'gt', 'gte', 'lt', 'lte')
+
+
+def _price_candidates(manager, predicates: Sequence[Predicate], conversion: Conversion) -> Set[str]:
+    low: Optional[float] = None
+    high: Optional[float] = None
+    include_low = include_high = True
+    for _, op, operand in predicates:
+        if op in ('eq', 'gt', 'gte') and (low is None or operand > low or (operand == low and op == 'gt')):
+            low, include_low = operand, op != 'gt'
+        if op in ('eq', 'lt', 'lte') and (high is None or operand < high or (operand == high and op == 'lt')):
+            high, include_high = operand, op != 'lt'
+    return set(manager.get_index('price').products_by_min_price(low, high, include_low, include_high, conversion))
+
+
+def plan(manager, predicates: Sequence[Predicate],
+         conversion: Conversion = IDENTITY) -> Tuple[Optional[Set[str]], List[Predicate], Dict[str, Any]]:
+    """Pick index-backed predicates, most selective first, and return the
+    candidate ids, the predicates left to check per record and a plan summary.
+    Price bounds are in the conversion's currency."""
+    secondary = manager.get_index('secondary')
+    access: List[Tuple[Set[str], Predicate]] = []
+    residual: List[Predicate] = []
+    price_range: List[Predicate] = []
+
+    for predicate in predicates:
+        field, op, operand = predicate
+        if field == 'price' and op in PRICE_RANGE_OPERATORS and isinstance(operand, (int, float)):
+            price_range.append(predicate)
+        elif field in secondary.FIELDS and op == 'eq':
+            access.append((secondary.lookup(field, operand), predicate))
+        elif field in secondary.FIELDS and op == 'in':
+            ids: Set[str] = set()
+            for value in operand:
+                ids |= secondary.lookup(field, value)
+            access.append((ids, predicate))
+        else:
+            residual.append(predicate)
+
+    if price_range:
+        access.append((_price_candidates(manager, price_range, conversion), ('price', 'range', None)))
+
+    if not access:
+        return None, residual, {'strategy': 'scan', 'indexes': []}
+
+    access.sort(key=lambda item: len(item[0]))
+    candidates = set(access[0][0])
+    for ids, _ in access[1:]:
+        candidates &= ids
+        if not candidates:
+            break
+    return candidates, residual, {
+        'strategy': 'index',
+        'indexes': [f"{predicate[0]}:{predicate[1]}" for _, predicate in access],
+        'candidates': len(candidates),
+    }
+
+
+def compile_filter(manager, where: Optional[Dict[str, Any]],
+                   conversion: Conversion = IDENTITY) -> Optional[Callable[[str], bool]]:
+    """Turn a ``where`` mapping into a product-id predicate for index-driven
+    readers (search, availability) that produce their own candidates."""
+    if not where:
+        return None
+    from .catalog_manager import Product
+
+    predicates = parse_where(where, Product.model_fields)
+    candidate_ids, residual, _ = plan(manager, predicates, conversion)
+    records = manager._records_by_id()
+    virtual = virtual_fields(conversion)
+
+    def accept(product_id: str) -> bool:
+        if candidate_ids is not None and product_id not in candidate_ids:
+            return False
+        product = records.get(product_id)
+        return product is not None and matches(product, residual, virtual)
+
+    return accept
+
+
+def _parse_order(order_by: Optional[Sequence[str]]) -> List[Tuple[str, bool]]:
+    order: List[Tuple[str, bool]] = []
+    for key in order_by or []:
+        descending = key.startswith('-')
+        order.append((key.lstrip('-+'), descending))
+    return order
+
+
+def _raw_key(product: Dict[str, Any], order: Sequence[Tuple[str, bool]],
+             virtual: Getters = VIRTUAL_FIELDS) -> List[Any]:
+    return [field_value(product, field, virtual) for field, _ in order] + [product['product_id']]
+
+
+def _key_from_raw(raw: List[Any], order: Sequence[Tuple[str, bool]]) -> Tuple:
+    key: List[Any] = []
+    for value, (_, descending) in zip(raw, order):
+        # Missing values always sort last, whatever the direction.
+        key.append((1, None) if value is None else (0, _Descending(value) if descending else value))
+    key.append(raw[-1])
+    return tuple(key)
+
+
+def _sort_key(product: Dict[str, Any], order: Sequence[Tuple[str, bool]],
+              virtual: Getters = VIRTUAL_FIELDS) -> Tuple:
+    return _key_from_raw(_raw_key(product, order, virtual), order)
+
+
+def encode_cursor(raw: List[Any], order: Sequence[Tuple[str, bool]], currency: str = IDENTITY.currency) -> str:
+    payload = {'o': [[f, d] for f, d in order], 'k': raw}
+    if currency != IDENTITY.currency:
+        payload['c'] = currency
+    payload = json.dumps(payload, separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, order: Sequence[Tuple[str, bool]], currency: str = IDENTITY.currency) -> Tuple:
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f"Invalid cursor: {e}")
+    if not isinstance(payload, dict):
+        raise ValueError("Invalid cursor")
+    cursor_order = payload.get('o', [])
+    if (not isinstance(cursor_order, list) or not all(isinstance(item, list) for item in cursor_order)
+            or [tuple(item) for item in cursor_order] != list(order)):
+        raise ValueError("Cursor does not belong to this sort order")
+    if payload.get('c', IDENTITY.currency) != currency:
+        raise ValueError("Cursor does not belong to this currency")
+    # One value per sort field, then the product_id tie-breaker.
+    raw = payload.get('k')
+    if not isinstance(raw, list) or len(raw) != len(order) + 1 or not isinstance(raw[-1], str):
+        raise ValueError("Invalid cursor")
+    return _key_from_raw(raw, order)
+
+
+def project(product: Dict[str, Any], fields: Optional[Sequence[str]],
+            virtual: Getters = VIRTUAL_FIELDS) -> Dict[str, Any]:
+    """A copy of ``product`` (only ``product_id`` and ``fields`` if given)
+    that callers may change without touching the catalog's records."""
+    if not fields:
+        return copy.deepcopy(product)
+    projected = {'product_id': product['product_id']}
+    for field in fields:
+        projected[field] = copy.deepcopy(field_value(product, field, virtual))
+    return projected
+
+
+def execute(manager, where: Optional[Dict[str, Any]] = None, fields: Optional[Sequence[str]] = None,
+            order_by: Optional[Sequence[str]] = None, limit: Optional[int] = None, offset: int = 0,
+            cursor: Optional[str] = None, conversion: Conversion = IDENTITY) -> Dict[str, Any]:
+    """Run a query. With a conversion, the virtual ``price`` field (filters,
+    sort keys and projections) is in that currency."""
+    from .catalog_manager import Product
+
+    known_fields = list(Product.model_fields)
+    predicates = parse_where(where, known_fields)
+    for field in fields or []:
+        if field not in known_fields and field not in VIRTUAL_FIELDS:
+            raise ValueError(f"Unknown projection field: {field}")
+    order = _parse_order(order_by)
+    for field, _ in order:
+        if field not in known_fields and field not in VIRTUAL_FIELDS:
+            raise ValueError(f"Unknown sort field: {field}")
+    if offset < 0 or (limit is not None and limit < 0):
+        raise ValueError("limit and offset must be non-negative")
+
+    candidate_ids, residual, summary = plan(manager, predicates, conversion)
+    if not conversion.identity:
+        summary['currency'] = conversion.currency
+    virtual = virtual_fields(conversion)
+    records = manager._records_by_id()
+    if candidate_ids is None:
+        candidates: Iterable[Dict[str, Any]] = records.values()
+    else:
+        candidates = (records[pid] for pid in candidate_ids if pid in records)
+
+    rows = [p for p in candidates if matches(p, residual, virtual)]
+    total = len(rows)
+
+    if cursor:
+        after = decode_cursor(cursor, order, conversion.currency)
+        rows = [p for p in rows if _sort_key(p, order, virtual) > after]
+
+    def key(p):
+        return _sort_key(p, order, virtual)
+
+    if limit is not None:
+        page = heapq.nsmallest(offset + limit, rows, key=key)[offset:]
+    else:
+        page = sorted(rows, key=key)[offset:]
+
+    next_cursor = None
+    if limit is not None and page and len(rows) > offset + len(page):
+        next_cursor = encode_cursor(_raw_key(page[-1], order, virtual), order, conversion.currency)
+
+    return {
+        'items': [project(p, fields, virtual) for p in page],
+        'total': total,
+        'next_cursor': next_cursor,
+        'plan': summary,
+    }
@@ -0,0 +1,91 @@
+from typing import Any, Dict, List, Optional
+
+from .catalog_analytics import GROUP_FIELDS
+from .catalog_index import CatalogIndex
+
+
+class CatalogStats(CatalogIndex):
+    """Running counts persisted as a small sidecar (``<db_path>.stats.idx``).
+
+    Every commit applies its changes as deltas (-1 for the old record, +1
+    for the new one), so reading totals, active/inactive and per-category,
+    city and supplier counts costs a stat and one tiny JSON read instead of
+    parsing the catalog. ``CatalogManager.recompute_stats()`` (``manage.py
+    stats --recompute``) rebuilds it from the records to check for drift.
+    """
+
+    name = "stats"
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.total = 0
+        self.active = 0
+        self._groups: Dict[str, Dict[Optional[str], int]] = {field: {} for field in GROUP_FIELDS}
+
+    def __len__(self) -> int:
+        return self.total
+
+    def _apply(self, product: Dict[str, Any], delta: int):
+        self.total += delta
+        if product.get('active', True):
+            self.active += delta
+        for field, counts in self._groups.items():
+            value = product.get(field) or None
+            count = counts.get(value, 0) + delta
+            if count:
+                counts[value] = count
+            else:
+                counts.pop(value, None)
+
+    def add(self, product: Dict[str, Any]):
+        self._apply(product, 1)
+
+    def remove(self, product: Dict[str, Any]):
+        self._apply(product, -1)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'active': self.active,
+            'groups': {field: [[value, count] for value, count in counts.items()]
+                       for field, counts in self._groups.items()},
+        }
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+        self.total = data.get('total', 0)
+        self.active = data.get('active', 0)
+        for field, pairs in (data.get('groups') or {}).items():
+            if field in self._groups:
+                self._groups[field] = {value: count for value, count in pairs}
+
+    def counts(self, field: str) -> List[Dict[str, Any]]:
+        """Per-value counts, largest first; missing values count under None."""
+        if field not in self._groups:
+            raise ValueError(f"No counts for {field} (expected one of {', '.join(GROUP_FIELDS)})")
+        groups = [{'value': value, 'count': count} for value, count in self._groups[field].items()]
+        groups.sort(key=lambda group: (-group['count'], group['value'] is None, group['value'] or ''))
+        return groups
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            'total': self.total,
+            'active': self.active,
+            'inactive': self.total - self.active,
+            'groups': {field: self.counts(field) for field in GROUP_FIELDS},
+        }
+
+    def diff(self, other: 'CatalogStats') -> List[str]:
+        """Human-readable differences between two sets of counts."""
+        differences = []
+        for label in ('total', 'active'):
+            if getattr(self, label) != getattr(other, label):
+                differences.append(f"{label}: {getattr(self, label)} != {getattr(other, label)}")
+        for field in GROUP_FIELDS:
+            mine, theirs = self._groups[field], other._groups[field]
+            for value in sorted(set(mine) | set(theirs), key=lambda v: (v is None, v or '')):
+                if mine.get(value, 0) != theirs.get(value, 0):
+                    differences.append(f"{field}={value}: {mine.get(value, 0)} != {theirs.get(value, 0)}")
+        return differences
@@ -0,0 +1,150 @@
+import sys
+from collections import OrderedDict
+from typing import Any, Dict, FrozenSet, List, Optional, Tuple
+
+from .catalog_index import CatalogIndex
+
+MAX_COMPARE = 3
+SET_FIELDS = ('inclusions', 'exclusions')
+
+
+def _interned_items(values: Optional[List[str]]) -> FrozenSet[str]:
+    return frozenset(sys.intern(' '.join(str(value).split())) for value in values or () if value)
+
+
+class ComparisonIndex(CatalogIndex):
+    """Derived comparison fields per product and a memo of pairwise diffs.
+
+    Inclusion and exclusion strings are interned and identical sets are
+    shared between products (and dropped with the last product using
+    them), so set differences hash pointers rather than rehashing text. Pair diffs are cached until either product changes;
+    the whole cache goes with the catalog generation like other indexes.
+    """
+
+    name = "comparison"
+    persistent = False
+    MAX_PAIRS = 4096
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._summaries: Dict[str, Dict[str, Any]] = {}
+        self._sets: Dict[str, Tuple[FrozenSet[str], ...]] = {}
+        # Interned set -> (the shared instance, how many product sets use it).
+        self._shared: Dict[FrozenSet[str], Tuple[FrozenSet[str], int]] = {}
+        self._pairs: 'OrderedDict[Tuple[str, str], Dict[str, Any]]' = OrderedDict()
+        self._pairs_of: Dict[str, set] = {}
+
+    def __len__(self) -> int:
+        return len(self._summaries)
+
+    def add(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        self._forget_pairs(product_id)
+        prices = [float(tier['price_aed']) for tier in product.get('pricing') or []]
+        self._summaries[product_id] = {
+            'min_price': min(prices) if prices else None,
+            'max_price': max(prices) if prices else None,
+            'tier_count': len(prices),
+            'duration_hours': product.get('duration_hours'),
+        }
+        self._release(product_id)
+        self._sets[product_id] = tuple(
+            self._share(_interned_items(product.get(field))) for field in SET_FIELDS
+        )
+
+    def remove(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        self._forget_pairs(product_id)
+        self._summaries.pop(product_id, None)
+        self._release(product_id)
+
+    def _share(self, items: FrozenSet[str]) -> FrozenSet[str]:
+        shared, users = self._shared.get(items, (items, 0))
+        self._shared[items] = (shared, users + 1)
+        return shared
+
+    def _release(self, product_id: str):
+        for items in self._sets.pop(product_id, ()):
+            shared, users = self._shared[items]
+            if users > 1:
+                self._shared[items] = (shared, users - 1)
+            else:
+                del self._shared[items]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+
+    def _forget_pairs(self, product_id: str):
+        for key in self._pairs_of.pop(product_id, ()):
+            if self._pairs.pop(key, None) is not None:
+                other = key[1] if key[0] == product_id else key[0]
+                self._pairs_of.get(other, set()).discard(key)
+
+    def _pair(self, a: str, b: str) -> Dict[str, Any]:
+        key = (a, b) if a < b else (b, a)
+        cached = self._pairs.get(key)
+        if cached is not None:
+            self._pairs.move_to_end(key)
+        else:
+            first, second = key
+            cached = {}
+            for field, left, right in zip(SET_FIELDS, self._sets[first], self._sets[second]):
+                cached[field] = {
+                    'shared': tuple(sorted(left & right)),
+                    'only_a': tuple(sorted(left - right)),
+                    'only_b': tuple(sorted(right - left)),
+                }
+            cached['price_delta'] = self._delta(first, second, 'min_price')
+            cached['duration_delta'] = self._delta(first, second, 'duration_hours')
+            self._pairs[key] = cached
+            self._pairs_of.setdefault(first, set()).add(key)
+            self._pairs_of.setdefault(second, set()).add(key)
+            if len(self._pairs) > self.MAX_PAIRS:
+                old_key, _ = self._pairs.popitem(last=False)
+                for pid in old_key:
+                    self._pairs_of.get(pid, set()).discard(old_key)
+
+        if key == (a, b):
+            # Callers get their own field dicts; the memoised ones stay intact.
+            return dict(cached, **{field: dict(cached[field]) for field in SET_FIELDS}, a=a, b=b)
+        flipped = {
+            field: {'shared': diff['shared'], 'only_a': diff['only_b'], 'only_b': diff['only_a']}
+            for field, diff in ((field, cached[field]) for field in SET_FIELDS)
+        }
+        for field in ('price_delta', 'duration_delta'):
+            flipped[field] = None if cached[field] is None else -cached[field]
+        return dict(flipped, a=a, b=b)
+
+    def _delta(self, a: str, b: str, field: str) -> Optional[float]:
+        left = self._summaries[a][field]
+        right = self._summaries[b][field]
+        if left is None or right is None:
+            return None
+        return round(right - left, 2)
+
+    def compare(self, product_ids: List[str]) -> Dict[str, Any]:
+        ids = list(dict.fromkeys(product_ids))
+        if len(ids) > MAX_COMPARE:
+            raise ValueError(f"At most {MAX_COMPARE} products can be compared at once")
+        missing = [pid for pid in ids if pid not in self._summaries]
+        if missing:
+            raise ValueError(f"Unknown product ids: {', '.join(missing)}")
+
+        sets = {field: [self._sets[pid][i] for pid in ids] for i, field in enumerate(SET_FIELDS)}
+        result: Dict[str, Any] = {'derived': {pid: dict(self._summaries[pid]) for pid in ids}}
+        for field, per_product in sets.items():
+            common = frozenset.intersection(*per_product) if per_product else frozenset()
+            result[field] = {
+                'common': sorted(common),
+                'only': {
+                    pid: sorted(items - frozenset().union(*(other for j, other in enumerate(per_product) if j != i)))
+                    for i, (pid, items) in enumerate(zip(ids, per_product))
+                },
+            }
+        result['pairs'] = [self._pair(a, b) for i, a in enumerate(ids) for b in ids[i + 1:]]
+        return result
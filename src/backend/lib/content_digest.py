@@ -0,0 +1,55 @@
+from typing import Any, Dict, Optional
+
+from .catalog_index import CatalogIndex
+from .undo_log import record_hash
+
+_MODULUS = 1 << 64
+
+
+class ContentDigest(CatalogIndex):
+    """Per-product content hashes and an order-independent catalog digest.
+
+    The digest is the sum of the product hashes modulo 2**64, so a commit
+    updates it with one subtraction and one addition per changed product
+    instead of rehashing the catalog. Used for HTTP ETags: a product's
+    hash changes only when that product does.
+    """
+
+    name = "digest"
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._hashes: Dict[str, str] = {}
+        self._sum = 0
+
+    def __len__(self) -> int:
+        return len(self._hashes)
+
+    def add(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        self.remove(product)
+        digest = record_hash(product)
+        self._hashes[product_id] = digest
+        self._sum = (self._sum + int(digest, 16)) % _MODULUS
+
+    def remove(self, product: Dict[str, Any]):
+        digest = self._hashes.pop(product['product_id'], None)
+        if digest is not None:
+            self._sum = (self._sum - int(digest, 16)) % _MODULUS
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'hashes': self._hashes}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+        for product_id, digest in (data.get('hashes') or {}).items():
+            self._hashes[product_id] = digest
+            self._sum = (self._sum + int(digest, 16)) % _MODULUS
+
+    def digest(self) -> str:
+        return f"{self._sum:016x}"
+
+    def product_hash(self, product_id: str) -> Optional[str]:
+        return self._hashes.get(product_id)
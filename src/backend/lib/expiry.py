@@ -0,0 +1,121 @@
+import heapq
+import logging
+import threading
+from datetime import date
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .catalog_index import CatalogIndex
+from .validity_index import OPEN_END, tier_window
+
+logger = logging.getLogger(__name__)
+
+
+def expiry_ordinal(product: Dict[str, Any]) -> Optional[int]:
+    """Latest ``validity_end`` across an active product's tiers, or None
+    when it has no tiers or any tier is open-ended."""
+    if not product.get('active', True):
+        return None
+    ends = [tier_window(tier)[1] for tier in product.get('pricing') or []]
+    if not ends or OPEN_END in ends:
+        return None
+    return max(ends)
+
+
+class ExpiryIndex(CatalogIndex):
+    """Min-heap of ``(latest validity_end, product_id)`` for active products.
+
+    ``_due`` is authoritative; heap entries that no longer match it (the
+    product changed or was deactivated) are dropped when they surface, and
+    the heap is compacted once stale entries outnumber live ones. Finding
+    what is due pops only those entries.
+    """
+
+    name = "expiry"
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._due: Dict[str, int] = {}
+        self._heap: List[Tuple[int, str]] = []
+
+    def __len__(self) -> int:
+        return len(self._due)
+
+    def add(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        ordinal = expiry_ordinal(product)
+        if ordinal is None:
+            self._due.pop(product_id, None)
+            return
+        if self._due.get(product_id) != ordinal:
+            self._due[product_id] = ordinal
+            heapq.heappush(self._heap, (ordinal, product_id))
+            if len(self._heap) > 2 * len(self._due) + 64:
+                self._heap = [(o, pid) for pid, o in self._due.items()]
+                heapq.heapify(self._heap)
+
+    def remove(self, product: Dict[str, Any]):
+        self._due.pop(product['product_id'], None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'due': self._due}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+        self._due = {pid: int(ordinal) for pid, ordinal in data.get('due', {}).items()}
+        self._heap = [(ordinal, pid) for pid, ordinal in self._due.items()]
+        heapq.heapify(self._heap)
+
+    def pop_due(self, today: int) -> List[str]:
+        """Pop every product whose latest tier ended before ``today``.
+        Pair with ``restore()`` for ids that were not deactivated."""
+        due: Dict[str, None] = {}
+        while self._heap and self._heap[0][0] < today:
+            ordinal, product_id = heapq.heappop(self._heap)
+            if self._due.get(product_id) == ordinal:
+                due[product_id] = None
+        return list(due)
+
+    def restore(self, product_ids: List[str]):
+        for product_id in product_ids:
+            ordinal = self._due.get(product_id)
+            if ordinal is not None:
+                heapq.heappush(self._heap, (ordinal, product_id))
+
+    def next_expiry(self) -> Optional[str]:
+        while self._heap and self._due.get(self._heap[0][1]) != self._heap[0][0]:
+            heapq.heappop(self._heap)
+        return date.fromordinal(self._heap[0][0]).isoformat() if self._heap else None
+
+
+class ExpirySweeper(threading.Thread):
+    """Background thread that calls ``manager.expire()`` every ``interval``
+    seconds, starting immediately. Give it its own CatalogManager: writers
+    are serialised across threads and processes by CatalogLock, and a sweep
+    that finds the catalog locked is retried on the next tick. Any other
+    error is logged and the sweeper carries on."""
+
+    def __init__(self, manager, interval: float = 3600.0,
+                 on_expire: Optional[Callable[[List[str]], None]] = None):
+        super().__init__(name='catalog-expiry', daemon=True)
+        self.manager = manager
+        self.interval = interval
+        self.on_expire = on_expire
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.is_set():
+            try:
+                expired = self.manager.expire()
+                if expired and self.on_expire is not None:
+                    self.on_expire(expired)
+            except BlockingIOError:
+                pass
+            except Exception:
+                logger.exception("Expiry sweep failed; retrying in %ss", self.interval)
+            self._stopped.wait(self.interval)
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stopped.set()
+        self.join(timeout)
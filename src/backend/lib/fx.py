@@ -0,0 +1,113 @@
+import hashlib
+import json
+import os
+from bisect import bisect_right
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .validity_index import DateLike, to_ordinal
+
+BASE_CURRENCY = "AED"
+
+
+class Conversion:
+    """A resolved AED -> ``currency`` rate. ``key`` identifies the rate
+    (currency, table version, effective date) for caching converted columns."""
+
+    __slots__ = ('currency', 'rate', 'effective', 'key')
+
+    def __init__(self, currency: str, rate: float, effective: Optional[str] = None, version: str = ""):
+        self.currency = currency
+        self.rate = rate
+        self.effective = effective
+        self.key = (currency, version, effective)
+
+    @property
+    def identity(self) -> bool:
+        return self.currency == BASE_CURRENCY
+
+    def convert(self, amount: Optional[float]) -> Optional[float]:
+        if amount is None or self.identity:
+            return amount
+        return round(amount * self.rate, 2)
+
+    def convert_array(self, amounts: np.ndarray) -> np.ndarray:
+        # Rounding to minor units is monotonic for a positive rate, so a
+        # sorted AED column stays sorted after conversion.
+        if self.identity:
+            return amounts
+        return np.round(amounts * self.rate, 2)
+
+
+IDENTITY = Conversion(BASE_CURRENCY, 1.0)
+
+
+class FxTable:
+    """AED exchange rates with effective dates, read from a local JSON file.
+
+    The file maps each currency to ``[{"effective": "YYYY-MM-DD", "rate": r}]``
+    where ``r`` is units of that currency per 1 AED. It is re-read when it
+    changes on disk; ``version`` is a digest of its contents.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.version = ""
+        self._fingerprint: Optional[Tuple[int, int, int]] = None
+        self._rates: Dict[str, Tuple[List[int], List[Tuple[str, float]]]] = {}
+
+    def _refresh(self):
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            self._fingerprint, self._rates, self.version = None, {}, ""
+            return
+        fingerprint = (st.st_ino, st.st_mtime_ns, st.st_size)
+        if fingerprint == self._fingerprint:
+            return
+        with open(self.path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        self._rates = self._parse(data)
+        self.version = hashlib.sha256(
+            json.dumps(data.get('rates'), sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+        self._fingerprint = fingerprint
+
+    @staticmethod
+    def _parse(data: Dict[str, Any]) -> Dict[str, Tuple[List[int], List[Tuple[str, float]]]]:
+        if data.get('base', BASE_CURRENCY) != BASE_CURRENCY:
+            raise ValueError(f"FX table base currency must be {BASE_CURRENCY}")
+        rates = {}
+        for currency, entries in (data.get('rates') or {}).items():
+            rows = []
+            for entry in entries:
+                rate = float(entry['rate'])
+                if rate <= 0:
+                    raise ValueError(f"FX rate for {currency} must be positive")
+                effective = date.fromisoformat(entry['effective']).isoformat()
+                rows.append((to_ordinal(effective), effective, rate))
+            rows.sort()
+            rates[currency.upper()] = ([row[0] for row in rows], [(row[1], row[2]) for row in rows])
+        return rates
+
+    def currencies(self) -> List[str]:
+        self._refresh()
+        return sorted({BASE_CURRENCY, *self._rates})
+
+    def conversion(self, currency: str, on: Optional[DateLike] = None) -> Conversion:
+        currency = (currency or BASE_CURRENCY).upper()
+        if currency == BASE_CURRENCY:
+            return IDENTITY
+        self._refresh()
+        entry = self._rates.get(currency)
+        if entry is None:
+            raise ValueError(f"Unsupported currency: {currency} (supported: {', '.join(self.currencies())})")
+        ordinals, rows = entry
+        day = to_ordinal(on) if on is not None else date.today().toordinal()
+        pos = bisect_right(ordinals, day) - 1
+        if pos < 0:
+            raise ValueError(f"No {currency} rate is effective on {date.fromordinal(day).isoformat()}")
+        effective, rate = rows[pos]
+        return Conversion(currency, rate, effective, self.version)
@@ -0,0 +1,163 @@
+import os
+import threading
+from typing import Any, Optional, Tuple
+
+from .catalog_image import CatalogImage
+from .catalog_manager import CatalogManager
+
+# Indexes the read API needs, built before a generation is swapped in.
+WARM_INDEXES = ('secondary', 'price', 'stats', 'digest', 'responses')
+
+StatKey = Tuple[Optional[Tuple[int, int]], int]
+
+
+class PollingHolder:
+    """Holds the current value loaded from a file and reloads it when the
+    file changes, on demand (``check()``) or from a background thread
+    polling every ``interval`` seconds.
+
+    Subclasses define ``_stat_key()`` (anything that changes when the file
+    does) and ``_load(previous)``. With ``lazy`` the first load happens on
+    first access to ``current`` rather than in the constructor.
+    """
+
+    thread_name = 'catalog-reload'
+
+    def __init__(self, interval: float = 1.0, lazy: bool = False):
+        self.interval = interval
+        self.reloads = 0
+        self.last_error: Optional[Exception] = None
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._load_lock = threading.Lock()
+        self._current: Any = None
+        self._key: Any = None
+        if not lazy:
+            self._key = self._stat_key()
+            self._current = self._load(None)
+
+    def _stat_key(self) -> Any:
+        raise NotImplementedError
+
+    def _load(self, previous: Any) -> Any:
+        raise NotImplementedError
+
+    @property
+    def current(self) -> Any:
+        current = self._current
+        if current is None:
+            with self._load_lock:
+                if self._current is None:
+                    self._key = self._stat_key()
+                    self._current = self._load(None)
+                current = self._current
+        return current
+
+    def check(self) -> bool:
+        """Reload if the file changed since the last load. Returns whether
+        a new value was swapped in. A file that fails to load is kept out
+        (see ``last_error``) until it changes again."""
+        with self._load_lock:
+            if self._current is None:
+                return False
+            key = self._stat_key()
+            if key == self._key:
+                return False
+            self._key = key
+            try:
+                loaded = self._load(self._current)
+            except Exception as e:
+                self.last_error = e
+                return False
+            self._current = loaded
+            self.last_error = None
+            self.reloads += 1
+            return True
+
+    def _run(self):
+        while not self._stopped.wait(self.interval):
+            self.check()
+
+    def start(self):
+        if self._thread is None:
+            self._stopped.clear()
+            self._thread = threading.Thread(target=self._run, name=self.thread_name, daemon=True)
+            self._thread.start()
+
+    def stop(self, timeout: Optional[float] = None):
+        self._stopped.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+
+class CatalogHolder(PollingHolder):
+    """Serves one pinned CatalogManager per catalog generation.
+
+    A background thread stats the snapshot every ``interval`` seconds
+    (inode and mtime_ns, plus the size of the tombstone log) and, when it
+    changed, loads the new generation into a fresh manager, builds the
+    warm indexes and swaps it in with a single assignment. Readers take
+    ``holder.current`` once per request and keep a consistent snapshot
+    however long they run; they never wait for a reload.
+
+    Records equal to the previous generation's are replaced by the old
+    objects, so unchanged products keep their encoded API payloads.
+    Persistent indexes come from the sidecars the writer saved.
+    """
+
+    def __init__(self, db_path: str, fx_path: Optional[str] = None, interval: float = 1.0,
+                 lazy: bool = False):
+        self.db_path = db_path
+        self.fx_path = fx_path
+        super().__init__(interval, lazy)
+
+    def _stat_key(self) -> StatKey:
+        try:
+            st = os.stat(self.db_path)
+            snapshot: Optional[Tuple[int, int]] = (st.st_ino, st.st_mtime_ns)
+        except FileNotFoundError:
+            snapshot = None
+        try:
+            tombstones = os.path.getsize(f"{self.db_path}.tombstones")
+        except FileNotFoundError:
+            tombstones = 0
+        return snapshot, tombstones
+
+    def _load(self, previous: Optional[CatalogManager]) -> CatalogManager:
+        manager = CatalogManager(self.db_path, self.fx_path)
+        records = manager._records_by_id()
+        manager.pin()
+        if previous is not None:
+            old = previous._records_by_id()
+            for product_id, record in records.items():
+                reused = old.get(product_id)
+                if reused is not None and reused == record:
+                    records[product_id] = reused
+        for name in WARM_INDEXES:
+            manager.get_index(name)
+        if previous is not None:
+            manager.get_index('responses').adopt(previous.get_index('responses'))
+        return manager
+
+
+class ImageHolder(PollingHolder):
+    """Keeps the current catalog image mapped, re-mapping it when the
+    writer replaces the file. Superseded mappings are released once the
+    requests still reading them finish."""
+
+    thread_name = 'catalog-image-reload'
+
+    def __init__(self, path: str, interval: float = 1.0, lazy: bool = False):
+        self.path = path
+        super().__init__(interval, lazy)
+
+    def _stat_key(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return st.st_ino, st.st_mtime_ns, st.st_size
+
+    def _load(self, previous: Optional[CatalogImage]) -> CatalogImage:
+        return CatalogImage(self.path)
@@ -0,0 +1,117 @@
+import json
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+# (product_id, record before, record after); None for an absent record.
+Change = Tuple[str, Optional[Dict[str, Any]], Optional[Dict[str, Any]]]
+
+
+class IndexJournal:
+    """Append-only log of the record changes behind each generation.
+
+    Persistent index sidecars are not rewritten on every commit. A commit
+    appends one line ``{"generation", "changes"}`` here instead, and a
+    sidecar written at an older generation is brought up to date by
+    replaying the lines after it. The caller rewrites the sidecars and
+    clears the journal once replaying would cost more than rewriting.
+
+    Only an unbroken run of generations is replayed. A commit that crashed
+    before its line was appended, or a snapshot rewritten behind the
+    manager's back, leaves a gap, and sidecars from before the gap are
+    rebuilt instead.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._key: Optional[Tuple[int, int, int]] = None
+        self._entries: Dict[int, List[Change]] = {}
+
+    def size(self) -> int:
+        try:
+            return os.path.getsize(self.path)
+        except FileNotFoundError:
+            return 0
+
+    def append(self, entries: List[Tuple[int, List[Change]]]):
+        # Our own appends update the parsed copy, so the next commit does
+        # not re-read the whole journal.
+        current = self._key == self._stat_key()
+        lines = b''.join(
+            json.dumps({'generation': generation, 'changes': changes},
+                       ensure_ascii=False, separators=(',', ':')).encode('utf-8') + b'\n'
+            for generation, changes in entries
+        )
+        with open(self.path, 'ab') as f:
+            if f.tell() and not self._ends_with_newline():
+                # Drop a torn trailing line so this entry starts on its own line.
+                f.truncate(self._complete_length())
+            f.write(lines)
+            f.flush()
+            os.fsync(f.fileno())
+        if current:
+            for generation, changes in entries:
+                self._entries[generation] = [tuple(change) for change in changes]
+            self._key = self._stat_key()
+
+    def clear(self):
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
+        self._key = None
+        self._entries = {}
+
+    def covers(self, generation: int, until: int) -> bool:
+        """Whether every generation after ``generation`` up to ``until`` is logged."""
+        entries = self._read()
+        return all(number in entries for number in range(generation + 1, until + 1))
+
+    def changes_since(self, generation: int, until: int) -> Optional[List[List[Change]]]:
+        """The changes of generations ``generation + 1`` to ``until`` in
+        order, or None if any of them is missing."""
+        entries = self._read()
+        run = []
+        for number in range(generation + 1, until + 1):
+            changes = entries.get(number)
+            if changes is None:
+                return None
+            run.append(changes)
+        return run
+
+    def _stat_key(self) -> Optional[Tuple[int, int, int]]:
+        try:
+            st = os.stat(self.path)
+        except FileNotFoundError:
+            return None
+        return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+    def _read(self) -> Dict[int, List[Change]]:
+        key = self._stat_key()
+        if key is None:
+            self._key = None
+            self._entries = {}
+            return self._entries
+        if key != self._key:
+            entries: Dict[int, List[Change]] = {}
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    if not line.endswith(b'\n'):
+                        break
+                    try:
+                        entry = json.loads(line)
+                    except ValueError:
+                        continue
+                    entries[entry['generation']] = [tuple(change) for change in entry['changes']]
+            self._key = key
+            self._entries = entries
+        return self._entries
+
+    def _complete_length(self) -> int:
+        with open(self.path, 'rb') as f:
+            data = f.read()
+        return data.rfind(b'\n') + 1
+
+    def _ends_with_newline(self) -> bool:
+        with open(self.path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b'\n'
@@ -0,0 +1,210 @@
+import heapq
+import math
+import re
+from bisect import bisect_left, insort
+from typing import Any, Dict, FrozenSet, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .catalog_index import CatalogIndex
+from .text_index import fold_accents, fold_token
+
+_WORD_RE = re.compile(r'[^\W_]+')
+
+
+def normalize_name(text: Optional[str]) -> str:
+    if not text:
+        return ''
+    text = fold_accents(text).lower()
+    return ' '.join(fold_token(word) for word in _WORD_RE.findall(text))
+
+
+def trigrams(normalized: str) -> FrozenSet[str]:
+    if not normalized:
+        return frozenset()
+    padded = f"  {normalized} "
+    return frozenset(padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def dice(a: FrozenSet[str], b: FrozenSet[str]) -> float:
+    if not a or not b:
+        return 0.0
+    return 2.0 * len(a & b) / (len(a) + len(b))
+
+
+class NameLookup(CatalogIndex):
+    """Type-ahead and typo-tolerant lookup over product names and ids.
+
+    Prefix completion bisects a sorted key array (a flattened trie: one
+    entry per name, id and word start) rather than a node-per-character
+    trie, which costs hundreds of bytes per node in Python. Fuzzy matching
+    scores every product at once in NumPy: one bincount over cached
+    posting arrays per side (name, id) gives the shared trigrams, and the
+    stored trigram counts turn those into Dice scores. Only the top k
+    scores ever reach Python.
+    """
+
+    name = "names"
+    persistent = False
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._names: Dict[str, str] = {}
+        self._keys: Dict[str, List[Tuple[int, str, str]]] = {}
+        # [0]: whole names and ids, [1]: the same text from each later word.
+        self._sorted_keys: Tuple[List[Tuple[str, str]], List[Tuple[str, str]]] = ([], [])
+        self._grams: Dict[str, Tuple[FrozenSet[str], FrozenSet[str]]] = {}
+        self._ordinals: Dict[str, int] = {}
+        self._product_ids: List[Optional[str]] = []
+        # Ordinals freed by remove(), reused by the next add() so updates
+        # in a long-running process don't grow the ordinal space.
+        self._free: List[int] = []
+        # Per side ([0]: name, [1]: id): trigram -> ordinals, its cached
+        # array, and each ordinal's trigram count (0 for a free ordinal).
+        self._postings: Tuple[Dict[str, Set[int]], Dict[str, Set[int]]] = ({}, {})
+        self._arrays: Tuple[Dict[str, np.ndarray], Dict[str, np.ndarray]] = ({}, {})
+        self._sizes = np.zeros((2, 64), dtype=np.int32)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    @staticmethod
+    def _prefix_keys(product_id: str, texts: Tuple[str, ...]) -> List[Tuple[int, str, str]]:
+        keys = set()
+        for text in texts:
+            if not text:
+                continue
+            keys.add((0, text, product_id))
+            for match in re.finditer(' ', text):
+                keys.add((1, text[match.end():], product_id))
+        return sorted(keys)
+
+    def _register(self, product: Dict[str, Any]) -> List[Tuple[int, str, str]]:
+        product_id = product['product_id']
+        name = normalize_name(product.get('product_name'))
+        id_key = normalize_name(product_id)
+        self._names[product_id] = product.get('product_name') or product_id
+
+        keys = self._prefix_keys(product_id, (name, id_key))
+        self._keys[product_id] = keys
+
+        grams = (trigrams(name), trigrams(id_key))
+        self._grams[product_id] = grams
+        if self._free:
+            ordinal = self._free.pop()
+            self._product_ids[ordinal] = product_id
+        else:
+            ordinal = len(self._product_ids)
+            self._product_ids.append(product_id)
+            if ordinal >= self._sizes.shape[1]:
+                self._sizes = np.concatenate([self._sizes, np.zeros_like(self._sizes)], axis=1)
+        self._ordinals[product_id] = ordinal
+        for side, side_grams in enumerate(grams):
+            self._sizes[side, ordinal] = len(side_grams)
+            for gram in side_grams:
+                self._postings[side].setdefault(gram, set()).add(ordinal)
+                self._arrays[side].pop(gram, None)
+        return keys
+
+    def add(self, product: Dict[str, Any]):
+        if product['product_id'] in self._names:
+            self.remove(product)
+        for rank, text, pid in self._register(product):
+            insort(self._sorted_keys[rank], (text, pid))
+
+    def build(self, products):
+        self.clear()
+        for product in products:
+            if product['product_id'] in self._names:
+                continue
+            for rank, text, pid in self._register(product):
+                self._sorted_keys[rank].append((text, pid))
+        for keys in self._sorted_keys:
+            keys.sort()
+
+    def remove(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        if self._names.pop(product_id, None) is None:
+            return
+        for rank, text, pid in self._keys.pop(product_id, []):
+            keys = self._sorted_keys[rank]
+            pos = bisect_left(keys, (text, pid))
+            if pos < len(keys) and keys[pos] == (text, pid):
+                del keys[pos]
+        grams = self._grams.pop(product_id)
+        ordinal = self._ordinals.pop(product_id)
+        self._product_ids[ordinal] = None
+        self._free.append(ordinal)
+        for side, side_grams in enumerate(grams):
+            self._sizes[side, ordinal] = 0
+            postings = self._postings[side]
+            for gram in side_grams:
+                ordinals = postings.get(gram)
+                if ordinals is not None:
+                    ordinals.discard(ordinal)
+                    self._arrays[side].pop(gram, None)
+                    if not ordinals:
+                        del postings[gram]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+
+    def suggest(self, prefix: str, k: int = 10) -> List[Tuple[str, str]]:
+        needle = normalize_name(prefix)
+        if not needle or k <= 0:
+            return []
+        if prefix[-1:].isspace():
+            needle += ' '
+
+        found: Dict[str, None] = {}
+        for keys in self._sorted_keys:
+            pos = bisect_left(keys, (needle,))
+            while len(found) < k and pos < len(keys) and keys[pos][0].startswith(needle):
+                found.setdefault(keys[pos][1])
+                pos += 1
+        return [(pid, self._names[pid]) for pid in found]
+
+    def _posting_array(self, side: int, gram: str) -> np.ndarray:
+        array = self._arrays[side].get(gram)
+        if array is None:
+            array = self._arrays[side][gram] = np.fromiter(self._postings[side][gram], dtype=np.int64)
+        return array
+
+    def fuzzy(self, name: str, k: int = 10, min_similarity: float = 0.45) -> List[Tuple[str, str, float]]:
+        query = trigrams(normalize_name(name))
+        if not query or k <= 0:
+            return []
+
+        # Dice similarity of the query with every name and every id: shared
+        # trigrams from one bincount per side, divided by the stored set
+        # sizes. A side can only reach ``min_similarity`` with at least
+        # ``floor`` shared trigrams, so only those products are scored.
+        size = len(query)
+        count = len(self._product_ids)
+        floor = max(1, math.ceil(min_similarity * size / (2.0 - min_similarity)))
+        shared = []
+        for side, postings in enumerate(self._postings):
+            arrays = [self._posting_array(side, gram) for gram in query if gram in postings]
+            shared.append(np.bincount(np.concatenate(arrays), minlength=count) if arrays
+                          else np.zeros(count, dtype=np.int64))
+        ordinals = np.flatnonzero((shared[0] >= floor) | (shared[1] >= floor))
+        scores = np.zeros(len(ordinals))
+        for side in (0, 1):
+            side_scores = 2.0 * shared[side][ordinals] / (size + self._sizes[side, ordinals])
+            np.maximum(scores, side_scores, out=scores)
+        keep = scores >= min_similarity
+        ordinals, scores = ordinals[keep], scores[keep]
+        if len(ordinals) > k:
+            # Keep the k best scores plus anything tied with the k-th, so
+            # ties still break on product_id below.
+            kth = np.partition(scores, len(scores) - k)[len(scores) - k]
+            keep = scores >= kth
+            ordinals, scores = ordinals[keep], scores[keep]
+        scored = [(score, self._product_ids[ordinal]) for score, ordinal in zip(scores.tolist(), ordinals.tolist())]
+        top = heapq.nsmallest(k, scored, key=lambda item: (-item[0], item[1]))
+        return [(pid, self._names[pid], round(score, 4)) for score, pid in top]
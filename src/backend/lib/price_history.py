@@ -0,0 +1,239 @@
+import json
+import os
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+import numpy as np
+
+from .validity_index import DateLike
+
+# One appended row per price change: seconds since the previous row, the
+# series id, and the change in fils (1/100 AED) since the series' last row.
+ROW = np.dtype([('dt', '<i8'), ('series', '<i4'), ('delta', '<i8')])
+
+# (product_id, tier_name, validity_start): tier names repeat across seasons.
+SeriesKey = Tuple[str, str, Optional[str]]
+
+Moment = Union[DateLike, int, float]
+
+
+def to_timestamp(value: Moment) -> int:
+    """Epoch seconds for a timestamp, date or ISO string (naive means UTC)."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, datetime):
+        moment = value
+    elif isinstance(value, date):
+        moment = datetime(value.year, value.month, value.day)
+    else:
+        moment = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return int(moment.timestamp())
+
+
+def format_timestamp(seconds: int) -> str:
+    return datetime.fromtimestamp(seconds, timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+
+
+def tier_prices(product: Optional[Dict[str, Any]]) -> Dict[SeriesKey, int]:
+    if not product:
+        return {}
+    product_id = product['product_id']
+    return {
+        (product_id, tier['tier_name'], tier.get('validity_start')): int(round(float(tier['price_aed']) * 100))
+        for tier in product.get('pricing') or []
+    }
+
+
+class PriceHistory:
+    """Append-only tier price history stored next to the catalog.
+
+    ``<base>.keys`` lists one JSON series key per line (its line number is
+    the series id) and ``<base>.bin`` holds fixed-width ``ROW`` records,
+    delta-encoded in time and per series in price, so a change costs 20
+    bytes. Reading decodes the whole file with two cumulative sums and
+    groups rows by series, which gives the per-product index.
+    """
+
+    def __init__(self, base_path: str):
+        self.keys_path = f"{base_path}.keys"
+        self.rows_path = f"{base_path}.bin"
+        self._sizes: Optional[Tuple[int, int]] = None
+        self._stale = True
+        self._keys: List[SeriesKey] = []
+        self._series: Dict[SeriesKey, int] = {}
+        self._by_product: Dict[str, List[int]] = {}
+        self._last_time = 0
+        self._last_price: Dict[int, int] = {}
+        self._times = np.zeros(0, dtype=np.int64)
+        self._series_of = np.zeros(0, dtype=np.int64)
+        self._prices = np.zeros(0, dtype=np.int64)
+        self._rows_of: Dict[int, np.ndarray] = {}
+
+    def _file_sizes(self) -> Tuple[int, int]:
+        sizes = []
+        for path in (self.keys_path, self.rows_path):
+            try:
+                sizes.append(os.path.getsize(path))
+            except FileNotFoundError:
+                sizes.append(0)
+        return sizes[0], sizes[1]
+
+    def _sync(self, decode: bool = True):
+        sizes = self._file_sizes()
+        if sizes != self._sizes or (decode and self._stale):
+            self._read(sizes)
+
+    def _read(self, sizes: Tuple[int, int]):
+        self._keys, self._series, self._by_product = [], {}, {}
+        if sizes[0]:
+            with open(self.keys_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    if line.strip():
+                        self._register(tuple(json.loads(line)))
+        rows = np.zeros(0, dtype=ROW)
+        if sizes[1]:
+            # A torn trailing row (crash mid-append) is ignored.
+            rows = np.fromfile(self.rows_path, dtype=ROW, count=sizes[1] // ROW.itemsize)
+        rows = rows[rows['series'] < len(self._keys)]
+
+        times = np.cumsum(rows['dt'])
+        series = rows['series'].astype(np.int64)
+        order = np.argsort(series, kind='stable')
+        sums = np.cumsum(rows['delta'][order])
+        grouped = series[order]
+        starts = np.flatnonzero(np.r_[True, grouped[1:] != grouped[:-1]]) if len(grouped) else np.zeros(0, int)
+        bounds = np.r_[starts, len(grouped)]
+        before_group = np.where(starts > 0, sums[np.maximum(starts - 1, 0)], 0) if len(starts) else starts
+        prices = np.empty_like(sums)
+        prices[order] = sums - np.repeat(before_group, np.diff(bounds))
+
+        self._times, self._series_of, self._prices = times, series, prices
+        self._rows_of = {int(grouped[start]): order[start:stop] for start, stop in zip(bounds[:-1], bounds[1:])}
+        self._last_time = int(times[-1]) if len(times) else 0
+        self._last_price = {sid: int(prices[members[-1]]) for sid, members in self._rows_of.items()}
+        self._sizes = sizes
+        self._stale = False
+
+    def _register(self, key: SeriesKey) -> int:
+        series_id = self._series.get(key)
+        if series_id is None:
+            series_id = self._series[key] = len(self._keys)
+            self._keys.append(key)
+            self._by_product.setdefault(key[0], []).append(series_id)
+        return series_id
+
+    def record(self, changes: Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]],
+               now: Moment, baseline: Optional[Moment] = None) -> int:
+        """Append rows for tiers whose price differs from the last recorded
+        one. A series seen for the first time also gets its old price at
+        ``baseline`` (when the previous snapshot was written), so moves are
+        measurable from the first change. Returns the rows appended.
+        Callers serialise writers (CatalogLock)."""
+        self._sync(decode=False)
+        now = max(to_timestamp(now), self._last_time)
+        baseline = now if baseline is None else min(max(to_timestamp(baseline), self._last_time), now)
+        new_keys: List[SeriesKey] = []
+        pending: List[Tuple[int, int, int]] = []
+        last_price = dict(self._last_price)
+
+        for before, after in changes.values():
+            old = tier_prices(before)
+            for key, price in tier_prices(after).items():
+                series_id = self._series.get(key)
+                untracked = series_id is None or series_id not in last_price
+                if untracked and old.get(key) == price:
+                    continue
+                if series_id is None:
+                    series_id = self._register(key)
+                    new_keys.append(key)
+                if untracked and key in old:
+                    pending.append((baseline, series_id, old[key]))
+                    last_price[series_id] = old[key]
+                if last_price.get(series_id) != price:
+                    pending.append((now, series_id, price))
+                    last_price[series_id] = price
+
+        if new_keys:
+            with open(self.keys_path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(list(key), ensure_ascii=False) + '\n' for key in new_keys)
+        if pending:
+            pending.sort(key=lambda row: row[0])
+            rows = np.zeros(len(pending), dtype=ROW)
+            previous_time, previous_price = self._last_time, dict(self._last_price)
+            for i, (moment, series_id, price) in enumerate(pending):
+                rows[i] = (moment - previous_time, series_id, price - previous_price.get(series_id, 0))
+                previous_time, previous_price[series_id] = moment, price
+            with open(self.rows_path, 'ab') as f:
+                f.write(rows.tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+            self._last_time = previous_time
+        self._last_price = last_price
+        self._sizes = self._file_sizes()
+        self._stale = True
+        return len(pending)
+
+    def history(self, product_id: str, since: Optional[Moment] = None) -> List[Dict[str, Any]]:
+        """Recorded prices of ``product_id``'s tiers, oldest first."""
+        self._sync()
+        since_ts = to_timestamp(since) if since is not None else None
+        rows = [row for sid in self._by_product.get(product_id, ()) for row in self._rows_of.get(sid, ())]
+        rows.sort(key=lambda row: (self._times[row], row))
+        entries = []
+        for row in rows:
+            moment = int(self._times[row])
+            if since_ts is not None and moment < since_ts:
+                continue
+            _, tier_name, validity_start = self._keys[self._series_of[row]]
+            entries.append({
+                'timestamp': format_timestamp(moment),
+                'tier_name': tier_name,
+                'validity_start': validity_start,
+                'price_aed': int(self._prices[row]) / 100,
+            })
+        return entries
+
+    @staticmethod
+    def _last_per_series(series: np.ndarray, rows: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        ids, first_from_end = np.unique(series[rows][::-1], return_index=True)
+        return ids, rows[len(rows) - 1 - first_from_end]
+
+    def movers(self, since: Moment, k: int = 10, by: str = 'amount') -> List[Dict[str, Any]]:
+        """Tiers with the largest price change between ``since`` and now,
+        ranked by absolute ``amount`` or ``percent`` change."""
+        if by not in ('amount', 'percent'):
+            raise ValueError("by must be 'amount' or 'percent'")
+        self._sync()
+        since_ts = to_timestamp(since)
+        baseline = np.full(len(self._keys), -1, dtype=np.int64)
+        current = np.full(len(self._keys), -1, dtype=np.int64)
+        rows = np.arange(len(self._times))
+        ids, last = self._last_per_series(self._series_of, rows[self._times <= since_ts])
+        baseline[ids] = self._prices[last]
+        ids, last = self._last_per_series(self._series_of, rows)
+        current[ids] = self._prices[last]
+
+        moved = np.flatnonzero((baseline >= 0) & (current != baseline))
+        change = (current[moved] - baseline[moved]).astype(np.float64)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            percent = np.where(baseline[moved] > 0, 100.0 * change / baseline[moved], np.inf)
+        score = np.abs(percent if by == 'percent' else change)
+        top = moved[np.lexsort((moved, -score))][:max(k, 0)]
+        position = {sid: i for i, sid in enumerate(moved.tolist())}
+
+        results = []
+        for series_id in top.tolist():
+            product_id, tier_name, validity_start = self._keys[series_id]
+            i = position[series_id]
+            results.append({
+                'product_id': product_id,
+                'tier_name': tier_name,
+                'validity_start': validity_start,
+                'from_price': int(baseline[series_id]) / 100,
+                'to_price': int(current[series_id]) / 100,
+                'change': float(change[i]) / 100,
+                'change_pct': round(float(percent[i]), 2) if np.isfinite(percent[i]) else None,
+            })
+        return results
@@ -0,0 +1,166 @@
+from bisect import bisect_left, bisect_right, insort
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .catalog_index import CatalogIndex
+from .fx import IDENTITY, Conversion
+
+
+class PriceIndex(CatalogIndex):
+    """Sorted tier prices plus precomputed per-product min/max.
+
+    ``_tiers`` holds one ``(price_aed, product_id, tier_idx)`` entry per
+    tier and ``_mins`` one ``(min_price, product_id)`` entry per priced
+    product, both kept sorted so range queries are two bisects.
+
+    For other currencies both lists get NumPy price columns converted in
+    one vectorised step and cached per conversion key (currency, FX table
+    version, effective date) until the next change. Conversion preserves
+    order, so converted ranges are two ``searchsorted`` calls on the cached
+    column rather than a rescan.
+    """
+
+    name = "price"
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._prices: Dict[str, List[float]] = {}
+        self._extremes: Dict[str, Tuple[float, float]] = {}
+        self._tiers: List[Tuple[float, str, int]] = []
+        self._mins: List[Tuple[float, str]] = []
+        self._columns: Dict[Tuple, Tuple[np.ndarray, np.ndarray]] = {}
+
+    @staticmethod
+    def _tier_prices(product: Dict[str, Any]) -> List[float]:
+        return [float(tier['price_aed']) for tier in product.get('pricing') or []]
+
+    def add(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        prices = self._tier_prices(product)
+        self._columns.clear()
+        self._prices[product_id] = prices
+        for idx, price in enumerate(prices):
+            insort(self._tiers, (price, product_id, idx))
+        if prices:
+            self._extremes[product_id] = (min(prices), max(prices))
+            insort(self._mins, (min(prices), product_id))
+
+    def remove(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        prices = self._prices.pop(product_id, None)
+        if prices is None:
+            return
+        self._columns.clear()
+        for idx, price in enumerate(prices):
+            pos = bisect_left(self._tiers, (price, product_id, idx))
+            if pos < len(self._tiers) and self._tiers[pos] == (price, product_id, idx):
+                del self._tiers[pos]
+        extremes = self._extremes.pop(product_id, None)
+        if extremes is not None:
+            pos = bisect_left(self._mins, (extremes[0], product_id))
+            if pos < len(self._mins) and self._mins[pos] == (extremes[0], product_id):
+                del self._mins[pos]
+
+    def build(self, products: Iterable[Dict[str, Any]]):
+        # Collect every tier and sort once; add() per product would insort
+        # into ever longer lists.
+        self._index({product['product_id']: self._tier_prices(product) for product in products})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'prices': self._prices}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self._index({pid: [float(p) for p in prices] for pid, prices in data.get('prices', {}).items()})
+
+    def _index(self, prices: Dict[str, List[float]]):
+        self.clear()
+        self._prices = prices
+        self._tiers = sorted(
+            (price, pid, idx) for pid, prices in self._prices.items() for idx, price in enumerate(prices)
+        )
+        self._extremes = {pid: (min(prices), max(prices)) for pid, prices in self._prices.items() if prices}
+        self._mins = sorted((low, pid) for pid, (low, _) in self._extremes.items())
+
+    @staticmethod
+    def _bounds(entries: List[Tuple], low: Optional[float], high: Optional[float],
+                include_low: bool, include_high: bool) -> Tuple[int, int]:
+        if low is None:
+            start = 0
+        elif include_low:
+            start = bisect_left(entries, (low,))
+        else:
+            start = bisect_right(entries, (low, chr(0x10FFFF)))
+        if high is None:
+            stop = len(entries)
+        elif include_high:
+            stop = bisect_right(entries, (high, chr(0x10FFFF)))
+        else:
+            stop = bisect_left(entries, (high,))
+        return start, max(start, stop)
+
+    @staticmethod
+    def _column_bounds(column: np.ndarray, low: Optional[float], high: Optional[float],
+                       include_low: bool, include_high: bool) -> Tuple[int, int]:
+        start = 0 if low is None else int(np.searchsorted(column, low, 'left' if include_low else 'right'))
+        stop = len(column) if high is None else int(np.searchsorted(column, high, 'right' if include_high else 'left'))
+        return start, max(start, stop)
+
+    def converted_columns(self, conversion: Conversion) -> Tuple[np.ndarray, np.ndarray]:
+        """Tier and min-price columns aligned with ``_tiers`` and ``_mins``."""
+        columns = self._columns.get(conversion.key)
+        if columns is None:
+            base = self._columns.get(IDENTITY.key)
+            if base is None:
+                base = self._columns[IDENTITY.key] = (
+                    np.fromiter((entry[0] for entry in self._tiers), dtype=np.float64, count=len(self._tiers)),
+                    np.fromiter((entry[0] for entry in self._mins), dtype=np.float64, count=len(self._mins)),
+                )
+            columns = self._columns[conversion.key] = (
+                conversion.convert_array(base[0]),
+                conversion.convert_array(base[1]),
+            )
+        return columns
+
+    def tiers_between(self, low: Optional[float] = None, high: Optional[float] = None,
+                      include_low: bool = True, include_high: bool = True,
+                      conversion: Optional[Conversion] = None) -> List[Tuple[float, str, int]]:
+        """``(price, product_id, tier_idx)`` entries in price order; with a
+        conversion, bounds and prices are in its currency."""
+        if conversion is None or conversion.identity:
+            start, stop = self._bounds(self._tiers, low, high, include_low, include_high)
+            return self._tiers[start:stop]
+        prices, _ = self.converted_columns(conversion)
+        start, stop = self._column_bounds(prices, low, high, include_low, include_high)
+        return [(price, pid, idx) for price, (_, pid, idx) in zip(prices[start:stop].tolist(), self._tiers[start:stop])]
+
+    def products_between(self, low: Optional[float] = None, high: Optional[float] = None,
+                         conversion: Optional[Conversion] = None) -> Set[str]:
+        return {pid for _, pid, _ in self.tiers_between(low, high, conversion=conversion)}
+
+    def products_by_min_price(self, low: Optional[float] = None, high: Optional[float] = None,
+                              include_low: bool = True, include_high: bool = True,
+                              conversion: Optional[Conversion] = None) -> List[str]:
+        if conversion is None or conversion.identity:
+            start, stop = self._bounds(self._mins, low, high, include_low, include_high)
+        else:
+            _, mins = self.converted_columns(conversion)
+            start, stop = self._column_bounds(mins, low, high, include_low, include_high)
+        return [pid for _, pid in self._mins[start:stop]]
+
+    def min_price(self, product_id: str, conversion: Conversion = IDENTITY) -> Optional[float]:
+        extremes = self._extremes.get(product_id)
+        return conversion.convert(extremes[0]) if extremes else None
+
+    def max_price(self, product_id: str, conversion: Conversion = IDENTITY) -> Optional[float]:
+        extremes = self._extremes.get(product_id)
+        return conversion.convert(extremes[1]) if extremes else None
+
+    def cheapest_tier(self, product_id: str) -> Optional[Tuple[float, int]]:
+        prices = self._prices.get(product_id)
+        if not prices:
+            return None
+        idx = min(range(len(prices)), key=prices.__getitem__)
+        return prices[idx], idx
@@ -0,0 +1,194 @@
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from .catalog_index import CatalogIndex
+from .fx import IDENTITY, Conversion
+from .validity_index import DateLike, tier_window, to_ordinal
+
+Pax = Union[int, Dict[str, int]]
+
+# (tier index, folded tier name, price_aed, currency)
+ResolvedTier = Tuple[int, str, float, str]
+
+
+def _fold(text: Optional[str]) -> str:
+    return ' '.join((text or '').casefold().split())
+
+
+def _guest_counts(pax: Pax) -> Dict[Optional[str], int]:
+    if isinstance(pax, int):
+        counts = {None: pax}
+    elif isinstance(pax, dict):
+        counts = {_fold(kind): count for kind, count in pax.items()}
+    else:
+        raise ValueError("pax must be a guest count or a mapping of guest type to count")
+    for count in counts.values():
+        if not isinstance(count, int) or count < 0:
+            raise ValueError("pax counts must be non-negative integers")
+    return counts
+
+
+class QuotePricer(CatalogIndex):
+    """Prices multi-line quotes from ``Product.pricing``.
+
+    For each line the tier is chosen among the tiers valid on the travel
+    date: an explicit ``tier_name`` (exact, then word match), otherwise one
+    tier per guest type in ``pax`` ("adult", "child", ...), falling back to
+    the adult or first listed tier. Valid tiers are cached per
+    (product, date) until the product changes.
+    """
+
+    name = "quotes"
+    persistent = False
+    MAX_DATES_PER_PRODUCT = 512
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._products: Dict[str, Tuple[str, List[Tuple[int, int, str, float, str]]]] = {}
+        self._valid: Dict[str, Dict[int, List[ResolvedTier]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def add(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        tiers = []
+        for tier in product.get('pricing') or []:
+            start, end = tier_window(tier)
+            tiers.append((start, end, tier['tier_name'], float(tier['price_aed']), tier.get('currency') or 'AED'))
+        self._products[product_id] = (product.get('product_name') or product_id, tiers)
+        self._valid.pop(product_id, None)
+
+    def remove(self, product: Dict[str, Any]):
+        self._products.pop(product['product_id'], None)
+        self._valid.pop(product['product_id'], None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+
+    def valid_tiers(self, product_id: str, day: int) -> List[ResolvedTier]:
+        if product_id not in self._products:
+            raise ValueError(f"Unknown product: {product_id}")
+        by_day = self._valid.setdefault(product_id, {})
+        resolved = by_day.get(day)
+        if resolved is None:
+            if len(by_day) >= self.MAX_DATES_PER_PRODUCT:
+                by_day.clear()
+            _, tiers = self._products[product_id]
+            resolved = by_day[day] = [
+                (idx, _fold(name), price, currency)
+                for idx, (start, end, name, price, currency) in enumerate(tiers)
+                if start <= day <= end
+            ]
+        return resolved
+
+    @staticmethod
+    def _match(tiers: List[ResolvedTier], wanted: str) -> Optional[ResolvedTier]:
+        for tier in tiers:
+            if tier[1] == wanted:
+                return tier
+        words = wanted.split()
+        for tier in tiers:
+            if all(word in tier[1] for word in words):
+                return tier
+        return None
+
+    def _line_items(self, line: Dict[str, Any], day: int, guests: Dict[Optional[str], int]) -> List[Dict[str, Any]]:
+        product_id = line.get('product_id')
+        if not product_id:
+            raise ValueError("Quote line is missing product_id")
+        tiers = self.valid_tiers(product_id, day)
+        if not tiers:
+            raise ValueError(f"No tier of {product_id} is valid on {date.fromordinal(day).isoformat()}")
+
+        if line.get('tier_name'):
+            tier = self._match(tiers, _fold(line['tier_name']))
+            if tier is None:
+                raise ValueError(f"No tier of {product_id} matches {line['tier_name']!r}")
+            wanted = [(tier, line.get('quantity', sum(guests.values())))]
+        elif 'quantity' in line:
+            wanted = [(self._match(tiers, 'adult') or tiers[0], line['quantity'])]
+        else:
+            default = self._match(tiers, 'adult') or tiers[0]
+            wanted = [((self._match(tiers, kind) if kind else None) or default, count)
+                      for kind, count in guests.items() if count]
+
+        quantities: Dict[int, int] = {}
+        by_index = {}
+        for tier, quantity in wanted:
+            if not isinstance(quantity, int) or quantity < 0:
+                raise ValueError(f"Invalid quantity for {product_id}: {quantity!r}")
+            quantities[tier[0]] = quantities.get(tier[0], 0) + quantity
+            by_index[tier[0]] = tier
+
+        product_name, raw_tiers = self._products[product_id]
+        items = []
+        for idx, quantity in quantities.items():
+            _, _, price, currency = by_index[idx]
+            items.append({
+                'product_id': product_id,
+                'product_name': product_name,
+                'tier_name': raw_tiers[idx][2],
+                'unit_price': price,
+                'currency': currency,
+                'quantity': quantity,
+                'line_total': round(price * quantity, 2),
+            })
+        return items
+
+    def price_quote(self, lines: List[Dict[str, Any]], travel_date: DateLike, pax: Pax,
+                    conversion: Conversion = IDENTITY) -> Dict[str, Any]:
+        """Price the lines; with a conversion, unit prices are converted first
+        and line totals, total and per-person amounts are in its currency."""
+        day = to_ordinal(travel_date)
+        guests = _guest_counts(pax)
+        items = [item for line in lines for item in self._line_items(line, day, guests)]
+        if not conversion.identity:
+            for item in items:
+                item['unit_price'] = conversion.convert(item['unit_price'])
+                item['currency'] = conversion.currency
+                item['line_total'] = round(item['unit_price'] * item['quantity'], 2)
+        total = round(sum(item['line_total'] for item in items), 2)
+        guest_total = sum(guests.values())
+        quote = {
+            'travel_date': date.fromordinal(day).isoformat(),
+            'guests': guest_total,
+            'lines': items,
+            'total': total,
+            'per_person': round(total / guest_total, 2) if guest_total else None,
+            'currency': conversion.currency,
+        }
+        if not conversion.identity:
+            quote['exchange_rate'] = {'rate': conversion.rate, 'effective': conversion.effective}
+        return quote
+
+    def price_quotes(self, quotes: List[Dict[str, Any]], conversion: Conversion = IDENTITY) -> List[Dict[str, Any]]:
+        """Price many ``{lines, travel_date, pax}`` quotes. Tier validity is
+        resolved once per distinct (product, date) up front; a quote that
+        fails returns ``{'error': message}`` instead of aborting the batch."""
+        keys = set()
+        for quote in quotes:
+            try:
+                day = to_ordinal(quote.get('travel_date'))
+            except (TypeError, ValueError):
+                continue
+            keys.update((line.get('product_id'), day) for line in quote.get('lines') or [] if isinstance(line, dict))
+        for product_id, day in sorted(keys, key=lambda key: (str(key[0]), key[1])):
+            if product_id in self._products:
+                self.valid_tiers(product_id, day)
+
+        results = []
+        for quote in quotes:
+            try:
+                if not quote.get('travel_date'):
+                    raise ValueError("Quote is missing travel_date")
+                results.append(self.price_quote(quote.get('lines') or [], quote['travel_date'],
+                                                quote.get('pax', 1), conversion))
+            except (TypeError, ValueError) as e:
+                results.append({'error': str(e)})
+        return results
@@ -0,0 +1,431 @@
+import html
+import math
+import re
+from concurrent.futures import ProcessPoolExecutor
+from decimal import Decimal
+from typing import Any, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
+
+from .catalog_index import CatalogIndex
+
+# Templates mirror exportQuoteAsText / exportQuoteAsHTML in the frontend's
+# src/frontend/lib/quote-export.ts (already trimmed). ${details} is a
+# backend-only slot that stays empty unless a quote lists products.
+TEXT_TEMPLATE = """\
+🌟 Ahmed Travel Quote
+━━━━━━━━━━━━━━━━━━
+
+📍 Tour: ${tourType}
+🚐 Vehicle: ${vehicle}
+📍 Pickup Zone: Zone ${zone}${zoneSuffix}
+👥 Guests: ${guests}
+
+💰 Breakdown:
+• Vehicle: AED ${vehicleRate}
+• Pickup: AED ${pickupRate}
+${attractionsBlock}
+
+━━━━━━━━━━━━━━━━━━
+✨ Total: AED ${total}
+👤 Per Person: AED ${perPerson}${details}
+
+Thank you for choosing Ahmed Travel! ✈️"""
+
+HTML_TEMPLATE = """\
+<!DOCTYPE html>
+<html>
+<head>
+  <meta charset="UTF-8">
+  <style>
+    body {
+      font-family: 'Inter', system-ui, sans-serif;
+      background: linear-gradient(135deg, #1a1f3a 0%, #2a2f4a 50%, #3a3020 100%);
+      color: #f5f5f5;
+      padding: 40px;
+      margin: 0;
+    }
+    .quote-container {
+      max-width: 600px;
+      margin: 0 auto;
+      background: rgba(255, 255, 255, 0.05);
+      backdrop-filter: blur(20px);
+      border-radius: 16px;
+      padding: 32px;
+      box-shadow: 0 12px 40px -8px rgba(0, 0, 0, 0.3);
+    }
+    .header {
+      text-align: center;
+      margin-bottom: 24px;
+    }
+    .title {
+      font-size: 28px;
+      font-weight: 700;
+      color: #f59e0b;
+      margin-bottom: 8px;
+    }
+    .divider {
+      height: 2px;
+      background: linear-gradient(90deg, transparent, #f59e0b, transparent);
+      margin: 16px 0;
+    }
+    .section {
+      margin: 16px 0;
+    }
+    .row {
+      display: flex;
+      justify-content: space-between;
+      padding: 8px 0;
+      font-size: 16px;
+    }
+    .label {
+      color: #d1d5db;
+    }
+    .value {
+      font-weight: 600;
+      color: #ffffff;
+    }
+    .total {
+      font-size: 24px;
+      font-weight: 700;
+      color: #f59e0b;
+    }
+    .footer {
+      text-align: center;
+      margin-top: 24px;
+      font-size: 14px;
+      color: #9ca3af;
+    }
+  </style>
+</head>
+<body>
+  <div class="quote-container">
+    <div class="header">
+      <div class="title">🌟 Ahmed Travel Quote</div>
+    </div>
+    <div class="divider"></div>
+    <div class="section">
+      <div class="row">
+        <span class="label">📍 Tour:</span>
+        <span class="value">${tourType}</span>
+      </div>
+      <div class="row">
+        <span class="label">🚐 Vehicle:</span>
+        <span class="value">${vehicle}</span>
+      </div>
+      <div class="row">
+        <span class="label">📍 Pickup Zone:</span>
+        <span class="value">Zone ${zone}</span>
+      </div>
+      <div class="row">
+        <span class="label">👥 Guests:</span>
+        <span class="value">${guests}</span>
+      </div>
+    </div>
+    <div class="divider"></div>
+    <div class="section">
+      <div class="row">
+        <span class="label">Vehicle:</span>
+        <span class="value">AED ${vehicleRate}</span>
+      </div>
+      <div class="row">
+        <span class="label">Pickup:</span>
+        <span class="value">AED ${pickupRate}</span>
+      </div>
+      ${attractionsBlock}
+    </div>
+    <div class="divider"></div>
+    <div class="section">
+      <div class="row">
+        <span class="label">✨ Total:</span>
+        <span class="total">AED ${total}</span>
+      </div>
+      <div class="row">
+        <span class="label">👤 Per Person:</span>
+        <span class="value">AED ${perPerson}</span>
+      </div>
+    </div>
+${details}    <div class="footer">
+      Thank you for choosing Ahmed Travel! ✈️
+    </div>
+  </div>
+</body>
+</html>"""
+
+TEXT_ATTRACTIONS = "• Attractions: AED ${attractionsCost}"
+
+HTML_ATTRACTIONS = """
+      <div class="row">
+        <span class="label">Attractions:</span>
+        <span class="value">AED ${attractionsCost}</span>
+      </div>
+      """
+
+TEXT_DETAILS = "\n\n📋 Included products:${items}"
+TEXT_PRODUCT = "\n• ${name}${inclusions}${policy}"
+
+HTML_DETAILS = """\
+    <div class="divider"></div>
+    <div class="section">${items}
+    </div>
+"""
+HTML_PRODUCT = """
+      <div class="row">
+        <span class="label">📋 ${name}</span>
+      </div>${inclusions}${policy}"""
+
+FORMATS = ('text', 'html')
+
+_PLACEHOLDER_RE = re.compile(r'\$\{(\w+)\}')
+_UNDEFINED = object()
+
+
+class CompiledTemplate:
+    """Template split once into literal runs and ``${name}`` slots, so
+    rendering is a single join with no parsing."""
+
+    def __init__(self, source: str):
+        literals, names = [], []
+        pos = 0
+        for match in _PLACEHOLDER_RE.finditer(source):
+            literals.append(source[pos:match.start()])
+            names.append(match.group(1))
+            pos = match.end()
+        literals.append(source[pos:])
+        self.literals = tuple(literals)
+        self.names = tuple(names)
+
+    def render(self, values: Dict[str, str]) -> str:
+        out = [self.literals[0]]
+        for name, literal in zip(self.names, self.literals[1:]):
+            out.append(values[name])
+            out.append(literal)
+        return ''.join(out)
+
+
+_TEMPLATES = {
+    'text': (CompiledTemplate(TEXT_TEMPLATE), CompiledTemplate(TEXT_ATTRACTIONS)),
+    'html': (CompiledTemplate(HTML_TEMPLATE), CompiledTemplate(HTML_ATTRACTIONS)),
+}
+_FRAGMENT_TEMPLATES = {
+    'text': (CompiledTemplate(TEXT_DETAILS), CompiledTemplate(TEXT_PRODUCT)),
+    'html': (CompiledTemplate(HTML_DETAILS), CompiledTemplate(HTML_PRODUCT)),
+}
+
+
+def js_number(value: float) -> str:
+    """Number.prototype.toString() for the values a quote can hold."""
+    if isinstance(value, int):
+        if abs(value) < 10 ** 21:
+            return str(value)
+        value = float(value)
+    if math.isnan(value):
+        return 'NaN'
+    if math.isinf(value):
+        return 'Infinity' if value > 0 else '-Infinity'
+    if value == 0:
+        return '0'
+    if value.is_integer() and abs(value) < 1e21:
+        return str(int(value))
+    text = repr(value)
+    if 'e' not in text:
+        return text
+    if 1e-6 <= abs(value) < 1e21:
+        return format(Decimal(text), 'f')
+    mantissa, _, exponent = text.partition('e')
+    exponent_value = int(exponent)
+    return f"{mantissa}e{'+' if exponent_value > 0 else '-'}{abs(exponent_value)}"
+
+
+def js_string(value: Any) -> str:
+    """String interpolation as in a JS template literal."""
+    if value is _UNDEFINED:
+        return 'undefined'
+    if value is None:
+        return 'null'
+    if isinstance(value, bool):
+        return 'true' if value else 'false'
+    if isinstance(value, (int, float)):
+        return js_number(value)
+    if isinstance(value, list):
+        return ','.join('' if item is None else js_string(item) for item in value)
+    return str(value)
+
+
+def _truthy(value: Any) -> bool:
+    if value is _UNDEFINED or value is None:
+        return False
+    if isinstance(value, float) and math.isnan(value):
+        return False
+    return bool(value)
+
+
+def _positive(value: Any) -> bool:
+    if value is _UNDEFINED or value is None or isinstance(value, (list, dict)):
+        return False
+    try:
+        return float(value) > 0
+    except (TypeError, ValueError):
+        return False
+
+
+def product_fragment(product: Dict[str, Any], fmt: str) -> str:
+    """Name, inclusions and policy block for one product. HTML output is
+    escaped, since catalog text is not markup."""
+    _, template = _FRAGMENT_TEMPLATES[fmt]
+    inclusions = product.get('inclusions') or []
+    policy = product.get('booking_policy')
+    if fmt == 'html':
+        esc = html.escape
+        return template.render({
+            'name': esc(product.get('product_name') or product['product_id']),
+            'inclusions': ''.join(
+                f'\n      <div class="row">\n        <span class="value">✓ {esc(item)}</span>\n      </div>'
+                for item in inclusions
+            ),
+            'policy': (f'\n      <div class="row">\n        <span class="label">ℹ️ {esc(policy)}</span>\n      </div>'
+                       if policy else ''),
+        })
+    return template.render({
+        'name': product.get('product_name') or product['product_id'],
+        'inclusions': ''.join(f"\n  ✓ {item}" for item in inclusions),
+        'policy': f"\n  ℹ️ {policy}" if policy else '',
+    })
+
+
+def render_quote(data: Dict[str, Any], fmt: str = 'text',
+                 fragments: Optional[Dict[str, str]] = None) -> str:
+    """Render one QuoteData dict (frontend field names) as text or HTML.
+
+    Values are interpolated exactly like the frontend's template literals,
+    unescaped. ``data['products']`` (optional) lists product ids whose
+    cached fragments fill the details section.
+    """
+    if fmt not in _TEMPLATES:
+        raise ValueError(f"Unknown quote format: {fmt} (expected one of {', '.join(FORMATS)})")
+    template, attractions = _TEMPLATES[fmt]
+    values = {name: js_string(data.get(name, _UNDEFINED)) for name in template.names}
+
+    zone_name = data.get('zoneName', _UNDEFINED)
+    values['zoneSuffix'] = f" ({js_string(zone_name)})" if _truthy(zone_name) else ''
+    cost = data.get('attractionsCost', _UNDEFINED)
+    values['attractionsBlock'] = attractions.render({'attractionsCost': js_string(cost)}) if _positive(cost) else ''
+
+    product_ids = data.get('products') or []
+    if product_ids:
+        missing = [pid for pid in product_ids if not fragments or pid not in fragments]
+        if missing:
+            raise ValueError(f"Unknown product ids: {', '.join(missing)}")
+        details, _ = _FRAGMENT_TEMPLATES[fmt]
+        values['details'] = details.render({'items': ''.join(fragments[pid] for pid in product_ids)})
+    else:
+        values['details'] = ''
+    return template.render(values)
+
+
+def _render_chunk(args: Tuple[List[Dict[str, Any]], str, Dict[str, str]]) -> List[str]:
+    quotes, fmt, fragments = args
+    return [render_quote(quote, fmt, fragments) for quote in quotes]
+
+
+def render_quotes(quotes: Iterable[Dict[str, Any]], fmt: str = 'text',
+                  fragments: Optional[Dict[str, str]] = None, workers: Optional[int] = None,
+                  chunk_size: int = 256) -> Iterator[str]:
+    """Render quotes in input order, yielding each document as it is ready.
+
+    With ``workers`` > 1 chunks are rendered in a process pool; each chunk
+    ships only the fragments it references, and at most two chunks per
+    worker are in flight so large campaigns stream in bounded memory.
+    """
+    fragments = fragments or {}
+    if not workers or workers <= 1:
+        for quote in quotes:
+            yield render_quote(quote, fmt, fragments)
+        return
+
+    def chunks() -> Iterator[Tuple[List[Dict[str, Any]], str, Dict[str, str]]]:
+        chunk: List[Dict[str, Any]] = []
+        for quote in quotes:
+            chunk.append(quote)
+            if len(chunk) >= chunk_size:
+                yield chunk, fmt, _chunk_fragments(chunk, fragments)
+                chunk = []
+        if chunk:
+            yield chunk, fmt, _chunk_fragments(chunk, fragments)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = []
+        for args in chunks():
+            pending.append(pool.submit(_render_chunk, args))
+            if len(pending) >= 2 * workers:
+                yield from pending.pop(0).result()
+        for future in pending:
+            yield from future.result()
+
+
+def _chunk_fragments(chunk: List[Dict[str, Any]], fragments: Dict[str, str]) -> Dict[str, str]:
+    return {pid: fragments[pid] for quote in chunk for pid in quote.get('products') or [] if pid in fragments}
+
+
+def write_quotes(quotes: Iterable[Dict[str, Any]], out: TextIO, fmt: str = 'text',
+                 fragments: Optional[Dict[str, str]] = None, workers: Optional[int] = None,
+                 separator: str = '\n') -> int:
+    count = 0
+    for document in render_quotes(quotes, fmt, fragments, workers):
+        out.write(document)
+        out.write(separator)
+        count += 1
+    return count
+
+
+class QuoteFragments(CatalogIndex):
+    """Rendered product fragments for quote documents, per format.
+
+    Fragments are rendered on first use and dropped when the product
+    changes; the cache goes with the catalog generation like other indexes.
+    """
+
+    name = "fragments"
+    persistent = False
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._products: Dict[str, Dict[str, Any]] = {}
+        self._rendered: Dict[Tuple[str, str], str] = {}
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def add(self, product: Dict[str, Any]):
+        self._products[product['product_id']] = product
+        for fmt in FORMATS:
+            self._rendered.pop((product['product_id'], fmt), None)
+
+    def remove(self, product: Dict[str, Any]):
+        self._products.pop(product['product_id'], None)
+        for fmt in FORMATS:
+            self._rendered.pop((product['product_id'], fmt), None)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+
+    def fragment(self, product_id: str, fmt: str) -> Optional[str]:
+        key = (product_id, fmt)
+        rendered = self._rendered.get(key)
+        if rendered is None:
+            product = self._products.get(product_id)
+            if product is None:
+                return None
+            rendered = self._rendered[key] = product_fragment(product, fmt)
+        return rendered
+
+    def fragments(self, product_ids: Iterable[str], fmt: str) -> Dict[str, str]:
+        found = {}
+        for product_id in product_ids:
+            rendered = self.fragment(product_id, fmt)
+            if rendered is not None:
+                found[product_id] = rendered
+        return found
@@ -0,0 +1,247 @@
+import math
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .catalog_index import CatalogIndex
+
+QUESTIONS = {
+    'group': ('couple', 'family', 'friends', 'solo'),
+    'interest': ('culture', 'adventure', 'luxury', 'photo'),
+    'budget': ('budget', 'mid', 'premium'),
+    'time': ('half', 'full', 'multi'),
+}
+
+PHOTO_FEATURE = '<photo>'
+
+# Catalog categories that satisfy each interest (the frontend maps
+# culture to its city-tour categories and adventure to desert tours).
+INTEREST_AFFINITY = {
+    'culture': {'Cultural': 1.0, 'Sightseeing': 0.8},
+    'adventure': {'Adventure': 1.0, 'Water Sports': 0.8},
+    'luxury': {'Luxury': 1.0, 'Cruise': 0.8, 'Culinary': 0.6, 'Concierge': 0.6},
+    'photo': {PHOTO_FEATURE: 1.0, 'Sightseeing': 0.5, 'Cruise': 0.5},
+}
+
+GROUP_AFFINITY = {
+    'family': {'Family': 0.5},
+    'couple': {'Cruise': 0.25, 'Luxury': 0.25},
+    'friends': {'Adventure': 0.25, 'Water Sports': 0.25},
+}
+
+# Min-price bands (AED) standing in for the frontend's margin levels.
+BUDGET_BANDS = {
+    'budget': (None, 200.0),
+    'mid': (100.0, 600.0),
+    'premium': (250.0, None),
+}
+
+# Longest duration that still fits, and the range that scores a bonus.
+TIME_FIT = {
+    'half': (6.0, (0.0, 5.0)),
+    'full': (None, (5.0, 10.0)),
+    'multi': (None, (10.0, math.inf)),
+}
+
+FAMILY_MAX_MIN_AGE = 15
+
+TIPS = (
+    ('group', 'family', 'Recommend private vehicle for comfort with kids'),
+    ('group', 'couple', 'Upsell romantic dinner cruise or balloon ride'),
+    ('interest', 'culture', 'Remind about mosque dress code requirements'),
+    ('interest', 'adventure', 'Check age requirements and send waiver links'),
+    ('budget', 'premium', 'Push private 4x4 and VIP experiences'),
+    ('time', 'multi', 'Create custom multi-day itinerary package'),
+)
+
+_PHOTO_RE = re.compile(r'photo|view|observation|panoram', re.IGNORECASE)
+_MIN_AGE_RE = re.compile(
+    r'(\d{1,2})\s*\+|(\d{1,2}) years? (?:or|and) (?:older|above)|at least (\d{1,2})',
+    re.IGNORECASE,
+)
+
+
+def minimum_age(product: Dict[str, Any]) -> int:
+    text = ' '.join(filter(None, (product.get('booking_policy'), product.get('description_long'))))
+    ages = [int(next(group for group in match.groups() if group)) for match in _MIN_AGE_RE.finditer(text)]
+    return max(ages, default=0)
+
+
+def tips_for(answers: Dict[str, str]) -> List[str]:
+    return [tip for question, value, tip in TIPS if answers.get(question) == value]
+
+
+def _validate(answers: Dict[str, str]):
+    for question, options in QUESTIONS.items():
+        value = answers.get(question)
+        if value is not None and value not in options:
+            raise ValueError(f"Unknown answer for {question}: {value!r} (expected one of {', '.join(options)})")
+
+
+class RecommenderIndex(CatalogIndex):
+    """Questionnaire scoring over columnar product features.
+
+    Port of ``getRecommendations`` (frontend ``tour-recommender-utils.ts``)
+    onto the catalog: the same hard filters (interest, budget, time, family
+    age limits) become boolean masks over the whole catalog, and the matches
+    are ranked by category affinity, price fit, duration fit and city.
+
+    Per generation, category one-hots (plus a photo flag), min price,
+    duration, city and minimum age are turned into one score row per answer
+    option, with failed filters as -inf; a batch of questionnaires is then
+    scored by gathering and summing those rows for all products at once.
+    """
+
+    name = "recommender"
+    persistent = False
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._products: Dict[str, Dict[str, Any]] = {}
+        self._arrays: Optional[Dict[str, Any]] = None
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def add(self, product: Dict[str, Any]):
+        self._products[product['product_id']] = product
+        self._arrays = None
+
+    def remove(self, product: Dict[str, Any]):
+        self._products.pop(product['product_id'], None)
+        self._arrays = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+
+    def _features(self) -> Dict[str, Any]:
+        if self._arrays is not None:
+            return self._arrays
+
+        products = [self._products[pid] for pid in sorted(self._products)
+                    if self._products[pid].get('active', True)]
+        features = sorted({p['category'] for p in products if p.get('category')}) + [PHOTO_FEATURE]
+        columns = {feature: col for col, feature in enumerate(features)}
+        cities = sorted({p['destination_city'] for p in products if p.get('destination_city')})
+
+        onehot = np.zeros((len(products), len(features)), dtype=np.float32)
+        price = np.full(len(products), np.nan, dtype=np.float32)
+        duration = np.full(len(products), np.nan, dtype=np.float32)
+        city = np.empty(len(products), dtype=object)
+        min_age = np.zeros(len(products), dtype=np.int32)
+        for row, product in enumerate(products):
+            if product.get('category'):
+                onehot[row, columns[product['category']]] = 1.0
+            text = ' '.join(filter(None, (product.get('product_name'), product.get('description_short'))))
+            if _PHOTO_RE.search(text):
+                onehot[row, columns[PHOTO_FEATURE]] = 1.0
+            prices = [tier['price_aed'] for tier in product.get('pricing') or []]
+            if prices:
+                price[row] = min(prices)
+            if product.get('duration_hours') is not None:
+                duration[row] = product['duration_hours']
+            city[row] = product.get('destination_city')
+            min_age[row] = minimum_age(product)
+
+        def weights(affinities: Dict[str, Dict[str, float]], options) -> np.ndarray:
+            matrix = np.zeros((len(options) + 1, len(features)), dtype=np.float32)
+            for row, option in enumerate(options, start=1):
+                for feature, weight in affinities.get(option, {}).items():
+                    if feature in columns:
+                        matrix[row, columns[feature]] = weight
+            return matrix
+
+        # One row per answer option (row 0: unanswered). Hard filters are
+        # folded in as -inf so a questionnaire's score is a sum of rows.
+        interest = weights(INTEREST_AFFINITY, QUESTIONS['interest']) @ onehot.T
+        interest[1:][interest[1:] <= 0.0] = -np.inf
+
+        group = weights(GROUP_AFFINITY, QUESTIONS['group']) @ onehot.T
+        family = 1 + QUESTIONS['group'].index('family')
+        group[family][min_age > FAMILY_MAX_MIN_AGE] = -np.inf
+
+        known_price = ~np.isnan(price)
+        top_price = float(np.max(price[known_price])) if known_price.any() else 0.0
+        level = np.full(len(products), 0.5, dtype=np.float32)
+        level[known_price] = np.log1p(price[known_price]) / math.log1p(max(top_price, 1.0))
+        budget = np.zeros((len(QUESTIONS['budget']) + 1, len(products)), dtype=np.float32)
+        for row, option in enumerate(QUESTIONS['budget'], start=1):
+            low, high = BUDGET_BANDS[option]
+            if option == 'budget':
+                budget[row] = 0.5 * (1.0 - level)
+            elif option == 'premium':
+                budget[row] = 0.5 * level
+            # Unpriced products compare False and stay eligible.
+            if low is not None:
+                budget[row][price < low] = -np.inf
+            if high is not None:
+                budget[row][price > high] = -np.inf
+
+        time = np.zeros((len(QUESTIONS['time']) + 1, len(products)), dtype=np.float32)
+        for row, option in enumerate(QUESTIONS['time'], start=1):
+            longest, (bonus_low, bonus_high) = TIME_FIT[option]
+            time[row] = 0.25 * ((duration > bonus_low) & (duration <= bonus_high))
+            if longest is not None:
+                time[row][duration > longest] = -np.inf
+
+        city_rows = np.zeros((len(cities) + 1, len(products)), dtype=np.float32)
+        for row, name in enumerate(cities, start=1):
+            city_rows[row] = 0.5 * (city == name)
+
+        self._arrays = {
+            'ids': [p['product_id'] for p in products],
+            'cities': {name: row for row, name in enumerate(cities, start=1)},
+            'interest': interest,
+            'group': group,
+            'budget': budget,
+            'time': time,
+            'city': city_rows,
+        }
+        return self._arrays
+
+    def score(self, answers_list: List[Dict[str, str]]) -> Tuple[List[str], np.ndarray]:
+        """Scores of shape (len(answers_list), products); -inf marks products
+        that fail a questionnaire's hard filters."""
+        for answers in answers_list:
+            _validate(answers)
+        arrays = self._features()
+
+        def option_rows(question: str) -> np.ndarray:
+            options = QUESTIONS[question]
+            return np.array([1 + options.index(a[question]) if a.get(question) else 0 for a in answers_list])
+
+        scores = arrays['interest'][option_rows('interest')]
+        for question in ('group', 'budget', 'time'):
+            scores += arrays[question][option_rows(question)]
+        scores += arrays['city'][[arrays['cities'].get(a.get('city'), 0) for a in answers_list]]
+        return arrays['ids'], scores
+
+    def recommend_many(self, answers_list: List[Dict[str, str]], k: int = 3) -> List[List[Tuple[str, float]]]:
+        if not answers_list:
+            return []
+        ids, scores = self.score(answers_list)
+        if k <= 0 or not ids:
+            return [[] for _ in answers_list]
+        k = min(k, len(ids))
+        kth = -np.partition(-scores, k - 1, axis=1)[:, k - 1]
+        results = []
+        for row, threshold in enumerate(kth.tolist()):
+            values = scores[row]
+            above = np.flatnonzero(values > threshold)
+            if threshold > -np.inf:
+                # Ties at the cut keep catalog (product_id) order, like the
+                # frontend's filter().slice().
+                ties = np.flatnonzero(values == threshold)[:k - len(above)]
+                above = np.concatenate([above, ties])
+            order = np.lexsort((above, -values[above]))
+            results.append([(ids[col], float(values[col])) for col in above[order].tolist()])
+        return results
+
+    def recommend(self, answers: Dict[str, str], k: int = 3) -> List[Tuple[str, float]]:
+        return self.recommend_many([answers], k)[0]
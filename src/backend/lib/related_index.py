@@ -0,0 +1,266 @@
+import math
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+import numpy as np
+
+from .catalog_index import CatalogIndex
+from .text_index import document_terms
+
+CATEGORICAL_WEIGHTS = {
+    'category': 2.0,
+    'destination_city': 1.5,
+    'supplier_name': 1.0,
+}
+
+Neighbours = List[Tuple[str, float]]
+
+
+def product_features(product: Dict[str, Any]) -> Dict[str, float]:
+    """Sublinear term weights over the searchable text plus one
+    ``field=value`` feature per categorical field."""
+    features = {term: math.log1p(weight) for term, weight in document_terms(product).items()}
+    for field, weight in CATEGORICAL_WEIGHTS.items():
+        value = product.get(field)
+        if value:
+            features[f"{field}={str(value).strip().lower()}"] = weight
+    return features
+
+
+class RelatedIndex(CatalogIndex):
+    """Precomputed cosine nearest neighbours over TF-IDF product vectors.
+
+    Rows are L2-normalised, so a block of rows times the transposed matrix
+    gives cosine similarities; the top ``NEIGHBOURS`` per product are kept
+    and ``related()`` slices them. Vocabulary and IDF are fixed when the
+    matrix is built. Terms seen in a single product cannot make two products
+    similar, so they only count towards the row norm.
+
+    Commits only mark products dirty. The next lookup recomputes the dirty
+    rows in one batch, offers them to the other products' lists and
+    recomputes only the lists that referenced a changed product. The whole
+    matrix is rebuilt once changes since the last build exceed
+    ``REBUILD_FRACTION`` of the catalog, which refreshes the IDF weights.
+    """
+
+    name = "related"
+    persistent = False
+    NEIGHBOURS = 20
+    MAX_FEATURES = 4096
+    BATCH_ROWS = 512
+    REBUILD_FRACTION = 0.25
+    DECIMALS = 6
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._features: Dict[str, Dict[str, float]] = {}
+        self._dirty: Set[str] = set()
+        self._vocab: Dict[str, int] = {}
+        self._idf: Dict[str, float] = {}
+        self._rare_idf = 1.0
+        self._rows: Dict[str, int] = {}
+        self._ids: List[Optional[str]] = []
+        self._free: List[int] = []
+        self._matrix = np.zeros((0, 0), dtype=np.float32)
+        self._alive = np.zeros(0, dtype=bool)
+        self._floors = np.zeros(0, dtype=np.float32)
+        self._neighbours: Dict[str, Neighbours] = {}
+        self._referrers: Dict[str, Set[str]] = {}
+        self._built_size = 0
+        self._drift = 0
+
+    def __len__(self) -> int:
+        return len(self._features)
+
+    def add(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        self._features[product_id] = product_features(product)
+        self._dirty.add(product_id)
+
+    def remove(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        self._features.pop(product_id, None)
+        self._dirty.add(product_id)
+
+    def build(self, products: Iterable[Dict[str, Any]]):
+        self.clear()
+        for product in products:
+            self._features[product['product_id']] = product_features(product)
+        self._rebuild()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+
+    def _rebuild(self):
+        n_docs = len(self._features)
+        df: Dict[str, int] = {}
+        for features in self._features.values():
+            for term in features:
+                df[term] = df.get(term, 0) + 1
+        shared = sorted((term for term, count in df.items() if count > 1), key=lambda t: (-df[t], t))
+        self._vocab = {term: col for col, term in enumerate(shared[:self.MAX_FEATURES])}
+        self._idf = {term: math.log((1 + n_docs) / (1 + count)) + 1.0 for term, count in df.items()}
+        self._rare_idf = math.log((1 + n_docs) / 2.0) + 1.0
+
+        ids = sorted(self._features)
+        self._rows = {pid: row for row, pid in enumerate(ids)}
+        self._ids = list(ids)
+        self._free = []
+        self._matrix = np.zeros((len(ids), len(self._vocab)), dtype=np.float32)
+        for pid, row in self._rows.items():
+            self._matrix[row] = self._vector(self._features[pid])
+        self._alive = np.ones(len(ids), dtype=bool)
+        self._floors = np.zeros(len(ids), dtype=np.float32)
+        self._neighbours = {}
+        self._referrers = {}
+        for rows, sims in self._similarities(list(range(len(ids)))):
+            for row, scores in zip(rows, sims):
+                self._set_neighbours(self._ids[row], self._select(scores))
+        self._dirty.clear()
+        self._built_size = n_docs
+        self._drift = 0
+
+    def _vector(self, features: Dict[str, float]) -> np.ndarray:
+        vector = np.zeros(len(self._vocab), dtype=np.float32)
+        total = 0.0
+        for term, weight in features.items():
+            value = weight * self._idf.get(term, self._rare_idf)
+            total += value * value
+            col = self._vocab.get(term)
+            if col is not None:
+                vector[col] = value
+        if total > 0.0:
+            vector /= math.sqrt(total)
+        return vector
+
+    def _similarities(self, rows: List[int]):
+        """Yield ``(rows, scores)`` blocks of at most BATCH_ROWS rows against
+        every live product, with self and removed rows masked out."""
+        for start in range(0, len(rows), self.BATCH_ROWS):
+            block = rows[start:start + self.BATCH_ROWS]
+            sims = np.round(self._matrix[block] @ self._matrix.T, self.DECIMALS)
+            sims[:, ~self._alive] = -1.0
+            sims[np.arange(len(block)), block] = -1.0
+            yield block, sims
+
+    def _select(self, scores: np.ndarray, limit: Optional[int] = None,
+                accept: Optional[Callable[[str], bool]] = None) -> Neighbours:
+        limit = self.NEIGHBOURS if limit is None else limit
+        positive = np.flatnonzero(scores > 0.0)
+        if accept is None and len(positive) > limit:
+            kth = np.partition(scores[positive], -limit)[-limit]
+            positive = positive[scores[positive] >= kth]
+        ids = self._ids
+        ranked = sorted(((ids[row], float(scores[row])) for row in positive.tolist()),
+                        key=lambda item: (-item[1], item[0]))
+        if accept is not None:
+            ranked = [item for item in ranked if accept(item[0])]
+        return ranked[:limit]
+
+    def _set_neighbours(self, product_id: str, neighbours: Neighbours):
+        for other, _ in self._neighbours.get(product_id, ()):
+            self._referrers.get(other, set()).discard(product_id)
+        self._neighbours[product_id] = neighbours
+        for other, _ in neighbours:
+            self._referrers.setdefault(other, set()).add(product_id)
+        full = len(neighbours) >= self.NEIGHBOURS
+        self._floors[self._rows[product_id]] = neighbours[-1][1] if full else 0.0
+
+    def _offer(self, product_id: str, candidate: str, score: float):
+        neighbours = self._neighbours[product_id]
+        neighbours.append((candidate, score))
+        neighbours.sort(key=lambda item: (-item[1], item[0]))
+        self._referrers.setdefault(candidate, set()).add(product_id)
+        if len(neighbours) > self.NEIGHBOURS:
+            dropped, _ = neighbours.pop()
+            self._referrers.get(dropped, set()).discard(product_id)
+        if len(neighbours) >= self.NEIGHBOURS:
+            self._floors[self._rows[product_id]] = neighbours[-1][1]
+
+    def _allocate(self, product_id: str) -> int:
+        if self._free:
+            row = self._free.pop()
+        else:
+            row = len(self._ids)
+            self._ids.append(None)
+            if row >= len(self._matrix):
+                capacity = max(16, 2 * len(self._matrix))
+                self._matrix = np.resize(self._matrix, (capacity, len(self._vocab)))
+                self._matrix[row:] = 0.0
+                self._alive = np.concatenate([self._alive, np.zeros(capacity - len(self._alive), dtype=bool)])
+                self._floors = np.concatenate([self._floors, np.zeros(capacity - len(self._floors), dtype=np.float32)])
+        self._ids[row] = product_id
+        self._rows[product_id] = row
+        return row
+
+    def _flush(self):
+        if not self._dirty:
+            return
+        self._drift += len(self._dirty)
+        if self._drift > self.REBUILD_FRACTION * max(self._built_size, 1):
+            self._rebuild()
+            return
+
+        dirty, self._dirty = self._dirty, set()
+        stale: Set[str] = set()
+        changed: List[int] = []
+        for product_id in dirty:
+            stale |= self._referrers.pop(product_id, set())
+            if product_id in self._neighbours:
+                self._set_neighbours(product_id, [])
+                del self._neighbours[product_id]
+            row = self._rows.get(product_id)
+            features = self._features.get(product_id)
+            if features is None:
+                if row is not None:
+                    del self._rows[product_id]
+                    self._ids[row] = None
+                    self._matrix[row] = 0.0
+                    self._alive[row] = False
+                    self._free.append(row)
+                continue
+            if row is None:
+                row = self._allocate(product_id)
+            self._matrix[row] = self._vector(features)
+            self._alive[row] = True
+            changed.append(row)
+
+        stale -= dirty
+        # Lists that referenced a changed product are recomputed below, so
+        # only the remaining ones take part in the offers.
+        floors = self._floors.copy()
+        floors[~self._alive] = np.inf
+        floors[changed] = np.inf
+        for pid in stale:
+            floors[self._rows[pid]] = np.inf
+
+        for rows, sims in self._similarities(changed):
+            for row, scores in zip(rows, sims):
+                product_id = self._ids[row]
+                self._set_neighbours(product_id, self._select(scores))
+                for other in np.flatnonzero(scores > floors).tolist():
+                    self._offer(self._ids[other], product_id, float(scores[other]))
+
+        stale_rows = sorted(self._rows[pid] for pid in stale)
+        for rows, sims in self._similarities(stale_rows):
+            for row, scores in zip(rows, sims):
+                self._set_neighbours(self._ids[row], self._select(scores))
+
+    def related(self, product_id: str, k: int = 5,
+                accept: Optional[Callable[[str], bool]] = None) -> Neighbours:
+        self._flush()
+        neighbours = self._neighbours.get(product_id)
+        if neighbours is None or k <= 0:
+            return []
+        if accept is not None:
+            neighbours = [item for item in neighbours if accept(item[0])]
+        if len(neighbours) >= k or len(self._neighbours[product_id]) < self.NEIGHBOURS:
+            return neighbours[:k]
+        # The stored list is truncated and filtering or a large k emptied it:
+        # score this one product against the whole catalog.
+        _, sims = next(self._similarities([self._rows[product_id]]))
+        return self._select(sims[0], limit=k, accept=accept)
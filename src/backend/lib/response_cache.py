@@ -0,0 +1,103 @@
+import gzip
+import json
+from typing import Any, Dict, List, Optional, Set
+
+from .catalog_index import CatalogIndex
+
+
+def encode_json(data: Any) -> bytes:
+    """Compact UTF-8 JSON, the encoding every API response uses."""
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+class ResponseCache(CatalogIndex):
+    """Pre-encoded API payloads.
+
+    Holds each product's JSON as UTF-8 bytes and the full product list and
+    per-category lists (``{"items": [...], "total": n, "next_cursor":
+    null}``), plain and, once asked for, gzipped. Lists are spliced from
+    the product fragments, so a commit re-encodes only the products it
+    touched and drops only the lists they were in.
+    """
+
+    name = "responses"
+    persistent = False
+    GZIP_LEVEL = 6
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._products: Dict[str, Dict[str, Any]] = {}
+        self._categories: Dict[str, Set[str]] = {}
+        self._encoded: Dict[str, bytes] = {}
+        # category (None for all products) -> [body, gzipped body or None]
+        self._lists: Dict[Optional[str], List[Optional[bytes]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._products)
+
+    def _invalidate(self, product: Dict[str, Any]):
+        self._encoded.pop(product['product_id'], None)
+        self._lists.pop(None, None)
+        category = product.get('category')
+        if category:
+            self._lists.pop(category, None)
+
+    def add(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        self._products[product_id] = product
+        if product.get('category'):
+            self._categories.setdefault(product['category'], set()).add(product_id)
+        self._invalidate(product)
+
+    def remove(self, product: Dict[str, Any]):
+        product_id = product['product_id']
+        self._products.pop(product_id, None)
+        members = self._categories.get(product.get('category'))
+        if members is not None:
+            members.discard(product_id)
+            if not members:
+                del self._categories[product['category']]
+        self._invalidate(product)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+
+    def adopt(self, other: 'ResponseCache'):
+        """Reuse ``other``'s encoded products where this cache holds the
+        very same record objects (see CatalogHolder)."""
+        for product_id, encoded in other._encoded.items():
+            product = self._products.get(product_id)
+            if product is not None and product is other._products.get(product_id):
+                self._encoded.setdefault(product_id, encoded)
+
+    def product(self, product_id: str) -> Optional[bytes]:
+        encoded = self._encoded.get(product_id)
+        if encoded is None:
+            product = self._products.get(product_id)
+            if product is None:
+                return None
+            encoded = self._encoded[product_id] = encode_json(product)
+        return encoded
+
+    def listing(self, category: Optional[str] = None, compressed: bool = False) -> bytes:
+        """Every product, or one category's, ordered by product_id."""
+        cached = self._lists.get(category)
+        if cached is None:
+            ids: List[str] = sorted(self._products if category is None else self._categories.get(category, ()))
+            body = b''.join([
+                b'{"items":[', b','.join([self.product(pid) for pid in ids]),
+                b'],"total":', str(len(ids)).encode('ascii'), b',"next_cursor":null}',
+            ])
+            cached = [body, None]
+            if category is None or category in self._categories:
+                self._lists[category] = cached
+        if compressed:
+            if cached[1] is None:
+                cached[1] = gzip.compress(cached[0], self.GZIP_LEVEL, mtime=0)
+            return cached[1]
+        return cached[0]
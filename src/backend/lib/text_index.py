@@ -0,0 +1,272 @@
+import base64
+import heapq
+import math
+import re
+import unicodedata
+import zlib
+from bisect import bisect_left
+from functools import lru_cache
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from .catalog_index import CatalogIndex
+
+FIELD_WEIGHTS = {
+    'product_name': 3.0,
+    'description_short': 1.5,
+    'description_long': 1.0,
+    'inclusions': 1.0,
+    'booking_policy': 0.5,
+}
+
+STOPWORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is', 'it', 'of',
+    'on', 'or', 'the', 'to', 'with', 'al', 'el',
+})
+
+_APOSTROPHES = dict.fromkeys(map(ord, "'’‘ʼʿʾ`"), None)
+_ARABIC_LETTERS = str.maketrans({'أ': 'ا', 'إ': 'ا', 'آ': 'ا', 'ٱ': 'ا', 'ة': 'ه', 'ى': 'ي', 'ـ': None})
+_TOKEN_RE = re.compile(r'\w+')
+_REPEAT_RE = re.compile(r'(.)\1+')
+
+# Spelling variants seen in romanised Arabic place and venue names
+# (souq/souk, Khalifa/Kalifa, Sheikh/Shaikh/Shaykh, Zayed/Zaid).
+_TRANSLITERATION_RULES = (
+    ('kh', 'k'), ('gh', 'g'), ('dh', 'd'), ('q', 'k'),
+    ('ou', 'u'), ('oo', 'u'), ('ee', 'i'),
+    ('ay', 'e'), ('ai', 'e'), ('ey', 'e'), ('ei', 'e'),
+)
+
+
+@lru_cache(maxsize=65536)
+def fold_token(token: str) -> str:
+    if not token.isascii():
+        return token.translate(_ARABIC_LETTERS)
+    for source, target in _TRANSLITERATION_RULES:
+        token = token.replace(source, target)
+    token = _REPEAT_RE.sub(r'\1', token)
+    if len(token) > 3 and token.endswith('h') and token[-2] in 'aeiou':
+        token = token[:-1]
+    if len(token) > 3 and token.endswith('s'):
+        token = token[:-1]
+    return token
+
+
+def fold_accents(text: str) -> str:
+    if text.isascii():
+        return text
+    text = unicodedata.normalize('NFKD', text)
+    return ''.join(ch for ch in text if not unicodedata.combining(ch))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    if not text:
+        return []
+    text = fold_accents(text.translate(_APOSTROPHES)).lower()
+    tokens = []
+    for token in _TOKEN_RE.findall(text):
+        if token in STOPWORDS:
+            continue
+        token = fold_token(token)
+        if token:
+            tokens.append(token)
+    return tokens
+
+
+def document_terms(product: Dict[str, Any]) -> Dict[str, float]:
+    weights: Dict[str, float] = {}
+    for field, weight in FIELD_WEIGHTS.items():
+        value = product.get(field)
+        if isinstance(value, list):
+            value = ' '.join(str(item) for item in value)
+        for token in tokenize(value):
+            weights[token] = weights.get(token, 0.0) + weight
+    return weights
+
+
+def _pack(values, dtype: str) -> str:
+    return base64.b64encode(zlib.compress(np.asarray(values, dtype=dtype).tobytes())).decode('ascii')
+
+
+def _unpack(text: str, dtype: str) -> np.ndarray:
+    return np.frombuffer(zlib.decompress(base64.b64decode(text)), dtype=dtype) if text else np.zeros(0, dtype)
+
+
+class TextIndex(CatalogIndex):
+    """Inverted index with BM25 ranking over the descriptive product fields.
+
+    Documents get increasing ordinals, so postings stay sorted with plain
+    appends and queries can walk them document-at-a-time (MaxScore).
+    """
+
+    name = "text"
+    version = 2
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._postings: Dict[str, Tuple[List[int], List[float]]] = {}
+        self._ordinals: Dict[str, int] = {}
+        self._doc_ids: Dict[int, str] = {}
+        self._doc_lengths: Dict[int, float] = {}
+        self._total_length = 0.0
+        self._next_ordinal = 0
+
+    def __len__(self) -> int:
+        return len(self._ordinals)
+
+    def add(self, product: Dict[str, Any]):
+        product_id = product["product_id"]
+        if product_id in self._ordinals:
+            self.remove(product)
+        ordinal = self._next_ordinal
+        self._next_ordinal += 1
+        terms = document_terms(product)
+        length = sum(terms.values())
+
+        self._ordinals[product_id] = ordinal
+        self._doc_ids[ordinal] = product_id
+        self._doc_lengths[ordinal] = length
+        self._total_length += length
+        for term, tf in terms.items():
+            ordinals, tfs = self._postings.setdefault(term, ([], []))
+            ordinals.append(ordinal)
+            tfs.append(tf)
+
+    def remove(self, product: Dict[str, Any]):
+        ordinal = self._ordinals.pop(product["product_id"], None)
+        if ordinal is None:
+            return
+        del self._doc_ids[ordinal]
+        self._total_length -= self._doc_lengths.pop(ordinal)
+        for term in document_terms(product):
+            entry = self._postings.get(term)
+            if entry is None:
+                continue
+            ordinals, tfs = entry
+            pos = bisect_left(ordinals, ordinal)
+            if pos < len(ordinals) and ordinals[pos] == ordinal:
+                del ordinals[pos]
+                del tfs[pos]
+            if not ordinals:
+                del self._postings[term]
+
+    def to_dict(self) -> Dict[str, Any]:
+        # Postings are concatenated in term order and stored as packed
+        # little-endian arrays; ordinals as deltas, which compress to a few
+        # bits each.
+        terms = list(self._postings)
+        return {
+            'next': self._next_ordinal,
+            'ids': list(self._doc_ids.values()),
+            'doc_ordinals': _pack(np.diff(list(self._doc_ids), prepend=0), '<i8'),
+            'doc_lengths': _pack(list(self._doc_lengths.values()), '<f8'),
+            'terms': terms,
+            'counts': _pack([len(self._postings[term][0]) for term in terms], '<i8'),
+            'ordinals': _pack(np.diff([o for term in terms for o in self._postings[term][0]], prepend=0), '<i8'),
+            'tfs': _pack([tf for term in terms for tf in self._postings[term][1]], '<f8'),
+        }
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+        self._next_ordinal = data.get('next', 0)
+        product_ids = data.get('ids', [])
+        doc_ordinals = np.cumsum(_unpack(data.get('doc_ordinals', ''), '<i8')).tolist()
+        doc_lengths = _unpack(data.get('doc_lengths', ''), '<f8').tolist()
+        self._ordinals = dict(zip(product_ids, doc_ordinals))
+        self._doc_ids = dict(zip(doc_ordinals, product_ids))
+        self._doc_lengths = dict(zip(doc_ordinals, doc_lengths))
+        self._total_length = sum(doc_lengths)
+
+        ordinals = np.cumsum(_unpack(data.get('ordinals', ''), '<i8')).tolist()
+        tfs = _unpack(data.get('tfs', ''), '<f8').tolist()
+        start = 0
+        for term, count in zip(data.get('terms', []), _unpack(data.get('counts', ''), '<i8').tolist()):
+            self._postings[term] = (ordinals[start:start + count], tfs[start:start + count])
+            start += count
+
+    def search(self, text: str, k: int = 10,
+               accept: Optional[Callable[[str], bool]] = None) -> List[Tuple[str, float]]:
+        terms = sorted(set(tokenize(text)))
+        n_docs = len(self._ordinals)
+        if not terms or n_docs == 0 or k <= 0:
+            return []
+
+        avg_length = self._total_length / n_docs or 1.0
+        lists = []
+        for term in terms:
+            entry = self._postings.get(term)
+            if not entry:
+                continue
+            df = len(entry[0])
+            idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+            lists.append((idf * (self.K1 + 1.0), idf, entry[0], entry[1]))
+        if not lists:
+            return []
+
+        # MaxScore: lists ordered by score upper bound; a list is only used to
+        # generate candidates while the bounds of the cheaper lists together
+        # could still lift a document into the top k.
+        lists.sort(key=lambda item: item[0])
+        bounds = []
+        running = 0.0
+        for item in lists:
+            running += item[0]
+            bounds.append(running)
+        pointers = [0] * len(lists)
+        first_essential = 0
+        threshold = 0.0
+        heap: List[Tuple[float, int]] = []
+        doc_lengths = self._doc_lengths
+        k1, b = self.K1, self.B
+
+        def term_score(idf: float, tf: float, ordinal: int) -> float:
+            norm = k1 * (1.0 - b + b * doc_lengths[ordinal] / avg_length)
+            return idf * tf * (k1 + 1.0) / (tf + norm)
+
+        while True:
+            candidate = None
+            for i in range(first_essential, len(lists)):
+                ordinals = lists[i][2]
+                if pointers[i] < len(ordinals) and (candidate is None or ordinals[pointers[i]] < candidate):
+                    candidate = ordinals[pointers[i]]
+            if candidate is None:
+                break
+
+            score = 0.0
+            for i in range(first_essential, len(lists)):
+                _, idf, ordinals, tfs = lists[i]
+                p = pointers[i]
+                if p < len(ordinals) and ordinals[p] == candidate:
+                    score += term_score(idf, tfs[p], candidate)
+                    pointers[i] = p + 1
+
+            if accept is not None and not accept(self._doc_ids[candidate]):
+                continue
+
+            for i in range(first_essential - 1, -1, -1):
+                if score + bounds[i] <= threshold:
+                    break
+                _, idf, ordinals, tfs = lists[i]
+                p = bisect_left(ordinals, candidate, pointers[i])
+                pointers[i] = p
+                if p < len(ordinals) and ordinals[p] == candidate:
+                    score += term_score(idf, tfs[p], candidate)
+
+            if len(heap) < k:
+                heapq.heappush(heap, (score, -candidate))
+            elif score > threshold:
+                heapq.heapreplace(heap, (score, -candidate))
+            else:
+                continue
+            if len(heap) == k:
+                threshold = heap[0][0]
+                while first_essential < len(lists) and bounds[first_essential] <= threshold:
+                    first_essential += 1
+
+        ranked = sorted(heap, key=lambda item: (-item[0], -item[1]))
+        return [(self._doc_ids[-neg], score) for score, neg in ranked]
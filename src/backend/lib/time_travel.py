@@ -0,0 +1,123 @@
+import copy
+import json
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional
+
+from .catalog_index import CatalogIndex
+from .price_history import Moment, format_timestamp, to_timestamp
+from .undo_log import UndoLog, record_hash
+from .validity_index import DateLike
+from . import catalog_query
+
+
+class CatalogView:
+    """Read-only catalog as it was at one generation.
+
+    Supports the same ``get``/``query`` calls as CatalogManager. Indexes
+    that a query needs are built from the view's records on first use and
+    kept with the view.
+    """
+
+    def __init__(self, manager, generation: int, records: Dict[str, Dict[str, Any]]):
+        self._manager = manager
+        self.generation = generation
+        self._records = records
+        self._indexes: Dict[str, CatalogIndex] = {}
+
+    def _records_by_id(self) -> Dict[str, Dict[str, Any]]:
+        return self._records
+
+    def get_index(self, name: str) -> CatalogIndex:
+        index = self._indexes.get(name)
+        if index is None:
+            index = type(self._manager.indexes[name])()
+            index.build(self._records.values())
+            self._indexes[name] = index
+        return index
+
+    def count(self) -> int:
+        return len(self._records)
+
+    def get(self, product_id: str) -> Optional[Dict[str, Any]]:
+        record = self._records.get(product_id)
+        return None if record is None else copy.deepcopy(record)
+
+    def query(self, where: Optional[Dict[str, Any]] = None, fields: Optional[List[str]] = None,
+              order_by: Optional[List[str]] = None, limit: Optional[int] = None, offset: int = 0,
+              cursor: Optional[str] = None, currency: Optional[str] = None,
+              rate_date: Optional[DateLike] = None) -> Dict[str, Any]:
+        return catalog_query.execute(
+            self, where=where, fields=fields, order_by=order_by,
+            limit=limit, offset=offset, cursor=cursor,
+            conversion=self._manager.conversion(currency, rate_date),
+        )
+
+
+class CatalogHistory:
+    """Reconstructs past generations from the undo log.
+
+    Starting from the current records (or the nearest later generation
+    already cached), the before-images of every batch after the target are
+    applied newest first. Each step checks that the records still hash to
+    what the batch wrote, so history across an external rewrite of the
+    snapshot is refused rather than made up. The last ``capacity`` views
+    are kept in an LRU.
+    """
+
+    def __init__(self, undo: UndoLog, capacity: int = 8):
+        self.undo = undo
+        self.capacity = capacity
+        self._views: 'OrderedDict[int, CatalogView]' = OrderedDict()
+
+    def generation_at(self, moment: Moment) -> int:
+        """Generation produced by the last batch committed at or before ``moment``."""
+        at = to_timestamp(moment)
+        found = None
+        oldest = None
+        for generation, committed_at, _ in self.undo.headers():
+            oldest = committed_at if oldest is None else oldest
+            if committed_at <= at:
+                found = generation
+        if found is None:
+            since = f" (history starts {format_timestamp(int(oldest))})" if oldest is not None else ""
+            raise ValueError(f"No catalog history at {format_timestamp(at)}{since}")
+        return found
+
+    def view(self, manager, generation: int) -> CatalogView:
+        cached = self._views.get(generation)
+        if cached is not None:
+            self._views.move_to_end(generation)
+            return cached
+        if generation > manager.generation:
+            raise ValueError(f"Generation {generation} is in the future (current: {manager.generation})")
+
+        start = min((g for g in self._views if g > generation), default=None)
+        if start is None:
+            start, records = manager.generation, dict(manager._records_by_id())
+        else:
+            records = dict(self._views[start]._records)
+
+        logged = [(g, line) for g, _, line in self.undo.headers()]
+        if generation < start and not any(g <= generation + 1 for g, _ in logged):
+            oldest = f" (oldest: {logged[0][0] - 1})" if logged else ""
+            raise ValueError(f"Generation {generation} is no longer in the catalog history{oldest}")
+        later = [line for g, line in logged if generation < g <= start]
+        for line in reversed(later):
+            entry = json.loads(line)
+            for product_id, before, after_hash in entry['records']:
+                if record_hash(records.get(product_id)) != after_hash:
+                    raise ValueError(
+                        f"No catalog history before generation {entry['generation']}: "
+                        "the catalog was changed outside the manager"
+                    )
+            for product_id, before, _ in entry['records']:
+                if before is None:
+                    records.pop(product_id, None)
+                else:
+                    records[product_id] = before
+
+        view = CatalogView(manager, generation, records)
+        self._views[generation] = view
+        while len(self._views) > self.capacity:
+            self._views.popitem(last=False)
+        return view
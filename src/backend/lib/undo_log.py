@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+import re
+import time
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+Changes = Dict[str, Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]
+
+# The fields every line starts with, read without parsing the records.
+_HEADER = re.compile(rb'\{"batch": "(?:[^"\\]|\\.)*", "generation": (\d+), "committed_at": ([0-9.eE+-]+),')
+
+
+def record_hash(record: Optional[Dict[str, Any]]) -> Optional[str]:
+    """Content hash of a stored record (None for an absent one)."""
+    if record is None:
+        return None
+    encoded = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]
+
+
+class UndoLog:
+    """Append-only log with one JSON line per committed batch.
+
+    A line holds the batch id, the generation it produced, its commit time
+    and, per touched product, the record before the batch and a hash of the
+    record it wrote. Rolling back needs only that line: the before-images
+    are restored for products whose current record still hashes to what
+    the batch wrote, and any other product is a conflict.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+
+    @staticmethod
+    def _prefix(batch_id: str) -> bytes:
+        # Lines start with the batch id, so a lookup parses only its match.
+        return json.dumps({'batch': batch_id}, ensure_ascii=False)[:-1].encode('utf-8') + b','
+
+    def append(self, batch_id: str, generation: int, changes: Changes,
+               committed_at: Optional[float] = None):
+        entry = {
+            'batch': batch_id,
+            'generation': generation,
+            'committed_at': time.time() if committed_at is None else committed_at,
+            'records': [
+                [product_id, before, record_hash(after)]
+                for product_id, (before, after) in sorted(changes.items())
+            ],
+        }
+        with open(self.path, 'ab') as f:
+            f.write(json.dumps(entry, ensure_ascii=False).encode('utf-8') + b'\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _lines(self) -> Iterator[bytes]:
+        try:
+            with open(self.path, 'rb') as f:
+                for line in f:
+                    if line.endswith(b'\n'):
+                        yield line
+        except FileNotFoundError:
+            return
+
+    def find(self, batch_id: str) -> Optional[Dict[str, Any]]:
+        """The latest entry logged under ``batch_id``."""
+        prefix = self._prefix(batch_id)
+        found = None
+        for line in self._lines():
+            if line.startswith(prefix):
+                found = line
+        return json.loads(found) if found is not None else None
+
+    def headers(self) -> Iterator[Tuple[int, float, bytes]]:
+        """``(generation, committed_at, line)`` per batch, oldest first;
+        parse ``line`` only for the batches you need."""
+        for line in self._lines():
+            match = _HEADER.match(line)
+            if match:
+                yield int(match.group(1)), float(match.group(2)), line
+
+    def batches(self, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Summaries of logged batches, newest first."""
+        summaries = []
+        for line in self._lines():
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            summaries.append({
+                'batch': entry['batch'],
+                'generation': entry['generation'],
+                'committed_at': entry['committed_at'],
+                'products': len(entry['records']),
+            })
+        summaries.reverse()
+        return summaries[:limit] if limit is not None else summaries
+
+    def prune(self, cutoff: float):
+        """Drop batches committed before ``cutoff`` (epoch seconds). Only
+        the first line is read unless something is old enough to drop."""
+        lines = self._lines()
+        first = next(lines, None)
+        if first is None or json.loads(first)['committed_at'] >= cutoff:
+            return
+        kept = [line for line in lines if json.loads(line)['committed_at'] >= cutoff]
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.writelines(kept)
+        os.replace(tmp_path, self.path)
+
+    @staticmethod
+    def plan(entry: Dict[str, Any], current: Dict[str, Dict[str, Any]]) -> Tuple[Changes, List[str]]:
+        """Split a logged batch into the changes that restore its
+        before-images and the ids modified since (conflicts)."""
+        changes: Changes = {}
+        conflicts = []
+        for product_id, before, after_hash in entry['records']:
+            now = current.get(product_id)
+            if record_hash(now) != after_hash:
+                conflicts.append(product_id)
+            elif record_hash(before) != after_hash:
+                changes[product_id] = (now, before)
+        return changes, conflicts
@@ -0,0 +1,108 @@
+from bisect import bisect_left, bisect_right, insort
+from datetime import date, datetime
+from typing import Any, Dict, List, Set, Tuple, Union
+
+from .catalog_index import CatalogIndex
+
+OPEN_START = date.min.toordinal()
+OPEN_END = date.max.toordinal()
+
+DateLike = Union[date, datetime, str]
+
+
+def to_ordinal(value: DateLike) -> int:
+    if isinstance(value, datetime):
+        return value.date().toordinal()
+    if isinstance(value, date):
+        return value.toordinal()
+    return date.fromisoformat(value).toordinal()
+
+
+def tier_window(tier: Dict[str, Any]) -> Tuple[int, int]:
+    start = tier.get('validity_start')
+    end = tier.get('validity_end')
+    return (
+        to_ordinal(start) if start else OPEN_START,
+        to_ordinal(end) if end else OPEN_END,
+    )
+
+
+class ValidityIndex(CatalogIndex):
+    """Interval index over pricing tier validity windows.
+
+    Tiers are grouped by distinct (start, end) window, since suppliers tend
+    to reuse the same season dates across many products. Windows are kept
+    in two sorted endpoint lists so a stabbing query only inspects windows
+    on the smaller side of the date.
+    """
+
+    name = "validity"
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self._tiers: Dict[str, List[Tuple[int, int]]] = {}
+        self._windows: Dict[Tuple[int, int], Dict[str, int]] = {}
+        self._by_start: List[Tuple[int, int]] = []
+        self._by_end: List[Tuple[int, int]] = []
+
+    def _link(self, product_id: str, windows: List[Tuple[int, int]]):
+        self._tiers[product_id] = windows
+        for window in windows:
+            members = self._windows.get(window)
+            if members is None:
+                members = self._windows[window] = {}
+                insort(self._by_start, window)
+                insort(self._by_end, (window[1], window[0]))
+            members[product_id] = members.get(product_id, 0) + 1
+
+    def add(self, product: Dict[str, Any]):
+        windows = [tier_window(tier) for tier in product.get('pricing') or []]
+        self._link(product['product_id'], windows)
+
+    def remove(self, product: Dict[str, Any]):
+        windows = self._tiers.pop(product['product_id'], [])
+        for window in windows:
+            members = self._windows.get(window)
+            if members is None:
+                continue
+            remaining = members.get(product['product_id'], 0) - 1
+            if remaining > 0:
+                members[product['product_id']] = remaining
+                continue
+            members.pop(product['product_id'], None)
+            if not members:
+                del self._windows[window]
+                del self._by_start[bisect_left(self._by_start, window)]
+                del self._by_end[bisect_left(self._by_end, (window[1], window[0]))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {'tiers': {pid: [list(w) for w in windows] for pid, windows in self._tiers.items()}}
+
+    def load_dict(self, data: Dict[str, Any]):
+        self.clear()
+        for product_id, windows in data.get('tiers', {}).items():
+            self._link(product_id, [tuple(w) for w in windows])
+
+    def windows_on(self, day: DateLike) -> List[Tuple[int, int]]:
+        ordinal = to_ordinal(day)
+        started = bisect_right(self._by_start, (ordinal, OPEN_END))
+        not_ended = len(self._by_end) - bisect_left(self._by_end, (ordinal, OPEN_START))
+        if started <= not_ended:
+            return [w for w in self._by_start[:started] if w[1] >= ordinal]
+        return [(s, e) for e, s in self._by_end[len(self._by_end) - not_ended:] if s <= ordinal]
+
+    def products_on(self, day: DateLike) -> Set[str]:
+        """Products with a tier valid on ``day``, active or not."""
+        ids: Set[str] = set()
+        for window in self.windows_on(day):
+            ids.update(self._windows[window])
+        return ids
+
+    def valid_tiers(self, product_id: str, day: DateLike) -> List[int]:
+        ordinal = to_ordinal(day)
+        return [
+            idx for idx, (start, end) in enumerate(self._tiers.get(product_id, []))
+            if start <= ordinal <= end
+        ]
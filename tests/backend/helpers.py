@@ -0,0 +1,25 @@
+"""Record factories shared by the backend tests."""
+
+
+def tiers(*prices, **fields):
+    """One pricing tier per price: "Adult" for a single price, "Tier <i>"
+    for several. ``fields`` (e.g. ``validity_end``) go on every tier."""
+    names = ["Adult"] if len(prices) == 1 else [f"Tier {i}" for i in range(len(prices))]
+    return [dict({"tier_name": name, "price_aed": price}, **fields) for name, price in zip(names, prices)]
+
+
+def make_product(product_id, *prices, **fields):
+    """A minimal valid product record.
+
+    ``product_name`` defaults to the id, ``pricing`` to ``tiers(*prices)``
+    (one Adult tier at 100 when no price is given) and ``inclusions`` to an
+    empty list. Any other keyword becomes a field of the record.
+    """
+    record = {
+        "product_id": product_id,
+        "product_name": product_id,
+        "pricing": tiers(*(prices or (100,))),
+        "inclusions": [],
+    }
+    record.update(fields)
+    return record
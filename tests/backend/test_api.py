@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+
+import unittest
+import base64
+import os
+import sys
+import json
+import threading
+import tempfile
+import shutil
+import urllib.error
+import urllib.request
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.api import create_app
+from backend.api.app import etag_matches, make_server
+from backend.lib.catalog_manager import CatalogManager
+from helpers import make_product
+
+
+class TestCatalogApp(unittest.TestCase):
+    """Test suite for the read API's routing and validators."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("A", 150, category="Sightseeing"),
+            make_product("B", 80, category="Family"),
+        ])
+        self.app = create_app(db_path=self.db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def get(self, target, etag=None):
+        return self.app.handle('GET', target, {'If-None-Match': etag} if etag else {})
+
+    def test_routes(self):
+        """Test products, product by id, query and stats."""
+        listing = json.loads(self.get('/products?category=Family&fields=product_id').body)
+        self.assertEqual(listing['items'], [{"product_id": "B"}])
+        self.assertEqual(json.loads(self.get('/products/A').body)['category'], "Sightseeing")
+        result = json.loads(self.get('/query?where={"price":{"gte":100}}&fields=product_id,price').body)
+        self.assertEqual(result['items'], [{"product_id": "A", "price": 150.0}])
+        self.assertEqual(json.loads(self.get('/stats').body)['total'], 2)
+
+        self.assertEqual(self.get('/products/Z').status, 404)
+        self.assertEqual(self.get('/nowhere').status, 404)
+        self.assertEqual(self.get('/query?where={bad').status, 400)
+        self.assertEqual(self.get('/query?where=%5B1%5D').status, 400)
+        self.assertEqual(self.get('/query?cursor=W10=').status, 400)
+        self.assertEqual(self.get('/query?cursor=e30=').status, 400)
+        for payload in (b'{"o":[],"k":[]}', b'{"o":[1],"k":["A"]}', b'{"o":[],"k":[1]}'):
+            cursor = base64.urlsafe_b64encode(payload).decode('ascii')
+            self.assertEqual(self.get(f'/query?cursor={cursor}').status, 400, payload)
+        short = base64.urlsafe_b64encode(b'{"o":[["product_name",false]],"k":["A"]}').decode('ascii')
+        self.assertEqual(self.get(f'/query?order_by=product_name&cursor={short}').status, 400)
+        self.assertEqual(self.get('/products?limit=x').status, 400)
+        self.assertEqual(self.app.handle('POST', '/products', {}).status, 405)
+
+    def test_not_modified_until_catalog_changes(self):
+        """Test 304 for a current ETag and a new ETag after a commit."""
+        first = self.get('/products')
+        etag = dict(first.headers)['ETag']
+        not_modified = self.get('/products', etag)
+        self.assertEqual((not_modified.status, not_modified.body), (304, b''))
+        self.assertEqual(self.get('/products?limit=1', etag).status, 200)
+
+        self.manager.upsert_batch([{"product_id": "B", "product_name": "Bee"}])
+        self.assertEqual(self.get('/products', etag).status, 304)
+        self.assertTrue(self.app.holder.check())
+        self.assertEqual(self.get('/products', etag).status, 200)
+
+    def test_product_etag_follows_product_only(self):
+        """Test that one product's ETag survives changes to other products."""
+        etag = dict(self.get('/products/A').headers)['ETag']
+        self.manager.upsert_batch([{"product_id": "B", "active": False}])
+        self.app.holder.check()
+        self.assertEqual(self.get('/products/A', etag).status, 304)
+        self.manager.upsert_batch([{"product_id": "A", "active": False}])
+        self.app.holder.check()
+        self.assertEqual(self.get('/products/A', etag).status, 200)
+        self.manager.delete(["A"])
+        self.app.holder.check()
+        self.assertEqual(self.get('/products/A', etag).status, 404)
+
+    def test_etag_matching(self):
+        """Test If-None-Match lists, weak tags and the wildcard."""
+        self.assertTrue(etag_matches('"x", W/"1-a"', '"1-a"'))
+        self.assertTrue(etag_matches('*', '"1-a"'))
+        self.assertFalse(etag_matches('"1-b"', '"1-a"'))
+        self.assertFalse(etag_matches(None, '"1-a"'))
+
+
+class TestCatalogServer(unittest.TestCase):
+    """Test suite for the HTTP server wrapper."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        CatalogManager(db_path=self.db_path).upsert_batch([make_product("A", category="Sightseeing")])
+        self.server = make_server(create_app(db_path=self.db_path), '127.0.0.1', 0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.base = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_conditional_get_over_http(self):
+        """Test a 200 with an ETag followed by a 304 over a real socket."""
+        with urllib.request.urlopen(f"{self.base}/products/A") as response:
+            etag = response.headers['ETag']
+            self.assertEqual(json.loads(response.read())['product_id'], "A")
+        request = urllib.request.Request(f"{self.base}/products/A", headers={'If-None-Match': etag})
+        with self.assertRaises(urllib.error.HTTPError) as raised:
+            urllib.request.urlopen(request)
+        self.assertEqual(raised.exception.code, 304)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,268 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import json
+import threading
+import tempfile
+import shutil
+import http.client
+from concurrent.futures import Future
+from pathlib import Path
+from unittest.mock import patch
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.api import create_app
+from backend.api import app as api
+from backend.api.app import make_server
+from backend.lib.bulk_writer import BulkWriter, iter_lines, parse_record
+from backend.lib.catalog_manager import CatalogManager
+from helpers import make_product
+
+
+def ndjson(*records):
+    return b''.join(
+        (record if isinstance(record, bytes) else json.dumps(record).encode('utf-8')) + b'\n'
+        for record in records
+    )
+
+
+class TestBulkWriter(unittest.TestCase):
+    """Test suite for streamed, group-committed bulk writes."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([make_product("A"), make_product("B")])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_iter_lines(self):
+        """Test line splitting across chunk boundaries and the length limit."""
+        chunks = [b'{"a"', b':1}\n\n{"b":2}\n{"c"', b':3}']
+        self.assertEqual(list(iter_lines(chunks, 100)), [(1, b'{"a":1}'), (3, b'{"b":2}'), (4, b'{"c":3}')])
+        with self.assertRaises(ValueError):
+            list(iter_lines([b'x' * 50, b'x' * 60], 100))
+
+    def test_parse_record(self):
+        """Test the checks made on each line before it is queued."""
+        self.assertEqual(parse_record(b'{"product_id": "A", "active": false}'),
+                         ("A", {"product_id": "A", "active": False}, None))
+        for line, expected_id in ((b'{"product_id": "A",', None), (b'[1]', None), (b'{"product_name": "x"}', None),
+                                  (b'{"product_id": "A", "colour": "red"}', "A"),
+                                  (b'{"product_id": "A", "active": "maybe"}', "A")):
+            product_id, record, error = parse_record(line)
+            self.assertEqual(product_id, expected_id)
+            self.assertIsNone(record)
+            self.assertTrue(error)
+
+    def test_upsert_each_skips_invalid_records(self):
+        """Test that one bad record doesn't fail the rest of the commit."""
+        errors = self.manager.upsert_each([
+            {"product_id": "A", "active": False},
+            {"product_id": "Z", "active": False},
+            make_product("C"),
+        ])
+        self.assertIsNone(errors[0])
+        self.assertIn("product_name", errors[1])
+        self.assertIsNone(errors[2])
+        self.assertFalse(self.manager.get("A")["active"])
+        self.assertIsNone(self.manager.get("Z"))
+        self.assertIsNotNone(self.manager.get("C"))
+        self.assertIsNotNone(self.manager.undo.find(self.manager.last_batch_id))
+
+    def test_group_commit(self):
+        """Test that chunks queued together are written in one commit."""
+        writer = BulkWriter(CatalogManager(db_path=self.db_path), max_batch=100)
+        futures = [writer.submit([make_product(f"P{i}")]) for i in range(3)]
+        futures.append(writer.submit([{"product_id": "Q"}]))
+        generation = self.manager.catalog_version()[0]
+        writer.start()
+        results = [future.result(timeout=10) for future in futures]
+        writer.stop()
+        self.assertEqual(writer.commits, 1)
+        self.assertEqual(self.manager.catalog_version()[0], generation + 1)
+        self.assertEqual({batch for batch, _ in results}, {results[0][0]})
+        self.assertEqual([errors[0] is None for _, errors in results], [True, True, True, False])
+
+    def test_full_queue_pushes_back(self):
+        """Test that submit() waits for room and gives up after its timeout."""
+        writer = BulkWriter(CatalogManager(db_path=self.db_path), max_pending=1)
+        writer.submit([make_product("C")])
+        with self.assertRaises(TimeoutError):
+            writer.submit([make_product("D")], timeout=0.05)
+        writer.start()
+        writer.submit([make_product("D")], timeout=10).result(timeout=10)
+        writer.stop()
+        self.assertIsNotNone(self.manager.get("D"))
+
+    def test_failing_on_commit_keeps_writer_running(self):
+        """Test that results are out before on_commit and that its errors don't stop the writer."""
+        seen = []
+
+        def on_commit(batch_id):
+            seen.append(futures[len(seen)].done())
+            raise KeyError(batch_id)
+
+        writer = BulkWriter(CatalogManager(db_path=self.db_path), on_commit=on_commit)
+        futures = [writer.submit([make_product("C")])]
+        writer.start()
+        writer.result(futures[0], 10)
+        futures.append(writer.submit([make_product("D")], timeout=10))
+        self.assertIsNone(writer.result(futures[1], 10)[1][0])
+        writer.stop()
+        self.assertEqual(seen, [True, True])
+        self.assertIsInstance(writer.last_error, KeyError)
+
+    def test_stopped_writer_fails_uploads(self):
+        """Test that waiting on a writer that is gone fails instead of hanging."""
+        writer = BulkWriter(CatalogManager(db_path=self.db_path))
+        writer.start()
+        writer.stop()
+        with self.assertRaises(RuntimeError):
+            writer.result(Future(), 10)
+        with self.assertRaises(RuntimeError):
+            writer.submit([make_product("C")])
+
+        app = create_app(db_path=self.db_path, writable=True, write_key='k')
+        app.writer = writer
+        results = list(app.bulk([ndjson(make_product("C"), make_product("D"))]))
+        summary = results.pop()['summary']
+        self.assertEqual([r['status'] for r in results], ['error', 'error'])
+        self.assertEqual((summary['written'], summary['failed']), (0, 2))
+        self.assertIn("not running", summary['error'])
+
+    def test_bulk_results_in_order(self):
+        """Test per-record results, their order and the summary across chunks."""
+        app = create_app(db_path=self.db_path, writable=True, write_key='k')
+        app.start()
+        self.addCleanup(app.stop)
+        body = ndjson(
+            {"product_id": "A", "product_name": "Renamed"},
+            b'not json',
+            {"product_id": "Z", "active": False},
+            *[make_product(f"N{i:02d}") for i in range(5)],
+        )
+        original = api.BULK_CHUNK
+        api.BULK_CHUNK = 2
+        try:
+            results = list(app.bulk([body[:7], body[7:40], body[40:]]))
+        finally:
+            api.BULK_CHUNK = original
+
+        summary = results.pop()['summary']
+        self.assertEqual([r['line'] for r in results], list(range(1, 9)))
+        self.assertEqual([r['status'] for r in results], ['ok', 'error', 'error'] + ['ok'] * 5)
+        self.assertIn("product_name", results[2]['error'])
+        self.assertEqual([r['product_id'] for r in results[:3]], ["A", None, "Z"])
+        self.assertEqual((summary['written'], summary['failed']), (6, 2))
+        self.assertNotIn('error', summary)
+        self.assertEqual(set(summary['batches']), {r['batch'] for r in results if r['status'] == 'ok'})
+        # Reads see the upload as soon as its results are out.
+        self.assertEqual(json.loads(app.handle('GET', '/products/A', {}).body)['product_name'], "Renamed")
+        self.assertEqual(json.loads(app.handle('GET', '/stats', {}).body)['total'], 7)
+
+    def test_rejected_line_reports_its_product_id(self):
+        """Test that a line failing field checks is reported under its product_id."""
+        app = create_app(db_path=self.db_path, writable=True, write_key='k')
+        app.start()
+        self.addCleanup(app.stop)
+        results = list(app.bulk([ndjson({"product_id": "A", "active": "maybe"}, {"product_id": 7})]))
+        results.pop()
+        self.assertEqual([(r['product_id'], r['status']) for r in results], [("A", 'error'), (None, 'error')])
+        self.assertIn("active", results[0]['error'])
+
+    def test_bulk_stops_at_overlong_line(self):
+        """Test that records before a bad line are written and the rest not read."""
+        app = create_app(db_path=self.db_path, writable=True, write_key='k')
+        app.start()
+        self.addCleanup(app.stop)
+        body = ndjson(make_product("C"), b'x' * (api.MAX_LINE_BYTES + 1), make_product("D"))
+        results = list(app.bulk([body]))
+        summary = results.pop()['summary']
+        self.assertEqual([r['product_id'] for r in results], ["C"])
+        self.assertIn("longer than", summary['error'])
+        self.assertIsNone(self.manager.get("D"))
+
+
+class TestBulkEndpoint(unittest.TestCase):
+    """Test suite for POST /products/bulk over HTTP."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        CatalogManager(db_path=self.db_path).upsert_batch([make_product("A")])
+        self.app = create_app(db_path=self.db_path, writable=True, write_key='secret')
+        self.app.start()
+        self.server = make_server(self.app, '127.0.0.1', 0)
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.port = self.server.server_address[1]
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        self.app.stop()
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def post(self, body, token='secret', chunked=True):
+        connection = http.client.HTTPConnection('127.0.0.1', self.port, timeout=10)
+        headers = {'Content-Type': 'application/x-ndjson'}
+        if token:
+            headers['Authorization'] = f"Bearer {token}"
+        if chunked:
+            connection.request('POST', '/products/bulk', body=iter([body[:10], body[10:]]),
+                               headers=headers, encode_chunked=True)
+        else:
+            connection.request('POST', '/products/bulk', body=body, headers=headers)
+        response = connection.getresponse()
+        data = response.read()
+        connection.close()
+        return response.status, data
+
+    def test_chunked_upload(self):
+        """Test a chunked upload and its streamed NDJSON results."""
+        status, data = self.post(ndjson(make_product("B"), {"product_id": "A", "active": False}))
+        self.assertEqual(status, 200)
+        lines = [json.loads(line) for line in data.splitlines()]
+        self.assertEqual([line.get('status') for line in lines[:-1]], ['ok', 'ok'])
+        self.assertEqual(lines[-1]['summary']['written'], 2)
+        listing = json.loads(self.app.handle('GET', '/products', {}).body)
+        self.assertEqual([p['product_id'] for p in listing['items']], ["A", "B"])
+
+    def test_content_length_upload(self):
+        """Test an upload sent with a Content-Length."""
+        status, data = self.post(ndjson(make_product("C")), chunked=False)
+        self.assertEqual(status, 200)
+        self.assertEqual(json.loads(data.splitlines()[-1])['summary']['written'], 1)
+
+    def test_requires_token(self):
+        """Test that writes without the right bearer token are refused."""
+        self.assertEqual(self.post(ndjson(make_product("C")), token=None)[0], 401)
+        self.assertEqual(self.post(ndjson(make_product("C")), token='wrong')[0], 401)
+        self.assertIsNone(self.app.holder.current.get("C"))
+
+    def test_writes_need_explicit_key(self):
+        """Test that a writable app won't start on the development default key."""
+        with patch.dict(os.environ):
+            os.environ.pop('API_SECRET_KEY', None)
+            with self.assertRaises(ValueError):
+                create_app(db_path=self.db_path, writable=True)
+            os.environ['API_SECRET_KEY'] = 'from-env'
+            self.assertEqual(create_app(db_path=self.db_path, writable=True).write_key, 'from-env')
+
+    def test_read_only_app_refuses_posts(self):
+        """Test that an app without a writer answers POST with 405."""
+        read_only = create_app(db_path=self.db_path)
+        self.assertEqual(read_only.handle('POST', '/products/bulk', {}).status, 405)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
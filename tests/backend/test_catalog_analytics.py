@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import random
+import statistics
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.catalog_analytics import CatalogAnalytics
+from helpers import make_product, tiers
+
+
+class TestCatalogAnalytics(unittest.TestCase):
+    """Test suite for columnar grouped aggregates."""
+
+    def setUp(self):
+        rng = random.Random(3)
+        self.products = [
+            make_product(
+                f"P{i:03d}",
+                category=rng.choice(["Adventure", "Cultural", "Cruise", None]),
+                destination_city=rng.choice(["Dubai", "Abu Dhabi"]),
+                pricing=tiers(*[round(rng.uniform(10, 900), 2) for _ in range(rng.randint(0, 3))]),
+                duration_hours=rng.choice([None, 0.5, 2, 3.5, 8, 30]),
+                active=rng.random() > 0.2,
+            )
+            for i in range(200)
+        ]
+        self.analytics = CatalogAnalytics()
+        self.analytics.build(self.products)
+
+    def test_group_by_matches_python(self):
+        """Test that grouped counts and price quantiles match a per-record loop."""
+        for group in self.analytics.group_by('category'):
+            members = [p for p in self.products if p["category"] == group["value"]]
+            prices = [min(t["price_aed"] for t in p["pricing"]) for p in members if p["pricing"]]
+            self.assertEqual(group["count"], len(members))
+            self.assertEqual(group["active"], sum(p["active"] for p in members))
+            self.assertEqual(group["min_price"], min(prices))
+            self.assertEqual(group["median_price"], round(statistics.median(prices), 2))
+            self.assertEqual(group["max_price"], max(prices))
+        counts = [group["count"] for group in self.analytics.group_by('category')]
+        self.assertEqual(counts, sorted(counts, reverse=True))
+
+        active = self.analytics.group_by('destination_city', active_only=True)
+        self.assertEqual(sum(g["count"] for g in active), sum(p["active"] for p in self.products))
+        with self.assertRaises(ValueError):
+            self.analytics.group_by('product_name')
+
+    def test_duration_histogram(self):
+        """Test left-closed bins, the open last bin and unknown durations."""
+        histogram = self.analytics.duration_histogram(bins=[0, 2, 8])
+        self.assertEqual(histogram["bins"], ["0-2h", "2-8h", "8h+"])
+        durations = [p["duration_hours"] for p in self.products]
+        self.assertEqual(histogram["counts"], [
+            sum(d is not None and d < 2 for d in durations),
+            sum(d is not None and 2 <= d < 8 for d in durations),
+            sum(d is not None and d >= 8 for d in durations),
+        ])
+        self.assertEqual(histogram["unknown"], durations.count(None))
+
+        by_city = self.analytics.duration_histogram(by='destination_city', bins=[0, 2, 8])
+        self.assertEqual([sum(col) for col in zip(*(g["counts"] for g in by_city["groups"].values()))],
+                         histogram["counts"])
+
+    def test_columns_rebuilt_after_change(self):
+        """Test that columns are materialised once and refreshed on change."""
+        columns = self.analytics.columns()
+        self.assertIs(self.analytics.columns(), columns)
+        self.analytics.remove(self.products[0])
+        self.assertEqual(self.analytics.summary()["total"], 199)
+
+
+class TestCatalogManagerAnalytics(unittest.TestCase):
+    """Test suite for CatalogManager analytics wrappers."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("A", 300, 250, category="Adventure", destination_city="Dubai", duration_hours=6),
+            make_product("B", 100, category="Adventure", destination_city="Dubai", duration_hours=1),
+            make_product("C", category="Cultural", destination_city="Abu Dhabi", pricing=[], active=False),
+        ])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_stats_follow_upserts(self):
+        """Test that summaries and groups reflect the latest commit."""
+        self.assertEqual(self.manager.catalog_summary()["inactive"], 1)
+        self.assertEqual(self.manager.group_stats('category')[0], {
+            "value": "Adventure", "count": 2, "active": 2,
+            "min_price": 100.0, "median_price": 175.0, "max_price": 250.0,
+        })
+        self.manager.upsert_batch([{"product_id": "C", "category": "Adventure", "active": True}])
+        self.assertEqual(self.manager.group_stats('category'), [{
+            "value": "Adventure", "count": 3, "active": 3,
+            "min_price": 100.0, "median_price": 175.0, "max_price": 250.0,
+        }])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
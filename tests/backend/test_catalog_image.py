@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import gzip
+import json
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.api import create_app
+from backend.lib.catalog_image import CatalogImage
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.hot_reload import ImageHolder
+from helpers import make_product
+
+
+class TestCatalogImage(unittest.TestCase):
+    """Test suite for the shared, memory-mapped catalog image."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("A", 150, category="Sightseeing", destination_city="Dubai"),
+            make_product("B", 80, category="Family", destination_city="Abu Dhabi"),
+            make_product("C", 60, category="Family", destination_city="Dubai", active=False),
+            make_product("Ü", 70, category="Family", destination_city="Dubai"),
+        ])
+        self.image_path = self.manager.write_image()
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_lookups(self):
+        """Test product bytes, hashes, stats and equality selections."""
+        image = CatalogImage(self.image_path)
+        self.assertEqual(len(image), 4)
+        self.assertEqual(image.generation, self.manager.generation)
+        self.assertEqual((image.generation, image.digest), self.manager.catalog_version())
+        for pid in ("A", "B", "C", "Ü"):
+            self.assertEqual(image.get(pid), self.manager.get(pid))
+            self.assertEqual(image.product_hash(pid), self.manager.product_hash(pid))
+        self.assertIsNone(image.product("Z"))
+        self.assertIsNone(image.product_hash("0"))
+        self.assertEqual(json.loads(bytes(image.stats())), self.manager.catalog_stats())
+
+        family = json.loads(bytes(image.listing({"category": "Family"})))
+        self.assertEqual([p["product_id"] for p in family["items"]], ["B", "C", "Ü"])
+        both = json.loads(bytes(image.listing({"category": "Family", "active": True, "destination_city": "Dubai"})))
+        self.assertEqual([p["product_id"] for p in both["items"]], ["Ü"])
+        self.assertEqual(json.loads(bytes(image.listing({"category": "Nope"})))["total"], 0)
+        with self.assertRaises(ValueError):
+            image.select({"price": 80})
+
+    def test_responses_match_manager_api(self):
+        """Test that image-backed responses equal the manager-backed ones byte for byte."""
+        reference = create_app(manager=self.manager)
+        app = create_app(db_path=self.db_path, image=True)
+        targets = [
+            '/products', '/products?category=Family', '/products?category=Family&active=false',
+            '/products?destination_city=Abu%20Dhabi', '/products/A', '/products/%C3%9C',
+            '/products/A?fields=price', '/stats', '/products/Z',
+        ]
+        for target in targets:
+            expected = reference.handle('GET', target, {})
+            actual = app.handle('GET', target, {})
+            self.assertEqual(actual.status, expected.status, target)
+            self.assertEqual(bytes(actual.body), expected.body, target)
+            self.assertEqual(dict(actual.headers).get('ETag'), dict(expected.headers).get('ETag'), target)
+        # Nothing so far needed the catalog itself.
+        self.assertIsNone(app.holder._current)
+
+        zipped = app.handle('GET', '/products?category=Family', {'Accept-Encoding': 'gzip'})
+        self.assertIn(('Vary', 'Accept-Encoding'), zipped.headers)
+        self.assertEqual(gzip.decompress(zipped.body), reference.handle('GET', '/products?category=Family', {}).body)
+
+        etag = dict(app.handle('GET', '/products', {}).headers)['ETag']
+        self.assertEqual(app.handle('GET', '/products', {'If-None-Match': etag}).status, 304)
+
+    def test_missing_active_counts_as_active(self):
+        """Test that a record without ``active`` is in the image's active=true list, as in the manager's."""
+        with open(self.db_path, encoding='utf-8') as f:
+            records = json.load(f)
+        del records[0]["active"]
+        with open(self.db_path, 'w', encoding='utf-8') as f:
+            json.dump(records, f)
+        manager = CatalogManager(db_path=self.db_path)
+        manager.write_image()
+        reference = create_app(manager=manager)
+        app = create_app(db_path=self.db_path, image=True)
+        for target in ('/products?active=true', '/products?active=false'):
+            self.assertEqual(bytes(app.handle('GET', target, {}).body), reference.handle('GET', target, {}).body, target)
+        self.assertIn("A", [p["product_id"] for p in json.loads(bytes(app.handle('GET', '/products?active=true', {}).body))["items"]])
+
+    def test_query_falls_back_to_manager(self):
+        """Test that requests the image can't answer load the catalog."""
+        app = create_app(db_path=self.db_path, image=True)
+        result = json.loads(app.handle('GET', '/query?where={"price":{"lt":75}}&fields=product_id', {}).body)
+        self.assertEqual(result['items'], [{"product_id": "C"}, {"product_id": "Ü"}])
+        self.assertEqual(json.loads(app.handle('GET', '/products?limit=1', {}).body)['total'], 4)
+        self.assertIsNotNone(app.holder._current)
+
+    def test_writer_rebuilds_image(self):
+        """Test that commits and deletes rebuild an existing image and workers re-map it."""
+        holder = ImageHolder(self.image_path)
+        old = holder.current
+        self.manager.upsert_batch([{"product_id": "B", "product_name": "Bee"}])
+        self.assertTrue(holder.check())
+        self.assertEqual(holder.current.get("B")["product_name"], "Bee")
+        self.assertEqual(holder.current.generation, self.manager.generation)
+        # The superseded mapping stays readable for requests still using it.
+        self.assertEqual(old.get("B")["product_name"], "B")
+
+        self.manager.delete(["A"])
+        self.assertTrue(holder.check())
+        self.assertIsNone(holder.current.product("A"))
+        self.assertEqual((holder.current.generation, holder.current.digest), self.manager.catalog_version())
+
+    def test_no_image_no_rebuild(self):
+        """Test that commits don't write an image nobody asked for."""
+        os.remove(self.image_path)
+        self.manager.upsert_batch([make_product("D", category="Family")])
+        self.assertFalse(os.path.exists(self.image_path))
+
+    def test_empty_catalog_and_bad_file(self):
+        """Test an image of an empty catalog and a file that isn't an image."""
+        empty = CatalogManager(db_path=os.path.join(self.temp_dir, 'empty.json'))
+        image = CatalogImage(empty.write_image())
+        self.assertEqual(len(image), 0)
+        self.assertEqual(json.loads(bytes(image.listing()))["items"], [])
+        self.assertIsNone(image.product("A"))
+
+        with open(self.image_path, 'wb') as f:
+            f.write(b'{"products": []}')
+        with self.assertRaises(ValueError):
+            CatalogImage(self.image_path)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import unittest
+import json
+import os
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.catalog_index import SecondaryIndex
+from helpers import make_product
+
+
+class TestSecondaryIndex(unittest.TestCase):
+    """Test suite for the in-memory secondary index."""
+
+    def test_add_and_remove_update_postings(self):
+        """Test that add/remove keep postings and counts in sync."""
+        index = SecondaryIndex()
+        a = make_product("A", category="Adventure", destination_city="Dubai")
+        b = make_product("B", category="Cultural", destination_city="Dubai")
+        index.add(a)
+        index.add(b)
+
+        self.assertEqual(index.lookup("category", "Adventure"), {"A"})
+        self.assertEqual(index.counts("destination_city"), {"Dubai": 2})
+
+        index.remove(a)
+        self.assertEqual(index.lookup("category", "Adventure"), set())
+        self.assertNotIn("Adventure", index.counts("category"))
+        self.assertEqual(len(index), 1)
+
+    def test_round_trips_through_dict(self):
+        """Test that to_dict/load_dict preserves None and boolean keys."""
+        index = SecondaryIndex()
+        index.add(make_product("A", category=None, active=False))
+
+        restored = SecondaryIndex()
+        restored.load_dict(json.loads(json.dumps(index.to_dict())))
+
+        self.assertEqual(restored.lookup("category", None), {"A"})
+        self.assertEqual(restored.lookup("active", False), {"A"})
+
+    def test_rejects_unindexed_field(self):
+        """Test that lookups on unknown fields raise KeyError."""
+        with self.assertRaises(KeyError):
+            SecondaryIndex().lookup("product_name", "x")
+
+
+class TestCatalogManagerIndexes(unittest.TestCase):
+    """Test suite for index maintenance in CatalogManager."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_lookups_follow_upserts(self):
+        """Test that by_* lookups reflect incremental updates."""
+        self.manager.upsert_batch([
+            make_product("A", category="Adventure", destination_city="Dubai", supplier_name="Rayna Tours"),
+            make_product("B", category="Cultural", destination_city="Abu Dhabi", supplier_name="Rayna Tours"),
+        ])
+        self.assertEqual([p["product_id"] for p in self.manager.by_category("Adventure")], ["A"])
+        self.assertEqual([p["product_id"] for p in self.manager.by_city("Abu Dhabi")], ["B"])
+
+        self.manager.upsert_batch([{"product_id": "A", "category": "Cultural", "active": False}])
+        self.assertEqual(self.manager.by_category("Adventure"), [])
+        self.assertEqual([p["product_id"] for p in self.manager.by_category("Cultural")], ["A", "B"])
+        self.assertEqual([p["product_id"] for p in self.manager.by_status(False)], ["A"])
+        self.assertEqual(len(self.manager.by_supplier("Rayna Tours")), 2)
+
+    def test_persists_sidecar_and_generation(self):
+        """Test that a fresh manager loads the persisted index for the current generation."""
+        self.manager.upsert_batch([make_product("A", category="Adventure")])
+        self.manager.upsert_batch([make_product("B", category="Adventure")])
+        self.assertEqual(self.manager.generation, 2)
+        self.assertTrue(os.path.exists(f"{self.db_path}.secondary.idx"))
+
+        reopened = CatalogManager(db_path=self.db_path)
+        with patch.object(reopened, '_load_data', side_effect=AssertionError("scanned")):
+            self.assertEqual(reopened.count(), 2)
+            self.assertEqual(reopened.facet_counts("category"), {"Adventure": 2})
+        self.assertEqual(reopened.generation, 2)
+
+    def test_commit_journals_instead_of_rewriting_sidecars(self):
+        """Test that later commits append to the journal and a fresh manager replays it."""
+        sidecar = f"{self.db_path}.secondary.idx"
+        self.manager.JOURNAL_COMPACT_RATIO = 100
+        self.manager.upsert_batch([make_product("A")])
+        self.manager.upsert_batch([make_product("B", category="Cultural")])
+        self.manager.upsert_batch([{"product_id": "A", "category": "Cultural"}])
+        with open(sidecar, encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["generation"], 1)
+        self.assertTrue(os.path.exists(f"{self.db_path}.journal"))
+
+        reopened = CatalogManager(db_path=self.db_path)
+        with patch.object(reopened, '_load_data', side_effect=AssertionError("scanned")):
+            self.assertEqual(reopened.facet_counts("category"), {"Cultural": 2})
+
+    def test_journal_gap_rebuilds_index(self):
+        """Test that a sidecar the journal no longer reaches is rebuilt, not replayed."""
+        self.manager.JOURNAL_COMPACT_RATIO = 100
+        self.manager.upsert_batch([make_product("A", category="Adventure")])
+        self.manager.upsert_batch([make_product("B", category="Cultural")])
+        os.remove(f"{self.db_path}.journal")
+
+        reopened = CatalogManager(db_path=self.db_path)
+        self.assertEqual(reopened.facet_counts("category"), {"Adventure": 1, "Cultural": 1})
+        with open(f"{self.db_path}.secondary.idx", encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["generation"], 2)
+
+    def test_large_journal_is_compacted(self):
+        """Test that a journal past the size limit is folded back into the sidecars."""
+        self.manager.JOURNAL_COMPACT_RATIO = 0
+        self.manager.upsert_batch([make_product("A")])
+        self.manager.upsert_batch([make_product("B")])
+        self.assertFalse(os.path.exists(f"{self.db_path}.journal"))
+        with open(f"{self.db_path}.secondary.idx", encoding='utf-8') as f:
+            self.assertEqual(json.load(f)["generation"], 2)
+
+    def test_rebuilds_after_external_write(self):
+        """Test that a snapshot written outside the manager invalidates the sidecar."""
+        self.manager.upsert_batch([make_product("A")])
+        with open(self.db_path, 'w', encoding='utf-8') as f:
+            json.dump([make_product("Z", category="Luxury")], f, indent=2)
+
+        reopened = CatalogManager(db_path=self.db_path)
+        self.assertEqual(reopened.facet_counts("category"), {"Luxury": 1})
+        self.assertEqual(reopened.generation, 2)
+
+    def test_failed_batch_leaves_indexes_untouched(self):
+        """Test that a validation failure does not leak into the indexes."""
+        self.manager.upsert_batch([make_product("A")])
+        bad = make_product("B")
+        bad["pricing"] = [{"tier_name": "Adult", "price_aed": -1}]
+
+        with self.assertRaises(Exception):
+            self.manager.upsert_batch([make_product("C"), bad])
+
+        self.assertEqual(self.manager.count(), 1)
+        self.assertEqual(self.manager.generation, 1)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -8,8 +8,7 @@ import tempfile
 import shutil
 import time
 from pathlib import Path
-from unittest.mock import patch, MagicMock, mock_open
-from datetime import datetime, timedelta
+from unittest.mock import patch
 
 project_root = Path(__file__).resolve().parent.parent.parent
 sys.path.insert(0, str(project_root / 'src'))
@@ -144,6 +143,32 @@ class TestCatalogLocking(unittest.TestCase):
                 lock_pid = f.read().strip()
             self.assertEqual(lock_pid, str(os.getpid()))
 
+    def test_concurrent_acquire_has_one_winner(self):
+        """Test that writers racing for a free lock can't both get it."""
+        import threading
+        barrier = threading.Barrier(8)
+        holders = []
+        release = threading.Event()
+
+        def take():
+            barrier.wait()
+            try:
+                with CatalogLock(self.db_path):
+                    holders.append(threading.get_ident())
+                    release.wait(5)
+            except BlockingIOError:
+                pass
+
+        threads = [threading.Thread(target=take) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        time.sleep(0.2)
+        release.set()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(len(holders), 1)
+        self.assertFalse(os.path.exists(self.lock_path))
+
 
 class TestCatalogManagerIdempotency(unittest.TestCase):
     """Test suite for idempotent upsert operations."""
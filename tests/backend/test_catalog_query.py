@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+
+
+PRODUCTS = [
+    {
+        "product_id": "Dubai_DesertSafari",
+        "product_name": "Desert Safari",
+        "category": "Adventure",
+        "destination_city": "Dubai",
+        "duration_hours": 6,
+        "pricing": [{"tier_name": "Adult", "price_aed": 250}, {"tier_name": "Child", "price_aed": 180}],
+        "inclusions": ["Hotel pick-up/drop-off", "BBQ Dinner"],
+        "description_long": "A long description " * 20,
+    },
+    {
+        "product_id": "Dubai_BurjKhalifa",
+        "product_name": "Burj Khalifa At The Top",
+        "category": "Sightseeing",
+        "destination_city": "Dubai",
+        "duration_hours": 1.5,
+        "pricing": [{"tier_name": "Level 124", "price_aed": 159}],
+        "inclusions": ["Fast-track entry"],
+    },
+    {
+        "product_id": "AbuDhabi_Louvre",
+        "product_name": "Louvre Abu Dhabi",
+        "category": "Cultural",
+        "destination_city": "Abu Dhabi",
+        "pricing": [{"tier_name": "Adult", "price_aed": 63}],
+        "inclusions": ["Museum access"],
+    },
+    {
+        "product_id": "Dubai_Quad",
+        "product_name": "Quad Biking",
+        "category": "Adventure",
+        "destination_city": "Dubai",
+        "duration_hours": 0.5,
+        "active": False,
+        "pricing": [{"tier_name": "30 Mins", "price_aed": 350}],
+        "inclusions": ["Hotel pick-up/drop-off"],
+    },
+]
+
+
+class TestCatalogQuery(unittest.TestCase):
+    """Test suite for CatalogManager.query()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch(PRODUCTS)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def ids(self, result):
+        return [p["product_id"] for p in result["items"]]
+
+    def test_equality_uses_index(self):
+        """Test that equality on indexed fields is planned through the index."""
+        result = self.manager.query(where={"category": "Adventure", "active": True})
+        self.assertEqual(self.ids(result), ["Dubai_DesertSafari"])
+        self.assertEqual(result["plan"]["strategy"], "index")
+        self.assertEqual(result["plan"]["candidates"], 1)
+
+    def test_ranges_and_membership(self):
+        """Test range predicates on duration and price and inclusion membership."""
+        result = self.manager.query(where={"duration_hours": {"gte": 1, "lte": 6}})
+        self.assertEqual(self.ids(result), ["Dubai_BurjKhalifa", "Dubai_DesertSafari"])
+        self.assertEqual(result["plan"]["strategy"], "scan")
+
+        result = self.manager.query(where={"price": {"lt": 200}})
+        self.assertEqual(self.ids(result), ["AbuDhabi_Louvre", "Dubai_BurjKhalifa", "Dubai_DesertSafari"])
+
+        result = self.manager.query(where={"inclusions": {"contains": "Hotel pick-up/drop-off"}})
+        self.assertEqual(self.ids(result), ["Dubai_DesertSafari", "Dubai_Quad"])
+
+    def test_projection_drops_heavy_fields(self):
+        """Test that projections only return requested fields plus the id."""
+        result = self.manager.query(where={"destination_city": "Abu Dhabi"}, fields=["product_name", "price"])
+        self.assertEqual(result["items"], [
+            {"product_id": "AbuDhabi_Louvre", "product_name": "Louvre Abu Dhabi", "price": 63}
+        ])
+
+    def test_sort_with_missing_values_last(self):
+        """Test descending sort keeps products without a value at the end."""
+        result = self.manager.query(order_by=["-duration_hours"])
+        self.assertEqual(self.ids(result), [
+            "Dubai_DesertSafari", "Dubai_BurjKhalifa", "Dubai_Quad", "AbuDhabi_Louvre"
+        ])
+
+    def test_limit_offset_and_cursor_pagination(self):
+        """Test that cursors walk the full ordered result without overlap."""
+        first = self.manager.query(order_by=["price"], limit=3, offset=1)
+        self.assertEqual(self.ids(first), ["Dubai_BurjKhalifa", "Dubai_DesertSafari", "Dubai_Quad"])
+
+        seen = []
+        cursor = None
+        while True:
+            page = self.manager.query(order_by=["price"], limit=3, cursor=cursor)
+            seen.extend(self.ids(page))
+            cursor = page["next_cursor"]
+            if cursor is None:
+                break
+        self.assertEqual(seen, ["AbuDhabi_Louvre", "Dubai_BurjKhalifa", "Dubai_DesertSafari", "Dubai_Quad"])
+
+        cursor = self.manager.query(order_by=["price"], limit=1)["next_cursor"]
+        with self.assertRaises(ValueError):
+            self.manager.query(order_by=["-price"], limit=1, cursor=cursor)
+
+    def test_results_are_copies(self):
+        """Test that changing returned records leaves the catalog and its indexes alone."""
+        result = self.manager.query(where={"category": "Adventure"})
+        result["items"][0]["category"] = "Changed"
+        result["items"][0]["pricing"][0]["price_aed"] = 1
+        self.manager.query(fields=["inclusions"])["items"][0]["inclusions"].append("Extra")
+        self.manager.get("Dubai_Quad")["active"] = True
+        self.manager.by_category("Cultural")[0]["pricing"].clear()
+
+        self.assertEqual(self.manager.get("Dubai_DesertSafari")["category"], "Adventure")
+        self.assertEqual(self.manager.get("Dubai_DesertSafari")["pricing"][0]["price_aed"], 250)
+        self.assertEqual(self.manager.get("AbuDhabi_Louvre")["inclusions"], ["Museum access"])
+        self.assertFalse(self.manager.get("Dubai_Quad")["active"])
+        self.assertEqual(len(self.manager.get("AbuDhabi_Louvre")["pricing"]), 1)
+        self.assertEqual(self.ids(self.manager.query(where={"category": "Adventure"})),
+                         ["Dubai_DesertSafari", "Dubai_Quad"])
+
+    def test_rejects_unknown_fields_and_operators(self):
+        """Test that malformed queries raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.manager.query(where={"colour": "red"})
+        with self.assertRaises(ValueError):
+            self.manager.query(where={"price": {"between": [1, 2]}})
+        with self.assertRaises(ValueError):
+            self.manager.query(fields=["colour"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
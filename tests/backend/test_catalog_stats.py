@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from helpers import make_product
+
+
+class TestCatalogStats(unittest.TestCase):
+    """Test suite for the delta-maintained stats sidecar."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("A", category="Adventure", destination_city="Dubai"),
+            make_product("B", category="Adventure", destination_city="Abu Dhabi"),
+            make_product("C", category="Cultural", active=False),
+        ])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_deltas_follow_upserts(self):
+        """Test that counts move with changed categories and active flags."""
+        self.manager.upsert_batch([
+            {"product_id": "B", "category": "Cultural"},
+            {"product_id": "C", "active": True},
+            make_product("D", category="Cruise", destination_city="Dubai"),
+        ])
+        stats = self.manager.catalog_stats()
+        self.assertEqual((stats["total"], stats["active"], stats["inactive"]), (4, 4, 0))
+        self.assertEqual(stats["groups"]["category"], [
+            {"value": "Cultural", "count": 2},
+            {"value": "Adventure", "count": 1},
+            {"value": "Cruise", "count": 1},
+        ])
+        self.assertEqual(stats["groups"]["destination_city"][-1], {"value": None, "count": 1})
+        self.assertEqual(self.manager.recompute_stats()["differences"], [])
+
+    def test_reads_sidecar_without_parsing_catalog(self):
+        """Test that a fresh manager answers from the sidecar alone."""
+        reader = CatalogManager(db_path=self.db_path)
+
+        def fail():
+            raise AssertionError("catalog was parsed")
+
+        reader._load_data = fail
+        self.assertEqual(reader.count(), 3)
+        self.assertEqual(reader.catalog_stats()["inactive"], 1)
+
+    def test_recompute_repairs_drift(self):
+        """Test that --recompute reports and rewrites a wrong sidecar."""
+        sidecar = f"{self.db_path}.stats.idx"
+        with open(sidecar) as f:
+            data = json.load(f)
+        data["data"]["active"] = 7
+        with open(sidecar, "w") as f:
+            json.dump(data, f)
+
+        result = CatalogManager(db_path=self.db_path).recompute_stats()
+        self.assertEqual(result["differences"], ["active: 7 != 2"])
+        self.assertEqual(CatalogManager(db_path=self.db_path).catalog_stats()["active"], 2)
+
+    def test_external_snapshot_is_adopted(self):
+        """Test that a catalog written without meta gets a reusable sidecar."""
+        os.remove(f"{self.db_path}.meta")
+        os.remove(f"{self.db_path}.stats.idx")
+        self.assertEqual(CatalogManager(db_path=self.db_path).count(), 3)
+        self.assertTrue(os.path.exists(f"{self.db_path}.stats.idx"))
+        reader = CatalogManager(db_path=self.db_path)
+        reader._load_data = lambda: self.fail("catalog was parsed")
+        self.assertEqual(reader.count(), 3)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.comparison import ComparisonIndex
+from helpers import make_product
+
+
+PRODUCTS = [
+    make_product("Safari", 150, 100, inclusions=["Hotel pick-up", "BBQ dinner", "Camel ride"],
+                 exclusions=["Quad bike"], duration_hours=6),
+    make_product("Premium", 300, inclusions=["Hotel pick-up", "BBQ dinner", "Quad bike"], exclusions=[], duration_hours=7),
+    make_product("Cruise", 120, inclusions=["Hotel  pick-up", "Buffet dinner"]),
+]
+
+
+class TestComparisonIndex(unittest.TestCase):
+    """Test suite for set differences and the pair memo."""
+
+    def setUp(self):
+        self.index = ComparisonIndex()
+        self.index.build(PRODUCTS)
+
+    def test_set_differences(self):
+        """Test common and per-product inclusion sets across three products."""
+        result = self.index.compare(["Safari", "Premium", "Cruise"])
+        self.assertEqual(result["inclusions"]["common"], ["Hotel pick-up"])
+        self.assertEqual(result["inclusions"]["only"]["Safari"], ["Camel ride"])
+        self.assertEqual(result["inclusions"]["only"]["Cruise"], ["Buffet dinner"])
+        self.assertEqual(result["exclusions"]["only"]["Safari"], ["Quad bike"])
+        self.assertEqual(result["derived"]["Safari"], {
+            "min_price": 100.0, "max_price": 150.0, "tier_count": 2, "duration_hours": 6,
+        })
+        self.assertEqual(len(result["pairs"]), 3)
+
+    def test_pairs_are_memoised_and_oriented(self):
+        """Test that reversed pairs reuse the memo with sides swapped."""
+        forward = self.index.compare(["Safari", "Premium"])["pairs"][0]
+        backward = self.index.compare(["Premium", "Safari"])["pairs"][0]
+        self.assertEqual(len(self.index._pairs), 1)
+        self.assertEqual(forward["inclusions"]["only_a"], backward["inclusions"]["only_b"])
+        self.assertEqual(forward["price_delta"], 200.0)
+        self.assertEqual(backward["price_delta"], -200.0)
+
+    def test_results_do_not_share_the_memo(self):
+        """Test that editing a returned pair leaves the memoised pair intact."""
+        pair = self.index.compare(["Premium", "Safari"])["pairs"][0]
+        pair["inclusions"]["only_a"] = ()
+        again = self.index.compare(["Premium", "Safari"])["pairs"][0]
+        self.assertEqual(again["inclusions"]["only_a"], ("Quad bike",))
+
+    def test_changes_drop_pairs(self):
+        """Test that updating a product invalidates only its pairs."""
+        self.index.compare(["Safari", "Premium", "Cruise"])
+        self.index.add(make_product("Cruise", 90, inclusions=["Buffet dinner"]))
+        self.assertEqual(set(self.index._pairs), {("Premium", "Safari")})
+        pair = self.index.compare(["Safari", "Cruise"])["pairs"][0]
+        self.assertEqual(pair["price_delta"], -10.0)
+
+    def test_shared_sets_go_with_their_last_product(self):
+        """Test that interned sets are shared and dropped once nothing uses them."""
+        self.index.add(make_product("Twin", 90, inclusions=["BBQ dinner", "Hotel pick-up", "Camel ride"]))
+        self.assertIs(self.index._sets["Twin"][0], self.index._sets["Safari"][0])
+        camel = frozenset(["Hotel pick-up", "BBQ dinner", "Camel ride"])
+        self.index.remove(PRODUCTS[0])
+        self.assertIn(camel, self.index._shared)
+        self.index.add(make_product("Twin", 90, inclusions=["Buffet dinner"]))
+        self.assertNotIn(camel, self.index._shared)
+        self.assertEqual(len(self.index._shared), len({s for sets in self.index._sets.values() for s in sets}))
+
+    def test_rejects_unknown_and_too_many(self):
+        """Test the id validation."""
+        with self.assertRaises(ValueError):
+            self.index.compare(["Safari", "Missing"])
+        with self.assertRaises(ValueError):
+            self.index.compare(["Safari", "Premium", "Cruise", "Other"])
+
+
+class TestCatalogManagerCompare(unittest.TestCase):
+    """Test suite for CatalogManager.compare()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch(PRODUCTS)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_projects_products_and_follows_upserts(self):
+        """Test projected records with derived fields after an upsert."""
+        result = self.manager.compare(["Premium", "Safari"], fields=["product_name"])
+        self.assertEqual(result["products"][0], {
+            "product_id": "Premium", "product_name": "Premium",
+            "min_price": 300.0, "max_price": 300.0, "tier_count": 1, "duration_hours": 7,
+        })
+        self.manager.upsert_batch([{"product_id": "Premium", "inclusions": ["Camel ride"]}])
+        result = self.manager.compare(["Premium", "Safari"])
+        self.assertEqual(result["inclusions"]["common"], ["Camel ride"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from helpers import make_product, tiers
+
+
+class TestCatalogManagerDelete(unittest.TestCase):
+    """Test suite for tombstone deletes and compaction."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product(pid, product_name=f"{pid} tour", category=category,
+                         pricing=tiers(price, validity_end="2026-01-31"))
+            for pid, category, price in [("A", "Sightseeing", 150), ("B", "Sightseeing", 80), ("C", "Family", 300)]
+        ])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def snapshot_ids(self):
+        with open(self.db_path, 'r', encoding='utf-8') as f:
+            return sorted(p["product_id"] for p in json.load(f))
+
+    def test_delete_appends_tombstone_without_rewrite(self):
+        """Test that a delete leaves the snapshot alone and hides the product."""
+        mtime = os.stat(self.db_path).st_mtime_ns
+        generation = self.manager.generation
+        self.assertEqual(self.manager.delete(["B", "missing"]), ["B"])
+        self.assertEqual(os.stat(self.db_path).st_mtime_ns, mtime)
+        self.assertEqual(self.snapshot_ids(), ["A", "B", "C"])
+        self.assertEqual(self.manager.generation, generation + 1)
+
+        self.assertIsNone(self.manager.get("B"))
+        self.assertEqual([p["product_id"] for p in self.manager.by_category("Sightseeing")], ["A"])
+        self.assertEqual(self.manager.count(), 2)
+        self.assertEqual(self.manager.query(where={"price": {"lt": 200}})["total"], 1)
+        self.assertEqual(self.manager.expire("2026-03-01", dry_run=True), ["A", "C"])
+        self.assertEqual(self.manager.delete(["B"]), [])
+
+    def test_other_readers_skip_tombstones(self):
+        """Test that fresh and already-loaded readers both see the delete."""
+        reader = CatalogManager(db_path=self.db_path)
+        self.assertEqual(reader.count(), 3)
+        self.manager.delete(["A"])
+        self.assertEqual(reader.count(), 2)
+        self.assertIsNone(reader.get("A"))
+
+        fresh = CatalogManager(db_path=self.db_path)
+        self.assertEqual(fresh.facet_counts("category"), {"Family": 1, "Sightseeing": 1})
+        self.assertEqual(fresh.recompute_stats()["differences"], [])
+        self.assertEqual(fresh.generation, self.manager.generation)
+        self.assertEqual([h["product_id"] for h in fresh.search("tour")], ["B", "C"])
+
+    def test_next_write_compacts(self):
+        """Test that the next snapshot rewrite drops tombstoned records."""
+        self.manager.delete(["A", "C"])
+        self.manager.upsert_batch([{"product_id": "B", "active": False}])
+        self.assertEqual(self.snapshot_ids(), ["B"])
+        self.assertFalse(os.path.exists(self.manager.tombstone_path))
+        self.assertEqual(CatalogManager(db_path=self.db_path).count(), 1)
+
+        self.manager.upsert_batch([make_product("A", category="Family")])
+        self.assertEqual(self.manager.get("A")["category"], "Family")
+        self.assertEqual(self.manager.facet_counts("category"), {"Family": 1, "Sightseeing": 1})
+
+    def test_compact(self):
+        """Test an explicit compaction pass."""
+        self.assertEqual(self.manager.compact(), 0)
+        self.manager.delete(["C"])
+        self.assertEqual(self.manager.compact(), 1)
+        self.assertEqual(self.snapshot_ids(), ["A", "B"])
+        self.assertEqual(CatalogManager(db_path=self.db_path).count(), 2)
+
+    def test_restored_snapshot_ignores_old_tombstones(self):
+        """Test that tombstones do not apply to a snapshot written externally."""
+        with open(self.db_path, 'r', encoding='utf-8') as f:
+            saved = f.read()
+        self.manager.delete(["A"])
+        with open(self.db_path, 'w', encoding='utf-8') as f:
+            f.write(saved.replace('"B tour"', '"B tour "'))
+        self.assertEqual(CatalogManager(db_path=self.db_path).count(), 3)
+
+    def test_torn_tombstone_line_is_ignored(self):
+        """Test that a partial trailing line does not hide products or corrupt later deletes."""
+        with open(self.manager.tombstone_path, 'ab') as f:
+            f.write(b'{"generation": 99, "base"')
+        reader = CatalogManager(db_path=self.db_path)
+        self.assertEqual(reader.count(), 3)
+        self.assertEqual(reader.delete(["C"]), ["C"])
+        self.assertEqual(CatalogManager(db_path=self.db_path).count(), 2)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import threading
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import MagicMock
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.expiry import ExpiryIndex, ExpirySweeper, expiry_ordinal
+from backend.lib.validity_index import to_ordinal
+from helpers import make_product, tiers
+
+
+def ending(*ends):
+    """One tier per date in ``ends``, each valid until that date."""
+    return [dict(tier, validity_end=end) for tier, end in zip(tiers(*[100] * len(ends)), ends)]
+
+
+class TestExpiryIndex(unittest.TestCase):
+    """Test suite for the expiry heap."""
+
+    def test_latest_end_and_open_tiers(self):
+        """Test that the latest end counts and open-ended tiers never expire."""
+        self.assertEqual(expiry_ordinal(make_product("A", pricing=ending("2026-01-31", "2026-06-30"))), to_ordinal("2026-06-30"))
+        self.assertIsNone(expiry_ordinal(make_product("B", pricing=ending("2026-01-31", None))))
+        self.assertIsNone(expiry_ordinal(make_product("C", pricing=ending("2026-01-31"), active=False)))
+        self.assertIsNone(expiry_ordinal(make_product("D", pricing=[])))
+
+    def test_pops_only_due_and_skips_stale_entries(self):
+        """Test that changed products are not reported with their old date."""
+        index = ExpiryIndex()
+        index.build([
+            make_product("A", pricing=ending("2026-01-31")),
+            make_product("B", pricing=ending("2026-03-31")),
+            make_product("C", pricing=ending("2026-12-31")),
+        ])
+        index.remove(make_product("A", pricing=ending("2026-01-31")))
+        index.add(make_product("A", pricing=ending("2026-09-30")))
+        self.assertEqual(index.pop_due(to_ordinal("2026-04-01")), ["B"])
+        index.restore(["B"])
+        self.assertEqual(index.next_expiry(), "2026-03-31")
+
+
+class TestCatalogManagerExpire(unittest.TestCase):
+    """Test suite for CatalogManager.expire()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("Old", pricing=ending("2026-01-31")),
+            make_product("Season", pricing=ending("2026-01-31", "2026-04-30")),
+            make_product("Open", pricing=ending("2026-01-31", None)),
+        ])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_expire_deactivates_in_one_commit(self):
+        """Test that due products are deactivated together and only once."""
+        self.assertEqual(self.manager.expire("2026-03-01", dry_run=True), ["Old"])
+        self.assertTrue(self.manager.get("Old")["active"])
+        generation = self.manager.generation
+        self.assertEqual(self.manager.expire("2026-06-01"), ["Old", "Season"])
+        self.assertEqual(self.manager.generation, generation + 1)
+        self.assertFalse(self.manager.get("Season")["active"])
+        self.assertTrue(self.manager.get("Open")["active"])
+        self.assertEqual(self.manager.expire("2026-06-01"), [])
+
+    def test_nothing_due_does_not_read_catalog(self):
+        """Test that a sweep with nothing due never parses the catalog."""
+        reader = CatalogManager(db_path=self.db_path)
+        reader._load_data = lambda: self.fail("catalog was parsed")
+        self.assertEqual(reader.expire("2026-01-15"), [])
+
+    def test_reactivated_product_is_tracked_again(self):
+        """Test that an extended, reactivated product gets a new expiry."""
+        self.manager.expire("2026-02-15")
+        self.manager.upsert_batch([make_product("Old", pricing=ending("2026-08-31"), active=True)])
+        self.assertEqual(self.manager.expire("2026-06-01"), ["Season"])
+        self.assertEqual(self.manager.expire("2026-09-01"), ["Old"])
+
+    def test_sweeper_thread(self):
+        """Test that the background sweeper expires and reports products."""
+        reported = []
+        done = threading.Event()
+
+        def on_expire(ids):
+            reported.extend(ids)
+            done.set()
+
+        sweeper_manager = CatalogManager(db_path=self.db_path)
+        sweeper = ExpirySweeper(sweeper_manager, interval=60, on_expire=on_expire)
+        sweeper.start()
+        self.assertTrue(done.wait(5))
+        sweeper.stop(timeout=5)
+        self.assertFalse(sweeper.is_alive())
+        self.assertEqual(reported, ["Old", "Season"])
+        self.assertFalse(self.manager.get("Old")["active"])
+
+    def test_sweeper_survives_failed_sweeps(self):
+        """Test that an error in one tick is logged and the next tick still runs."""
+        done = threading.Event()
+        manager = MagicMock()
+        manager.expire.side_effect = [OSError("disk full"), ["Old"]] + [[]] * 100
+        reported = []
+
+        def on_expire(ids):
+            reported.extend(ids)
+            done.set()
+
+        sweeper = ExpirySweeper(manager, interval=0.01, on_expire=on_expire)
+        with self.assertLogs('backend.lib.expiry', level='ERROR') as logs:
+            sweeper.start()
+            self.assertTrue(done.wait(5))
+            sweeper.stop(timeout=5)
+        self.assertFalse(sweeper.is_alive())
+        self.assertEqual(reported, ["Old"])
+        self.assertIn("disk full", logs.output[0])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
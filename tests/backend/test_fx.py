@@ -0,0 +1,141 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import json
+import random
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.fx import FxTable
+from helpers import make_product
+
+RATES = {
+    "base": "AED",
+    "rates": {
+        "USD": [{"effective": "2025-01-01", "rate": 0.2723}],
+        "EUR": [
+            {"effective": "2025-07-01", "rate": 0.232},
+            {"effective": "2025-01-01", "rate": 0.2626},
+        ],
+    },
+}
+
+
+def write_rates(path, rates):
+    with open(path, 'w') as f:
+        json.dump(rates, f)
+
+
+class TestFxTable(unittest.TestCase):
+    """Test suite for rate lookup by effective date."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'fx_rates.json')
+        write_rates(self.path, RATES)
+        self.table = FxTable(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_rate_effective_on_date(self):
+        """Test that the latest rate effective on or before the date is used."""
+        self.assertEqual(self.table.conversion("eur", "2025-03-01").rate, 0.2626)
+        self.assertEqual(self.table.conversion("EUR", "2025-07-01").rate, 0.232)
+        self.assertEqual(self.table.conversion("AED").rate, 1.0)
+        self.assertEqual(self.table.currencies(), ["AED", "EUR", "USD"])
+        with self.assertRaises(ValueError):
+            self.table.conversion("EUR", "2024-12-31")
+        with self.assertRaises(ValueError):
+            self.table.conversion("JPY")
+
+    def test_reload_changes_version(self):
+        """Test that editing the rate file is picked up with a new version."""
+        before = self.table.conversion("USD", "2025-02-01")
+        rates = json.loads(json.dumps(RATES))
+        rates["rates"]["USD"].append({"effective": "2025-02-01", "rate": 0.25})
+        write_rates(self.path, rates)
+        os.utime(self.path, ns=(1, 1))
+        after = self.table.conversion("USD", "2025-02-01")
+        self.assertEqual(after.rate, 0.25)
+        self.assertNotEqual(before.key, after.key)
+
+
+class TestCurrencyQueries(unittest.TestCase):
+    """Test suite for price indexes and queries in other currencies."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        write_rates(os.path.join(self.temp_dir, 'fx_rates.json'), RATES)
+        self.manager = CatalogManager(db_path=self.db_path)
+        rng = random.Random(7)
+        self.products = [
+            make_product(f"P{i:03d}", *[round(rng.uniform(20, 2000), 2) for _ in range(rng.randint(1, 3))])
+            for i in range(120)
+        ]
+        self.manager.upsert_batch(self.products)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_price_range_matches_brute_force(self):
+        """Test that converted range lookups agree with converting every tier."""
+        usd = self.manager.conversion("USD", "2025-06-01")
+        expected = sorted(
+            p["product_id"] for p in self.products
+            if any(100 <= round(t["price_aed"] * usd.rate, 2) <= 250 for t in p["pricing"])
+        )
+        found = self.manager.in_price_range(100, 250, currency="USD", rate_date="2025-06-01")
+        self.assertEqual(sorted(p["product_id"] for p in found), expected)
+
+    def test_query_filters_sorts_and_projects_in_currency(self):
+        """Test that the virtual price field is converted throughout a query."""
+        result = self.manager.query(where={"price": {"gte": 50, "lt": 120}}, fields=["price"],
+                                    order_by=["-price"], currency="EUR", rate_date="2025-08-01")
+        prices = [item["price"] for item in result["items"]]
+        expected = sorted(
+            (round(min(t["price_aed"] for t in p["pricing"]) * 0.232, 2) for p in self.products),
+            reverse=True,
+        )
+        self.assertEqual(prices, [price for price in expected if 50 <= price < 120])
+        self.assertEqual(result["plan"]["currency"], "EUR")
+
+        page = self.manager.query(order_by=["price"], limit=5, currency="USD", rate_date="2025-06-01")
+        with self.assertRaises(ValueError):
+            self.manager.query(order_by=["price"], limit=5, cursor=page["next_cursor"])
+
+    def test_converted_columns_cached_until_change(self):
+        """Test that converted columns are reused and dropped on commit."""
+        index = self.manager.get_index('price')
+        usd = self.manager.conversion("USD", "2025-06-01")
+        self.assertIs(index.converted_columns(usd), index.converted_columns(usd))
+        self.manager.upsert_batch([make_product("P000", 1.0)])
+        self.assertEqual(self.manager.in_price_range(high=1, currency="USD", rate_date="2025-06-01")[0]["product_id"],
+                         "P000")
+
+    def test_quote_and_cheapest_tier_in_currency(self):
+        """Test that quotes and cheapest tiers report converted amounts."""
+        self.manager.upsert_batch([make_product("Museum", 149, 169)])
+        quote = self.manager.price_quote([{"product_id": "Museum", "tier_name": "Tier 0"}], "2026-01-01", 3,
+                                         currency="USD", rate_date="2025-06-01")
+        self.assertEqual(quote["lines"][0]["unit_price"], 40.57)
+        self.assertEqual(quote["total"], 121.71)
+        self.assertEqual(quote["currency"], "USD")
+        self.assertEqual(quote["exchange_rate"], {"rate": 0.2723, "effective": "2025-01-01"})
+
+        tier = self.manager.cheapest_tier("Museum", currency="EUR", rate_date="2025-01-15")
+        self.assertEqual((tier["price_aed"], tier["converted_price"]), (149, 39.13))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import time
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.hot_reload import CatalogHolder
+from helpers import make_product
+
+
+class TestCatalogHolder(unittest.TestCase):
+    """Test suite for reloading the served catalog when it changes."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.writer = CatalogManager(db_path=self.db_path)
+        self.writer.upsert_batch([
+            make_product("A", 150, category="Sightseeing"),
+            make_product("B", 80, category="Family"),
+        ])
+        self.holder = CatalogHolder(self.db_path)
+
+    def tearDown(self):
+        self.holder.stop()
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_check_swaps_in_new_generation(self):
+        """Test that check() reloads only after the catalog changed."""
+        old = self.holder.current
+        self.assertFalse(self.holder.check())
+        self.writer.upsert_batch([{"product_id": "B", "product_name": "Bee"}])
+        self.assertTrue(self.holder.check())
+        self.assertIsNot(self.holder.current, old)
+        self.assertEqual(self.holder.current.get("B")["product_name"], "Bee")
+        self.assertEqual(self.holder.current.generation, self.writer.generation)
+        self.assertEqual(self.holder.reloads, 1)
+
+    def test_old_generation_stays_consistent(self):
+        """Test that a reader holding the previous manager keeps its snapshot."""
+        old = self.holder.current
+        self.writer.upsert_batch([{"product_id": "B", "product_name": "Bee"}])
+        self.holder.check()
+        self.assertEqual(old.get("B")["product_name"], "B")
+        self.assertEqual(old.query(where={"category": "Family"})["total"], 1)
+        self.assertNotEqual(old.catalog_version(), self.holder.current.catalog_version())
+
+    def test_unchanged_records_and_payloads_are_reused(self):
+        """Test that products a commit did not touch keep their objects and bytes."""
+        old = self.holder.current
+        encoded = old.get_index('responses').product("A")
+        self.writer.upsert_batch([{"product_id": "B", "product_name": "Bee"}])
+        self.holder.check()
+        new = self.holder.current
+        self.assertIs(new._records_by_id()["A"], old._records_by_id()["A"])
+        self.assertIsNot(new._records_by_id()["B"], old._records_by_id()["B"])
+        self.assertIs(new.get_index('responses').product("A"), encoded)
+
+    def test_deletes_are_picked_up(self):
+        """Test that a tombstoned delete, which leaves the snapshot alone, reloads."""
+        self.writer.delete(["A"])
+        self.assertTrue(self.holder.check())
+        self.assertIsNone(self.holder.current.get("A"))
+        self.assertIsNone(self.holder.current.product_hash("A"))
+
+    def test_broken_snapshot_keeps_current(self):
+        """Test that a snapshot that fails to load is not swapped in."""
+        old = self.holder.current
+        with open(self.db_path + '.tmp', 'w') as f:
+            f.write('{"products": [')
+        os.replace(self.db_path + '.tmp', self.db_path)
+        self.assertFalse(self.holder.check())
+        self.assertIs(self.holder.current, old)
+        self.assertIsNotNone(self.holder.last_error)
+
+    def test_background_thread_reloads(self):
+        """Test that the polling thread picks up a commit."""
+        self.holder.interval = 0.01
+        self.holder.start()
+        self.writer.upsert_batch([make_product("C", category="Family")])
+        deadline = time.time() + 5
+        while self.holder.current.get("C") is None and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertIsNotNone(self.holder.current.get("C"))
+
+    def test_pinned_manager_is_read_only(self):
+        """Test that the served manager refuses writes."""
+        with self.assertRaises(RuntimeError):
+            self.holder.current.upsert_batch([make_product("C", category="Family")])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
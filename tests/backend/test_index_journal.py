@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.index_journal import IndexJournal
+
+
+class TestIndexJournal(unittest.TestCase):
+    """Test suite for the index change journal."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.temp_dir, 'products.json.journal')
+        self.journal = IndexJournal(self.path)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_replays_unbroken_runs_only(self):
+        """Test that changes_since returns runs in order and None across a gap."""
+        a, b = {"product_id": "A"}, {"product_id": "B"}
+        self.journal.append([(2, [("A", None, a)])])
+        self.journal.append([(3, [("A", a, None), ("B", None, b)]), (5, [("B", b, None)])])
+
+        self.assertEqual(self.journal.changes_since(1, 3),
+                         [[("A", None, a)], [("A", a, None), ("B", None, b)]])
+        self.assertEqual(self.journal.changes_since(3, 3), [])
+        self.assertIsNone(self.journal.changes_since(0, 2))
+        self.assertIsNone(self.journal.changes_since(2, 5))
+        self.assertTrue(self.journal.covers(1, 3))
+        self.assertFalse(self.journal.covers(3, 5))
+
+        # A second reader parses the file rather than the writer's cache.
+        self.assertEqual(IndexJournal(self.path).changes_since(1, 3),
+                         self.journal.changes_since(1, 3))
+
+    def test_torn_tail_is_ignored_and_replaced(self):
+        """Test that a torn trailing line is skipped and dropped by the next append."""
+        self.journal.append([(1, [("A", None, {"product_id": "A"})])])
+        with open(self.path, 'ab') as f:
+            f.write(b'{"generation": 2, "chan')
+
+        self.assertIsNone(self.journal.changes_since(1, 2))
+        self.journal.append([(2, [("A", {"product_id": "A"}, None)])])
+        self.assertEqual(IndexJournal(self.path).changes_since(0, 2),
+                         [[("A", None, {"product_id": "A"})], [("A", {"product_id": "A"}, None)]])
+
+    def test_clear_removes_file(self):
+        """Test that clear drops every entry."""
+        self.journal.append([(1, [])])
+        self.journal.clear()
+        self.assertFalse(os.path.exists(self.path))
+        self.assertEqual(self.journal.size(), 0)
+        self.assertIsNone(self.journal.changes_since(0, 1))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
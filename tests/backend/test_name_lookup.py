@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import random
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.name_lookup import NameLookup, dice, normalize_name, trigrams
+from helpers import make_product
+
+
+PRODUCTS = [
+    make_product("BurjKhalifa_AtTheTop_124125_2023", product_name="Burj Khalifa – At The Top (124/125)"),
+    make_product("BurjKhalifa_SKY_148_2023", product_name="Burj Khalifa – SKY (Level 148)"),
+    make_product("Dubai_MuseumOfTheFuture", product_name="Museum of the Future – General Admission"),
+    make_product("Dubai_AlFahidiDubaiMuseum", product_name="Al Fahidi Historical District & Dubai Museum Visit"),
+    make_product("AbuDhabi_SheikhZayedMosqueGuided", product_name="Sheikh Zayed Grand Mosque – Guided Visit"),
+]
+
+
+class TestNameLookup(unittest.TestCase):
+    """Test suite for prefix and trigram lookups."""
+
+    def setUp(self):
+        self.index = NameLookup()
+        self.index.build(PRODUCTS)
+
+    def ids(self, results):
+        return [result[0] for result in results]
+
+    def test_normalizes_ids_and_names(self):
+        """Test that ids and names share one normalised form."""
+        self.assertEqual(normalize_name("Dubai_Mus"), normalize_name("dubai mus"))
+        self.assertEqual(normalize_name("Burj Khalifa"), normalize_name("burj kalifa"))
+
+    def test_suggest_prefers_leading_matches(self):
+        """Test that names starting with the prefix rank before mid-name matches."""
+        self.assertEqual(self.ids(self.index.suggest("Dubai_Mus")), [
+            "Dubai_MuseumOfTheFuture", "Dubai_AlFahidiDubaiMuseum",
+        ])
+        self.assertEqual(self.ids(self.index.suggest("museum")), [
+            "Dubai_MuseumOfTheFuture", "Dubai_AlFahidiDubaiMuseum",
+        ])
+        self.assertEqual(len(self.index.suggest("burj", k=1)), 1)
+
+    def test_fuzzy_tolerates_typos(self):
+        """Test that misspelled names still find the product."""
+        self.assertEqual(self.ids(self.index.fuzzy("burj kalifa sky", k=1)), ["BurjKhalifa_SKY_148_2023"])
+        self.assertEqual(self.ids(self.index.fuzzy("musem of the futur", k=1)), ["Dubai_MuseumOfTheFuture"])
+        self.assertEqual(self.index.fuzzy("zzzz qqqq"), [])
+
+    def test_remove_and_readd(self):
+        """Test that incremental updates replace old keys and trigrams."""
+        self.index.remove(PRODUCTS[2])
+        self.assertEqual(self.ids(self.index.suggest("museum of")), [])
+        self.index.add(make_product("Dubai_MuseumOfTheFuture", product_name="Future Museum"))
+        self.assertEqual(self.ids(self.index.suggest("future")), ["Dubai_MuseumOfTheFuture"])
+        self.assertEqual(self.ids(self.index.fuzzy("futur museum", k=1)), ["Dubai_MuseumOfTheFuture"])
+
+
+    def test_updates_reuse_ordinals(self):
+        """Test that repeated updates don't grow the ordinal space."""
+        for round_number in range(50):
+            for product in PRODUCTS:
+                self.index.add(dict(product, product_name=f"{product['product_name']} {round_number}"))
+        self.assertEqual(len(self.index._product_ids), len(PRODUCTS))
+        self.assertEqual(self.ids(self.index.fuzzy("musem of the futur 49", k=1)), ["Dubai_MuseumOfTheFuture"])
+        self.index.remove(PRODUCTS[0])
+        self.index.add(make_product("Dubai_Aquarium", product_name="Dubai Aquarium"))
+        self.assertEqual(len(self.index._product_ids), len(PRODUCTS))
+        self.assertEqual(self.ids(self.index.fuzzy("dubai aquarim", k=1)), ["Dubai_Aquarium"])
+
+    def test_fuzzy_matches_pairwise_dice(self):
+        """Test the vectorised scores and top-k against Dice computed pair by pair."""
+        rng = random.Random(3)
+        words = ["desert", "safari", "dhow", "cruise", "burj", "khalifa", "museum", "future", "tour", "city"]
+        products = [
+            make_product(f"P{i:03d}_{rng.choice(words)}", product_name=' '.join(rng.sample(words, rng.randint(1, 4))))
+            for i in range(300)
+        ]
+        index = NameLookup()
+        index.build(products)
+        for product in products[:50]:
+            index.remove(product)
+        live = products[50:]
+        for text in ("desrt safari", "burj kalifa tour", "musem", "dhow"):
+            query = trigrams(normalize_name(text))
+            expected = sorted(
+                ((max(dice(query, trigrams(normalize_name(p["product_name"]))),
+                      dice(query, trigrams(normalize_name(p["product_id"])))), p["product_id"]) for p in live),
+                key=lambda item: (-item[0], item[1]),
+            )
+            expected = [(pid, round(score, 4)) for score, pid in expected if score >= 0.45][:7]
+            got = [(pid, score) for pid, _, score in index.fuzzy(text, k=7)]
+            self.assertEqual(got, expected, text)
+
+class TestCatalogManagerNameLookup(unittest.TestCase):
+    """Test suite for CatalogManager.suggest() and fuzzy()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch(PRODUCTS)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_follows_commits(self):
+        """Test that lookups reflect upserts without a rebuild."""
+        self.assertEqual(self.manager.suggest("sheikh zayed")[0]["product_id"], "AbuDhabi_SheikhZayedMosqueGuided")
+        self.manager.upsert_batch([{"product_id": "AbuDhabi_SheikhZayedMosqueGuided",
+                                    "product_name": "Grand Mosque Tour"}])
+        self.assertEqual(self.manager.suggest("sheikh zayed"), [])
+        match = self.manager.fuzzy("grand mosk tour", k=1)[0]
+        self.assertEqual(match["product_id"], "AbuDhabi_SheikhZayedMosqueGuided")
+        self.assertGreater(match["score"], 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
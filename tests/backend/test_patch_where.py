@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager, ValidationError, validate_fields
+from helpers import make_product
+
+
+class TestValidateFields(unittest.TestCase):
+    """Test suite for field-level validation of partial updates."""
+
+    def test_coerces_and_rejects(self):
+        """Test that values are coerced like Product and bad fields are refused."""
+        self.assertEqual(validate_fields({"active": "false", "duration_hours": "2"}),
+                         {"active": False, "duration_hours": 2.0})
+        self.assertEqual(validate_fields({"pricing": [{"tier_name": "A", "price_aed": 5}]})["pricing"][0]["currency"],
+                         "AED")
+        with self.assertRaises(ValidationError):
+            validate_fields({"pricing": [{"tier_name": "A", "price_aed": -5}]})
+        with self.assertRaises(ValueError):
+            validate_fields({"product_id": "X"})
+        with self.assertRaises(ValueError):
+            validate_fields({"colour": "blue"})
+
+
+class TestCatalogManagerPatchWhere(unittest.TestCase):
+    """Test suite for CatalogManager.patch_where()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("A", 149, supplier_name="Emaar", category="Sightseeing"),
+            make_product("B", 500, supplier_name="Emaar", category="Family"),
+            make_product("C", 80, supplier_name="Rayna", category="Sightseeing"),
+        ])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_patch_by_supplier_in_one_commit(self):
+        """Test that matching products change together and indexes follow."""
+        generation = self.manager.generation
+        result = self.manager.patch_where({"supplier_name": "Emaar"}, {"active": False})
+        self.assertEqual(result, {"matched": 2, "updated": 2, "ids": ["A", "B"]})
+        self.assertEqual(self.manager.generation, generation + 1)
+        self.assertEqual([p["product_id"] for p in self.manager.by_status(False)], ["A", "B"])
+        self.assertEqual(self.manager.catalog_stats()["inactive"], 2)
+        self.assertEqual(self.manager.get("A")["product_name"], "A")
+
+    def test_residual_predicates_and_no_op(self):
+        """Test non-indexed filters and that unchanged products are skipped."""
+        where = {"category": "Sightseeing", "price": {"gte": 100}, "product_name": {"ne": "Z"}}
+        self.assertEqual(self.manager.patch_where(where, {"booking_policy": "Non-refundable"})["ids"], ["A"])
+        generation = self.manager.generation
+        result = self.manager.patch_where(where, {"booking_policy": "Non-refundable"})
+        self.assertEqual((result["matched"], result["updated"]), (1, 0))
+        self.assertEqual(self.manager.generation, generation)
+
+    def test_dry_run_and_empty_filter(self):
+        """Test that dry runs write nothing and an empty filter is refused."""
+        result = self.manager.patch_where({"category": "Family"}, {"category": "Adventure"}, dry_run=True)
+        self.assertEqual(result["ids"], ["B"])
+        self.assertEqual(self.manager.get("B")["category"], "Family")
+        with self.assertRaises(ValueError):
+            self.manager.patch_where({}, {"active": False})
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.price_history import ROW, PriceHistory, to_timestamp
+from helpers import make_product
+
+
+def named(*pairs):
+    """Pricing tiers from ``(tier_name, price_aed)`` pairs."""
+    return [{"tier_name": name, "price_aed": price} for name, price in pairs]
+
+
+def change(before, after):
+    return {after["product_id"]: (before, after)}
+
+
+class TestPriceHistory(unittest.TestCase):
+    """Test suite for the delta-encoded price history file."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.base = os.path.join(self.temp_dir, 'products.json.prices')
+        self.history = PriceHistory(self.base)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_records_only_actual_changes(self):
+        """Test that unchanged prices append nothing and changes decode exactly."""
+        v1 = make_product("Museum", pricing=named(("Adult", 149), ("Child", 99.5)))
+        v2 = make_product("Museum", pricing=named(("Adult", 169), ("Child", 99.5)))
+        v3 = make_product("Museum", pricing=named(("Adult", 159.25), ("Child", 99.5)))
+        self.assertEqual(self.history.record(change(None, v1), "2026-01-01"), 2)
+        self.assertEqual(self.history.record(change(v1, v1), "2026-02-01"), 0)
+        self.assertEqual(self.history.record(change(v1, v2), "2026-03-01"), 1)
+        self.assertEqual(self.history.record(change(v2, v3), "2026-04-01T10:00:00Z"), 1)
+        self.assertEqual(os.path.getsize(f"{self.base}.bin"), 4 * ROW.itemsize)
+
+        reader = PriceHistory(self.base)
+        adult = [(e["timestamp"], e["price_aed"]) for e in reader.history("Museum") if e["tier_name"] == "Adult"]
+        self.assertEqual(adult, [
+            ("2026-01-01T00:00:00Z", 149.0),
+            ("2026-03-01T00:00:00Z", 169.0),
+            ("2026-04-01T10:00:00Z", 159.25),
+        ])
+        self.assertEqual(len(reader.history("Museum", since="2026-02-15")), 2)
+
+    def test_baseline_for_untracked_series(self):
+        """Test that the first change of an untracked tier also records the old price."""
+        old = make_product("Safari", 200)
+        self.history.record(change(old, make_product("Safari", 260)), "2026-05-01", baseline="2026-01-01")
+        self.assertEqual([e["price_aed"] for e in self.history.history("Safari")], [200.0, 260.0])
+
+    def test_movers_rank_by_amount_and_percent(self):
+        """Test biggest movers between a date and the latest prices."""
+        products = [make_product("A", 100), make_product("B", 1000), make_product("C", 50)]
+        for p in products:
+            self.history.record(change(None, p), "2026-01-01")
+        self.history.record(change(products[0], make_product("A", 150)), "2026-03-01")
+        self.history.record(change(products[1], make_product("B", 1100)), "2026-03-01")
+        self.history.record(change(products[2], make_product("C", 40)), "2026-03-01")
+
+        by_amount = self.history.movers("2026-02-01")
+        self.assertEqual([(m["product_id"], m["change"]) for m in by_amount], [("B", 100.0), ("A", 50.0), ("C", -10.0)])
+        by_percent = self.history.movers("2026-02-01", k=2, by="percent")
+        self.assertEqual([(m["product_id"], m["change_pct"]) for m in by_percent], [("A", 50.0), ("C", -20.0)])
+        self.assertEqual(self.history.movers("2026-03-01"), [])
+        with self.assertRaises(ValueError):
+            self.history.movers("2026-02-01", by="volume")
+
+    def test_timestamps(self):
+        """Test that dates and naive datetimes are read as UTC."""
+        self.assertEqual(to_timestamp("2026-01-01"), to_timestamp("2026-01-01T00:00:00Z"))
+        self.assertEqual(to_timestamp(1700000000.9), 1700000000)
+
+
+class TestCatalogManagerPriceHistory(unittest.TestCase):
+    """Test suite for price history recorded by upsert_batch()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_upserts_append_history(self):
+        """Test that repricing through upsert_batch is recorded."""
+        self.manager.upsert_batch([make_product("Museum", 149)])
+        self.manager.upsert_batch([{"product_id": "Museum", "product_name": "Museum of the Future"}])
+        self.manager.upsert_batch([{"product_id": "Museum", "pricing": [{"tier_name": "Adult", "price_aed": 169}]}])
+        self.assertEqual([e["price_aed"] for e in self.manager.price_history("Museum")], [149.0, 169.0])
+        self.assertEqual(self.manager.price_history("Unknown"), [])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,110 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import random
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.price_index import PriceIndex
+from helpers import make_product, tiers
+
+
+class TestPriceIndex(unittest.TestCase):
+    """Test suite for the sorted price index."""
+
+    def test_range_queries_match_scan(self):
+        """Test bisect range queries against a linear scan after churn."""
+        rng = random.Random(11)
+        products = {f"P{i}": make_product(f"P{i}", pricing=tiers(*[rng.randint(0, 40) * 25 for _ in range(rng.randint(0, 4))]))
+                    for i in range(150)}
+        index = PriceIndex()
+        index.build(products.values())
+        for pid in list(products)[:40]:
+            index.remove(products[pid])
+            products[pid] = make_product(pid, *[rng.randint(0, 40) * 25 for _ in range(2)])
+            index.add(products[pid])
+
+        for low, high in [(0, 100), (250, 250), (300, 1000), (None, 50), (975, None)]:
+            expected = {
+                pid for pid, p in products.items()
+                if any((low is None or t["price_aed"] >= low) and (high is None or t["price_aed"] <= high)
+                       for t in p["pricing"])
+            }
+            self.assertEqual(index.products_between(low, high), expected)
+
+            mins = {pid: min(t["price_aed"] for t in p["pricing"]) for pid, p in products.items() if p["pricing"]}
+            expected_min = {pid for pid, m in mins.items()
+                            if (low is None or m > low) and (high is None or m < high)}
+            got = set(index.products_by_min_price(low, high, include_low=False, include_high=False))
+            self.assertEqual(got, expected_min)
+
+    def test_build_matches_incremental_adds(self):
+        """Test that the sort-once build gives the same index as adding product by product."""
+        rng = random.Random(5)
+        products = [make_product(f"P{i}", pricing=tiers(*[rng.randint(0, 40) * 25 for _ in range(rng.randint(0, 3))]))
+                    for i in range(100)]
+        built = PriceIndex()
+        built.build(products)
+        added = PriceIndex()
+        for product in products:
+            added.add(product)
+        self.assertEqual((built._tiers, built._mins, built._extremes), (added._tiers, added._mins, added._extremes))
+        self.assertEqual(built.to_dict(), added.to_dict())
+
+    def test_min_max_and_cheapest_tier(self):
+        """Test precomputed per-product extremes."""
+        index = PriceIndex()
+        index.add(make_product("A", 300, 120, 450))
+        index.add(make_product("Free", pricing=[]))
+        self.assertEqual(index.min_price("A"), 120)
+        self.assertEqual(index.max_price("A"), 450)
+        self.assertEqual(index.cheapest_tier("A"), (120, 1))
+        self.assertIsNone(index.min_price("Free"))
+
+
+class TestCatalogManagerPricing(unittest.TestCase):
+    """Test suite for price-driven CatalogManager reads."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("Safari", 250, 180, category="Adventure"),
+            make_product("Balloon", 1000, 850, category="Adventure"),
+            make_product("Museum", 63, category="Cultural"),
+        ])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_in_price_range_orders_by_matching_tier(self):
+        """Test budget filtering returns cheapest matching products first."""
+        ids = [p["product_id"] for p in self.manager.in_price_range(high=300)]
+        self.assertEqual(ids, ["Museum", "Safari"])
+        ids = [p["product_id"] for p in self.manager.in_price_range(high=300, filters={"category": "Adventure"})]
+        self.assertEqual(ids, ["Safari"])
+
+    def test_cheapest_tier_follows_upserts(self):
+        """Test that the cheapest tier is updated on commit."""
+        self.assertEqual(self.manager.cheapest_tier("Balloon")["price_aed"], 850)
+        self.manager.upsert_batch([{"product_id": "Balloon", "pricing": [{"tier_name": "Promo", "price_aed": 700}]}])
+        self.assertEqual(self.manager.cheapest_tier("Balloon")["tier_name"], "Promo")
+
+    def test_query_planner_uses_price_index(self):
+        """Test that price range predicates are answered from the index."""
+        result = self.manager.query(where={"price": {"gte": 100, "lt": 900}})
+        self.assertEqual([p["product_id"] for p in result["items"]], ["Balloon", "Safari"])
+        self.assertEqual(result["plan"]["indexes"], ["price:range"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
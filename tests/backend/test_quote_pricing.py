@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.quote_pricing import QuotePricer
+
+
+def tier(name, price, start=None, end=None):
+    return {"tier_name": name, "price_aed": price, "validity_start": start, "validity_end": end}
+
+
+PRODUCTS = [
+    {
+        "product_id": "Balloon",
+        "product_name": "Hot Air Balloon Flight",
+        "pricing": [
+            tier("Balloon Flight Adult", 1000, "2025-12-12", "2026-12-31"),
+            tier("Balloon Flight Child (5–12 years)", 850, "2025-12-12", "2026-12-31"),
+            tier("Balloon Flight Adult", 1100, "2027-01-01", None),
+        ],
+        "inclusions": [],
+    },
+    {
+        "product_id": "Museum",
+        "product_name": "Museum of the Future",
+        "pricing": [tier("General Admission – Adult/Child", 149)],
+        "inclusions": [],
+    },
+]
+
+
+class TestQuotePricer(unittest.TestCase):
+    """Test suite for tier resolution and quote totals."""
+
+    def setUp(self):
+        self.pricer = QuotePricer()
+        self.pricer.build(PRODUCTS)
+
+    def test_prices_guest_types_by_date(self):
+        """Test that guest types pick matching tiers valid on the date."""
+        quote = self.pricer.price_quote([{"product_id": "Balloon"}, {"product_id": "Museum"}],
+                                        "2026-03-01", {"adult": 2, "child": 1})
+        self.assertEqual([(line["tier_name"], line["quantity"]) for line in quote["lines"]], [
+            ("Balloon Flight Adult", 2),
+            ("Balloon Flight Child (5–12 years)", 1),
+            ("General Admission – Adult/Child", 3),
+        ])
+        self.assertEqual(quote["total"], 3297.0)
+        self.assertEqual(quote["per_person"], 1099.0)
+
+        later = self.pricer.price_quote([{"product_id": "Balloon"}], "2027-06-01", 2)
+        self.assertEqual(later["lines"][0]["unit_price"], 1100.0)
+
+    def test_explicit_tier_and_quantity(self):
+        """Test tier_name word matching and explicit quantities."""
+        quote = self.pricer.price_quote([{"product_id": "Balloon", "tier_name": "child", "quantity": 2}],
+                                        "2026-03-01", 4)
+        self.assertEqual(quote["lines"][0]["line_total"], 1700.0)
+        with self.assertRaises(ValueError):
+            self.pricer.price_quote([{"product_id": "Balloon", "tier_name": "senior"}], "2026-03-01", 1)
+
+    def test_cache_follows_product_changes(self):
+        """Test that cached tiers for a date are dropped when the product changes."""
+        self.pricer.price_quote([{"product_id": "Museum"}], "2026-03-01", 1)
+        self.assertIn("Museum", self.pricer._valid)
+        self.pricer.add(dict(PRODUCTS[1], pricing=[tier("General Admission", 169)]))
+        quote = self.pricer.price_quote([{"product_id": "Museum"}], "2026-03-01", 1)
+        self.assertEqual(quote["total"], 169.0)
+
+    def test_batch_reports_errors_per_quote(self):
+        """Test that one bad quote does not abort the batch."""
+        results = self.pricer.price_quotes([
+            {"lines": [{"product_id": "Museum"}], "travel_date": "2026-01-01", "pax": 2},
+            {"lines": [{"product_id": "Balloon"}], "travel_date": "2025-01-01", "pax": 2},
+            {"lines": [{"product_id": "Missing"}], "travel_date": "2026-01-01"},
+        ])
+        self.assertEqual(results[0]["total"], 298.0)
+        self.assertIn("No tier of Balloon is valid on 2025-01-01", results[1]["error"])
+        self.assertIn("Unknown product", results[2]["error"])
+
+
+class TestCatalogManagerPriceQuote(unittest.TestCase):
+    """Test suite for CatalogManager.price_quote()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch(PRODUCTS)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_prices_after_upsert(self):
+        """Test that a repriced tier is used after an upsert."""
+        self.assertEqual(self.manager.price_quote([{"product_id": "Museum"}], "2026-05-01", 2)["total"], 298.0)
+        self.manager.upsert_batch([{"product_id": "Museum", "pricing": [tier("General Admission", 159)]}])
+        self.assertEqual(self.manager.price_quote([{"product_id": "Museum"}], "2026-05-01", 2)["total"], 318.0)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
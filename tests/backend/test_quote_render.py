@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+import unittest
+import io
+import os
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.quote_render import (
+    CompiledTemplate, js_number, product_fragment, render_quote, render_quotes, write_quotes,
+)
+
+QUOTE = {
+    "tourType": "Dubai City Tour",
+    "vehicle": "SUV",
+    "zone": "B",
+    "zoneName": "Marina",
+    "guests": 3,
+    "vehicleRate": 400,
+    "pickupRate": 50.5,
+    "attractionsCost": 149,
+    "total": 599.5,
+    "perPerson": 199.83333333333334,
+}
+
+# exportQuoteAsText(QUOTE) from src/frontend/lib/quote-export.ts
+EXPECTED_TEXT = """🌟 Ahmed Travel Quote
+━━━━━━━━━━━━━━━━━━
+
+📍 Tour: Dubai City Tour
+🚐 Vehicle: SUV
+📍 Pickup Zone: Zone B (Marina)
+👥 Guests: 3
+
+💰 Breakdown:
+• Vehicle: AED 400
+• Pickup: AED 50.5
+• Attractions: AED 149
+
+━━━━━━━━━━━━━━━━━━
+✨ Total: AED 599.5
+👤 Per Person: AED 199.83333333333334
+
+Thank you for choosing Ahmed Travel! ✈️"""
+
+
+class TestQuoteRender(unittest.TestCase):
+    """Test suite for frontend-compatible quote rendering."""
+
+    def test_text_matches_frontend(self):
+        """Test the text export, including the optional zone and attractions parts."""
+        self.assertEqual(render_quote(QUOTE, 'text'), EXPECTED_TEXT)
+        plain = dict(QUOTE, zoneName="", attractionsCost=0)
+        expected = EXPECTED_TEXT.replace(" (Marina)", "").replace("• Attractions: AED 149", "")
+        self.assertEqual(render_quote(plain, 'text'), expected)
+
+    def test_html_matches_frontend_structure(self):
+        """Test that HTML interpolates like the frontend and omits the zone name."""
+        html = render_quote(QUOTE, 'html')
+        self.assertTrue(html.startswith("<!DOCTYPE html>\n<html>"))
+        self.assertTrue(html.endswith("</body>\n</html>"))
+        self.assertIn('<span class="value">Zone B</span>', html)
+        self.assertIn('<span class="value">AED 149</span>', html)
+        self.assertNotIn("Attractions:", render_quote(dict(QUOTE, attractionsCost=0), 'html'))
+
+    def test_js_number_formatting(self):
+        """Test Number.prototype.toString() behaviour for integral, tiny and huge values."""
+        cases = {400.0: "400", 0.1 + 0.2: "0.30000000000000004", 1e-7: "1e-7",
+                 0.00001: "0.00001", 1e16: "10000000000000000", 1.5e22: "1.5e+22", -0.0: "0"}
+        for value, expected in cases.items():
+            self.assertEqual(js_number(value), expected, value)
+        self.assertIn("Vehicle: undefined", render_quote({"zone": "A"}, 'text'))
+
+    def test_compiled_template(self):
+        """Test that templates are split once into literals and slots."""
+        template = CompiledTemplate("a ${x} b ${y}")
+        self.assertEqual(template.names, ("x", "y"))
+        self.assertEqual(template.render({"x": "1", "y": "2"}), "a 1 b 2")
+
+    def test_fragments_and_pool(self):
+        """Test product fragments, HTML escaping and pool output order."""
+        product = {"product_id": "P", "product_name": "Tea & <Cake>", "inclusions": ["Tea"],
+                   "booking_policy": "Non-refundable"}
+        fragments = {"P": product_fragment(product, 'text')}
+        text = render_quote(dict(QUOTE, products=["P"]), 'text', fragments)
+        self.assertIn("📋 Included products:\n• Tea & <Cake>\n  ✓ Tea\n  ℹ️ Non-refundable\n\nThank you", text)
+        self.assertIn("Tea &amp; &lt;Cake&gt;", product_fragment(product, 'html'))
+        with self.assertRaises(ValueError):
+            render_quote(dict(QUOTE, products=["Missing"]), 'text', fragments)
+
+        quotes = [dict(QUOTE, guests=i, products=["P"] if i % 2 else []) for i in range(12)]
+        sequential = list(render_quotes(quotes, 'text', fragments))
+        self.assertEqual(list(render_quotes(quotes, 'text', fragments, workers=2, chunk_size=5)), sequential)
+        out = io.StringIO()
+        self.assertEqual(write_quotes(quotes[:2], out, 'text', fragments), 2)
+        self.assertEqual(out.getvalue(), sequential[0] + "\n" + sequential[1] + "\n")
+
+
+class TestCatalogManagerRenderQuotes(unittest.TestCase):
+    """Test suite for CatalogManager.render_quotes()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([{
+            "product_id": "Museum", "product_name": "Museum of the Future",
+            "pricing": [{"tier_name": "Adult", "price_aed": 149}], "inclusions": ["Timed entry"],
+        }])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_fragments_follow_upserts(self):
+        """Test that cached product fragments are refreshed after an upsert."""
+        quote = dict(QUOTE, products=["Museum"])
+        self.assertIn("• Museum of the Future", next(self.manager.render_quotes([quote])))
+        self.manager.upsert_batch([{"product_id": "Museum", "product_name": "MOTF Admission"}])
+        self.assertIn("• MOTF Admission", next(self.manager.render_quotes([quote])))
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import random
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.recommender import QUESTIONS, RecommenderIndex, minimum_age
+from helpers import make_product
+
+
+PRODUCTS = [
+    make_product("Mosque", 50, category="Cultural", duration_hours=1.5, destination_city="Abu Dhabi"),
+    make_product("Louvre", 63, category="Cultural", duration_hours=3, destination_city="Abu Dhabi"),
+    make_product("CityTour", 180, category="Sightseeing", duration_hours=11, destination_city="Dubai"),
+    make_product("Quad", 150, category="Adventure", duration_hours=1, destination_city="Dubai",
+                 booking_policy="Riders must be 16 years or older."),
+    make_product("Camel", 10, category="Adventure", duration_hours=0.5, destination_city="Dubai"),
+    make_product("Ferrari", 300, category="Adventure", duration_hours=8, destination_city="Abu Dhabi"),
+    make_product("Lounge", 900, category="Luxury", duration_hours=1.5, destination_city="Dubai"),
+    make_product("Frame", 20, category="Sightseeing", duration_hours=1.5, destination_city="Dubai",
+                 product_name="Dubai Frame Panoramic Views"),
+]
+
+
+class TestRecommender(unittest.TestCase):
+    """Test suite for the vectorised questionnaire recommender."""
+
+    def setUp(self):
+        self.index = RecommenderIndex()
+        self.index.build(PRODUCTS)
+
+    def ids(self, answers, k=3):
+        return [pid for pid, _ in self.index.recommend(answers, k)]
+
+    def test_hard_filters(self):
+        """Test the interest, family age, budget and half-day filters."""
+        self.assertEqual(set(self.ids({"interest": "adventure"}, 10)), {"Quad", "Camel", "Ferrari"})
+        self.assertNotIn("Quad", self.ids({"interest": "adventure", "group": "family"}, 10))
+        self.assertNotIn("Lounge", self.ids({"interest": "luxury", "budget": "budget"}, 10))
+        self.assertNotIn("Ferrari", self.ids({"interest": "adventure", "time": "half"}, 10))
+        self.assertEqual(minimum_age({"booking_policy": "at least 18 years old"}), 18)
+
+    def test_ranking_preferences(self):
+        """Test that city, budget and photo cues order the matches."""
+        self.assertEqual(self.ids({"interest": "adventure", "city": "Abu Dhabi"}, 1), ["Ferrari"])
+        self.assertEqual(self.ids({"interest": "adventure", "budget": "budget"}, 1), ["Camel"])
+        self.assertEqual(self.ids({"interest": "photo"}, 1), ["Frame"])
+
+    def test_batch_matches_single_requests(self):
+        """Test that batched scoring equals one-by-one scoring."""
+        rng = random.Random(5)
+        batch = [{q: rng.choice(options + (None,)) for q, options in QUESTIONS.items()} for _ in range(40)]
+        batch = [{q: v for q, v in answers.items() if v} for answers in batch]
+        self.assertEqual(self.index.recommend_many(batch, 3), [self.index.recommend(a, 3) for a in batch])
+
+    def test_rejects_unknown_answers(self):
+        """Test that unknown option values raise ValueError."""
+        with self.assertRaises(ValueError):
+            self.index.recommend({"budget": "cheap"})
+
+
+class TestCatalogManagerRecommend(unittest.TestCase):
+    """Test suite for CatalogManager.recommend()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch(PRODUCTS)
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_returns_products_and_tips(self):
+        """Test projection, tips and that deactivated products drop out."""
+        result = self.manager.recommend({"interest": "culture", "group": "family"}, k=2, fields=["product_name"])
+        self.assertEqual([p["product_id"] for p in result["products"]], ["Louvre", "Mosque"])
+        self.assertIn("Remind about mosque dress code requirements", result["tips"])
+
+        self.manager.upsert_batch([{"product_id": "Louvre", "active": False}])
+        result = self.manager.recommend({"interest": "culture"}, k=2)
+        self.assertEqual([p["product_id"] for p in result["products"]], ["Mosque", "CityTour"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
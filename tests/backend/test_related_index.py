@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import random
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+
+import numpy as np
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.related_index import RelatedIndex
+from helpers import make_product
+
+
+def brute_force(index, product_id):
+    """Top neighbours from a full similarity matrix over the index's own vectors."""
+    sims = np.round(index._matrix @ index._matrix.T, index.DECIMALS)
+    row = index._rows[product_id]
+    ranked = sorted(
+        ((pid, float(sims[row, other])) for pid, other in index._rows.items()
+         if other != row and sims[row, other] > 0),
+        key=lambda item: (-item[1], item[0]),
+    )
+    return ranked[:index.NEIGHBOURS]
+
+
+def brute_force_all(index, product_id):
+    limit = index.NEIGHBOURS
+    index.NEIGHBOURS = len(index._rows)
+    try:
+        return brute_force(index, product_id)
+    finally:
+        index.NEIGHBOURS = limit
+
+
+class TestRelatedIndex(unittest.TestCase):
+    """Test suite for the TF-IDF neighbour index."""
+
+    def random_products(self, rng, count, start=0):
+        words = [f"word{i}" for i in range(60)]
+        return [
+            make_product(
+                f"P{i}", product_name=" ".join(rng.choices(words, k=3)),
+                description_short=" ".join(rng.choices(words, k=8)),
+                category=rng.choice(["Adventure", "Culture", "Water"]), destination_city="Dubai",
+            )
+            for i in range(start, start + count)
+        ]
+
+    def test_ranks_shared_terms_first(self):
+        """Test that products sharing rare terms are the closest neighbours."""
+        index = RelatedIndex()
+        index.build([
+            make_product("Safari", product_name="Evening Desert Safari",
+                         description_short="Dune bashing with BBQ dinner", category="Adventure", destination_city="Dubai"),
+            make_product("Addon_Quad", product_name="Quad Bike Add-on",
+                         description_short="Quad bike ride in the desert dunes", category="Adventure", destination_city="Dubai"),
+            make_product("Museum", product_name="Museum of the Future",
+                         description_short="Exhibitions about future technology", category="Culture", destination_city="Dubai"),
+            make_product("Louvre", product_name="Louvre Abu Dhabi",
+                         description_short="Art museum exhibitions", category="Culture", destination_city="Abu Dhabi"),
+        ])
+        self.assertEqual(index.related("Safari", 1)[0][0], "Addon_Quad")
+        self.assertEqual(index.related("Museum", 1)[0][0], "Louvre")
+        self.assertEqual(index.related("Missing"), [])
+
+    def test_incremental_updates_match_full_recompute(self):
+        """Test that dirty-row recomputation matches a brute-force top-k."""
+        rng = random.Random(7)
+        products = self.random_products(rng, 80)
+        index = RelatedIndex()
+        index.NEIGHBOURS = 5
+        index.build(products)
+
+        for product in rng.sample(products, 6):
+            index.remove(product)
+        for product in self.random_products(rng, 6, start=40):
+            index.add(product)
+        for product in self.random_products(rng, 4, start=200):
+            index.add(product)
+        index.related("P0")
+        self.assertGreater(index._drift, 0, "expected the incremental path, not a rebuild")
+
+        for product_id in index._rows:
+            self.assertEqual(index.related(product_id, 5), brute_force(index, product_id), product_id)
+
+    def test_filtered_lookup_scans_past_stored_neighbours(self):
+        """Test that filters fall back to a full row when stored neighbours run out."""
+        rng = random.Random(11)
+        products = self.random_products(rng, 40)
+        index = RelatedIndex()
+        index.NEIGHBOURS = 2
+        index.build(products)
+        accept = lambda pid: pid.endswith("7")
+        expected = [item for item in brute_force_all(index, "P0") if accept(item[0])][:3]
+        self.assertEqual(index.related("P0", 3, accept=accept), expected)
+
+
+class TestCatalogManagerRelated(unittest.TestCase):
+    """Test suite for CatalogManager.related()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("Safari", product_name="Evening Desert Safari",
+                         description_short="Dune bashing with BBQ dinner", category="Adventure", destination_city="Dubai"),
+            make_product("Addon_Quad", product_name="Quad Bike Add-on",
+                         description_short="Quad bike ride in the desert dunes", category="Addon", destination_city="Dubai"),
+            make_product("Dhow", product_name="Dhow Cruise Dinner",
+                         description_short="Marina cruise with buffet dinner", category="Cruise", destination_city="Dubai"),
+        ])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_filters_and_follows_upserts(self):
+        """Test category filters and that edits change the neighbours."""
+        result = self.manager.related("Safari", k=1, filters={"category": "Addon"}, fields=["product_name"])
+        self.assertEqual([item["product_id"] for item in result], ["Addon_Quad"])
+        self.assertEqual(set(result[0]), {"product_id", "product_name", "score"})
+
+        self.manager.upsert_batch([{"product_id": "Addon_Quad", "product_name": "Marina Dhow Cruise Upgrade",
+                                    "description_short": "Dinner cruise upgrade"}])
+        self.assertEqual(self.manager.related("Dhow", k=1)[0]["product_id"], "Addon_Quad")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
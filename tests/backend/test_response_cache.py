@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import gzip
+import json
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.api import create_app
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.response_cache import encode_json
+from helpers import make_product
+
+
+class TestResponseCache(unittest.TestCase):
+    """Test suite for pre-encoded product and list payloads."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("A", 150, product_name="A – Dubai", category="Sightseeing"),
+            make_product("B", 80, product_name="B – Dubai", category="Family"),
+            make_product("C", 60, product_name="C – Dubai", category="Sightseeing"),
+        ])
+        self.cache = self.manager.get_index('responses')
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def expected_list(self, where=None):
+        result = self.manager.query(where=where)
+        del result['plan']
+        return encode_json(result)
+
+    def test_payloads_match_serialised_json(self):
+        """Test that spliced payloads equal a fresh json.dumps of the same data."""
+        self.assertEqual(self.cache.product("A"), encode_json(self.manager.get("A")))
+        self.assertEqual(self.cache.listing(), self.expected_list())
+        self.assertEqual(self.cache.listing("Sightseeing"), self.expected_list({"category": "Sightseeing"}))
+        self.assertEqual(gzip.decompress(self.cache.listing(compressed=True)), self.expected_list())
+        self.assertEqual(json.loads(self.cache.listing("Cruise")), {"items": [], "total": 0, "next_cursor": None})
+        self.assertIsNone(self.cache.product("Z"))
+
+    def test_commit_invalidates_only_touched_products(self):
+        """Test that untouched fragments and category lists are reused after a commit."""
+        a, sightseeing, everything = self.cache.product("A"), self.cache.listing("Sightseeing"), self.cache.listing()
+        self.manager.upsert_batch([{"product_id": "B", "active": False}])
+        self.assertIs(self.cache.product("A"), a)
+        self.assertIs(self.cache.listing("Sightseeing"), sightseeing)
+        self.assertIsNot(self.cache.listing(), everything)
+        self.assertEqual(self.cache.listing(), self.expected_list())
+
+        self.manager.upsert_batch([{"product_id": "C", "category": "Family"}])
+        self.assertEqual(self.cache.listing("Sightseeing"), self.expected_list({"category": "Sightseeing"}))
+        self.assertEqual(self.cache.listing("Family"), self.expected_list({"category": "Family"}))
+        self.manager.delete(["A"])
+        self.assertEqual(json.loads(self.cache.listing("Sightseeing"))["total"], 0)
+
+    def test_api_serves_cached_bytes(self):
+        """Test that the API writes the cached payloads, gzipped on request."""
+        app = create_app(manager=self.manager)
+        response = app.handle('GET', '/products/A', {})
+        self.assertIs(response.body, self.cache.product("A"))
+
+        plain = app.handle('GET', '/products?category=Sightseeing', {})
+        zipped = app.handle('GET', '/products?category=Sightseeing', {'Accept-Encoding': 'br, gzip;q=0.8'})
+        headers = dict(zipped.headers)
+        self.assertEqual(headers['Content-Encoding'], 'gzip')
+        self.assertEqual(headers['Vary'], 'Accept-Encoding')
+        self.assertEqual(gzip.decompress(zipped.body), plain.body)
+        self.assertNotEqual(headers['ETag'], dict(plain.headers)['ETag'])
+        self.assertEqual(app.handle('GET', '/products', {'Accept-Encoding': 'gzip;q=0'}).body, self.expected_list())
+        self.assertEqual(app.handle('GET', '/products?limit=5', {}).body, self.expected_list())
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
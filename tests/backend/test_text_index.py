@@ -0,0 +1,156 @@
+#!/usr/bin/env python3
+
+import unittest
+import math
+import os
+import random
+import sys
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.text_index import TextIndex, tokenize, document_terms
+from helpers import make_product
+
+
+class TestTokenizer(unittest.TestCase):
+    """Test suite for text normalisation."""
+
+    def test_folds_accents_and_case(self):
+        """Test that accented and upper-case input folds to the same tokens."""
+        self.assertEqual(tokenize("Café CRÈME"), tokenize("cafe creme"))
+
+    def test_folds_transliteration_variants(self):
+        """Test that common romanisation variants share a token."""
+        self.assertEqual(tokenize("Souq"), tokenize("souk"))
+        self.assertEqual(tokenize("Burj Khalifa"), tokenize("burj kalifa"))
+        self.assertEqual(tokenize("Sheikh Zayed"), tokenize("Shaikh Zaid"))
+        self.assertEqual(tokenize("Jumeirah"), tokenize("Jumeira"))
+
+    def test_normalises_arabic_script(self):
+        """Test that alef variants and diacritics are folded in Arabic text."""
+        self.assertEqual(tokenize("مَسْجِد الشيخ زايد"), tokenize("مسجد الشيخ زايد"))
+        self.assertEqual(tokenize("أبوظبي"), tokenize("ابوظبي"))
+
+    def test_drops_stopwords(self):
+        """Test that stopwords and the al-/el- article are not indexed."""
+        self.assertEqual(tokenize("The Al Fahidi and the souk"), tokenize("fahidi souk"))
+
+
+class TestTextIndex(unittest.TestCase):
+    """Test suite for BM25 ranking and incremental maintenance."""
+
+    def brute_force(self, index, products, text, k):
+        n = len(products)
+        avg = sum(sum(document_terms(p).values()) for p in products) / n
+        scores = {}
+        for term in set(tokenize(text)):
+            docs = [p for p in products if term in document_terms(p)]
+            if not docs:
+                continue
+            idf = math.log(1 + (n - len(docs) + 0.5) / (len(docs) + 0.5))
+            for p in docs:
+                tf = document_terms(p)[term]
+                dl = sum(document_terms(p).values())
+                norm = index.K1 * (1 - index.B + index.B * dl / avg)
+                scores[p["product_id"]] = scores.get(p["product_id"], 0) + idf * tf * (index.K1 + 1) / (tf + norm)
+        ranked = sorted(scores.items(), key=lambda item: -item[1])[:k]
+        return [round(score, 6) for _, score in ranked]
+
+    def test_top_k_matches_exhaustive_scoring(self):
+        """Test that MaxScore pruning returns the same scores as scoring every document."""
+        rng = random.Random(7)
+        vocabulary = ["desert", "safari", "dhow", "dinner", "cruise", "marina", "mosque", "museum",
+                      "tour", "burj", "souk", "creek", "abra", "brunch", "yacht", "camel"]
+        products = [
+            make_product(f"P{i}", product_name=" ".join(rng.choices(vocabulary, k=3)),
+                         description_long=" ".join(rng.choices(vocabulary, k=rng.randint(5, 30))))
+            for i in range(300)
+        ]
+        index = TextIndex()
+        index.build(products)
+
+        for query in ["dhow dinner cruise", "desert camel", "museum", "souk abra creek yacht"]:
+            got = [round(score, 6) for _, score in index.search(query, k=5)]
+            self.assertEqual(got, self.brute_force(index, products, query, 5), query)
+
+    def test_remove_drops_postings(self):
+        """Test that removed documents no longer match."""
+        index = TextIndex()
+        product = make_product("A", product_name="Dhow Dinner Cruise")
+        index.add(product)
+        index.remove(product)
+        self.assertEqual(index.search("dhow"), [])
+        self.assertEqual(len(index), 0)
+
+    def test_round_trips_through_packed_dict(self):
+        """Test that the packed sidecar form reloads the same postings and scores."""
+        products = [make_product(f"P{i}", product_name="Dhow Dinner Cruise", description_long="marina " * i) for i in range(20)]
+        index = TextIndex()
+        index.build(products)
+        for product in products[::3]:
+            index.remove(product)
+        index.add(make_product("P0", product_name="Desert Safari"))
+
+        data = index.to_dict()
+        self.assertIsInstance(data["ordinals"], str)
+        reloaded = TextIndex()
+        reloaded.load_dict(data)
+        self.assertEqual(reloaded._postings, index._postings)
+        self.assertEqual(reloaded.search("marina dhow", k=5), index.search("marina dhow", k=5))
+        reloaded.add(make_product("P3", product_name="Marina Walk"))
+        self.assertEqual(reloaded.search("walk")[0][0], "P3")
+
+
+class TestCatalogManagerSearch(unittest.TestCase):
+    """Test suite for CatalogManager.search()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("Dubai_DhowCruise", product_name="Dhow Cruise Dinner",
+                         description_long="Buffet dinner on a traditional dhow in Dubai Marina."),
+            make_product("AbuDhabi_Mosque", product_name="Sheikh Zayed Grand Mosque",
+                         description_long="Guided visit. Dress code: modest clothing, abaya provided.",
+                         destination_city="Abu Dhabi"),
+            make_product("Dubai_Souk", 40, product_name="Gold Souk Walk",
+                         description_long="Walk through the souq and spice market."),
+        ])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_ranks_relevant_products(self):
+        """Test free-text queries from agents hit the expected product first."""
+        self.assertEqual(self.manager.search("mosque dress code")[0]["product_id"], "AbuDhabi_Mosque")
+        self.assertEqual(self.manager.search("dhow dinner")[0]["product_id"], "Dubai_DhowCruise")
+        self.assertEqual(self.manager.search("shaikh zaid")[0]["product_id"], "AbuDhabi_Mosque")
+
+    def test_applies_filters(self):
+        """Test that filters restrict the ranked results."""
+        results = self.manager.search("walk dinner", filters={"price": {"lt": 50}}, fields=["product_name"])
+        self.assertEqual([r["product_id"] for r in results], ["Dubai_Souk"])
+        self.assertIn("score", results[0])
+        self.assertNotIn("description_long", results[0])
+
+    def test_tracks_upserts_and_persists(self):
+        """Test that updates are indexed incrementally and reloaded from the sidecar."""
+        self.manager.upsert_batch([{"product_id": "Dubai_Souk", "product_name": "Spice Market Walk",
+                                    "description_long": "Spices and perfumes."}])
+        self.assertEqual(self.manager.search("gold"), [])
+
+        reopened = CatalogManager(db_path=self.db_path)
+        with patch.object(TextIndex, 'build', side_effect=AssertionError("rebuilt")):
+            self.assertEqual(reopened.search("perfume")[0]["product_id"], "Dubai_Souk")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
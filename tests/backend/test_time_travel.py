@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from helpers import make_product
+
+
+def rewrite_times(path, times):
+    """Give the undo log's batches fixed commit times, oldest first."""
+    with open(path, 'r', encoding='utf-8') as f:
+        entries = [json.loads(line) for line in f]
+    for entry, moment in zip(entries, times):
+        entry['committed_at'] = moment
+    with open(path, 'w', encoding='utf-8') as f:
+        f.writelines(json.dumps(entry, ensure_ascii=False) + '\n' for entry in entries)
+
+
+class TestCatalogManagerAsOf(unittest.TestCase):
+    """Test suite for CatalogManager.as_of() time-travel views."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([make_product("A", 100, category="Sightseeing"), make_product("B", 200, category="Sightseeing")])
+        self.first = self.manager.generation
+        self.manager.upsert_batch([make_product("A", 120, category="Sightseeing"), make_product("C", 50, category="Family")])
+        self.second = self.manager.generation
+        self.manager.delete(["B"])
+        self.manager.patch_where({"product_id": "C"}, {"category": "Sightseeing"})
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_views_by_generation(self):
+        """Test get, count and query against past generations."""
+        first = self.manager.as_of(generation=self.first)
+        self.assertEqual(first.get("A")["pricing"][0]["price_aed"], 100)
+        self.assertIsNone(first.get("C"))
+        self.assertEqual(first.count(), 2)
+
+        second = self.manager.as_of(generation=self.second)
+        self.assertEqual(second.get("B")["product_id"], "B")
+        result = second.query(where={"category": "Sightseeing", "price": {"gte": 100}}, order_by=["price"])
+        self.assertEqual([p["product_id"] for p in result["items"]], ["A", "B"])
+        self.assertEqual(second.query(where={"category": "Family"})["total"], 1)
+
+        self.assertIsNone(self.manager.get("B"))
+        self.assertEqual(self.manager.by_category("Family"), [])
+
+    def test_views_are_cached(self):
+        """Test that a repeated lookup returns the cached view."""
+        view = self.manager.as_of(generation=self.first)
+        self.assertIs(self.manager.as_of(generation=self.first), view)
+        self.assertEqual(CatalogManager(db_path=self.db_path).as_of(generation=self.first).get("A")["pricing"][0]["price_aed"], 100)
+
+    def test_views_by_timestamp(self):
+        """Test that a timestamp resolves to the last batch committed by then."""
+        rewrite_times(self.manager.undo.path, [1000, 2000, 3000, 4000])
+        self.assertEqual(self.manager.as_of("1970-01-01T00:40:00Z").get("A")["pricing"][0]["price_aed"], 120)
+        self.assertEqual(self.manager.as_of(1500).generation, self.first)
+        self.assertIsNotNone(self.manager.as_of(3500).get("C"))
+        self.assertIsNone(self.manager.as_of(3500).get("B"))
+        with self.assertRaises(ValueError):
+            self.manager.as_of(999)
+
+    def test_out_of_range(self):
+        """Test that unknown generations and bad arguments are rejected."""
+        with self.assertRaises(ValueError):
+            self.manager.as_of(generation=self.manager.generation + 1)
+        with self.assertRaises(ValueError):
+            self.manager.as_of()
+        with self.assertRaises(ValueError):
+            self.manager.as_of(1000, generation=1)
+
+    def test_external_rewrite_stops_history(self):
+        """Test that history across a hand edit is refused, not invented."""
+        with open(self.db_path, 'r', encoding='utf-8') as f:
+            products = json.load(f)
+        products[0]['product_name'] = 'Edited by hand'
+        with open(self.db_path, 'w', encoding='utf-8') as f:
+            json.dump(products, f)
+        with self.assertRaises(ValueError):
+            CatalogManager(db_path=self.db_path).as_of(generation=self.first)
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import sys
+import json
+import tempfile
+import shutil
+from pathlib import Path
+from unittest.mock import patch
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager
+from backend.lib.undo_log import UndoLog, record_hash
+from helpers import make_product
+
+
+class TestUndoLog(unittest.TestCase):
+    """Test suite for the batch undo log file."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.log = UndoLog(os.path.join(self.temp_dir, 'products.json.undo'))
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_find_plan_and_prune(self):
+        """Test lookup by id, conflict planning and pruning by age."""
+        a1, a2, b = make_product("A"), make_product("A", 120), make_product("B")
+        self.log.append("first", 1, {"A": (None, a1)}, committed_at=100)
+        self.log.append("second", 2, {"A": (a1, a2), "B": (None, b)}, committed_at=200)
+        with open(self.log.path, 'ab') as f:
+            f.write(b'{"batch": "torn"')
+
+        entry = self.log.find("second")
+        self.assertEqual([r[0] for r in entry["records"]], ["A", "B"])
+        self.assertIsNone(self.log.find("sec"))
+        self.assertIsNone(self.log.find("torn"))
+        self.assertEqual([s["batch"] for s in self.log.batches()], ["second", "first"])
+
+        changes, conflicts = UndoLog.plan(entry, {"A": a2, "B": make_product("B", 90)})
+        self.assertEqual(changes, {"A": (a2, a1)})
+        self.assertEqual(conflicts, ["B"])
+
+        self.log.prune(150)
+        self.assertEqual([s["batch"] for s in self.log.batches()], ["second"])
+        self.assertEqual(record_hash(dict(reversed(list(a1.items())))), record_hash(a1))
+
+
+class TestCatalogManagerRollback(unittest.TestCase):
+    """Test suite for CatalogManager.rollback()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([make_product("A", 100), make_product("B", 200)], batch_id="initial")
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_rollback_restores_only_the_batch(self):
+        """Test that a bad batch is undone while later unrelated edits survive."""
+        self.manager.upsert_batch([make_product("A", 1), make_product("C", 5)])
+        bad = self.manager.last_batch_id
+        self.manager.upsert_batch([make_product("B", 250)])
+
+        result = self.manager.rollback(bad)
+        self.assertEqual(result["restored"], ["A", "C"])
+        self.assertEqual(result["conflicts"], [])
+        self.assertEqual(self.manager.get("A")["pricing"][0]["price_aed"], 100)
+        self.assertIsNone(self.manager.get("C"))
+        self.assertEqual(self.manager.get("B")["pricing"][0]["price_aed"], 250)
+        self.assertEqual(self.manager.count(), 2)
+
+        undo = CatalogManager(db_path=self.db_path).rollback(result["rollback_batch"])
+        self.assertEqual(undo["restored"], ["A", "C"])
+        self.assertEqual(self.manager.get("C")["pricing"][0]["price_aed"], 5)
+
+    def test_conflicts_block_unless_skipped(self):
+        """Test that products modified after the batch are reported, not overwritten."""
+        self.manager.upsert_batch([make_product("A", 1), make_product("B", 2)], batch_id="bad")
+        self.manager.upsert_batch([{"product_id": "B", "product_name": "Fixed by hand"}])
+        self.manager.delete(["A"])
+        generation = self.manager.generation
+
+        result = self.manager.rollback("bad")
+        self.assertEqual((result["restored"], result["conflicts"]), ([], ["A", "B"]))
+        self.assertEqual(self.manager.generation, generation)
+
+        self.manager.upsert_batch([make_product("A", 1)])
+        result = self.manager.rollback("bad", skip_conflicts=True, dry_run=True)
+        self.assertEqual((result["restored"], result["conflicts"]), (["A"], ["B"]))
+        self.assertEqual(self.manager.get("A")["pricing"][0]["price_aed"], 1)
+        self.manager.rollback("bad", skip_conflicts=True)
+        self.assertEqual(self.manager.get("A")["pricing"][0]["price_aed"], 100)
+        self.assertEqual(self.manager.get("B")["product_name"], "Fixed by hand")
+
+    def test_rollback_delete(self):
+        """Test that deletes are logged and can be rolled back."""
+        self.manager.delete(["B"])
+        batch = self.manager.undo.batches(limit=1)[0]["batch"]
+        self.assertEqual(self.manager.rollback(batch)["restored"], ["B"])
+        self.assertEqual(self.manager.get("B")["pricing"][0]["price_aed"], 200)
+
+    def test_failed_save_is_not_logged(self):
+        """Test that a commit whose snapshot write fails leaves no undo entry."""
+        generation = self.manager.generation
+        with patch.object(CatalogManager, '_save_data', side_effect=OSError("disk full")):
+            with self.assertRaises(OSError):
+                self.manager.upsert_batch([make_product("A", 1)], batch_id="failed")
+        self.assertIsNone(self.manager.undo.find("failed"))
+        self.assertNotIn(generation + 1, [entry["generation"] for entry in self.manager.undo.batches()])
+        self.manager.upsert_batch([make_product("A", 1)])
+        self.assertEqual(self.manager.undo.batches(limit=1)[0]["generation"], generation + 1)
+
+    def test_unknown_batch(self):
+        """Test that an unknown batch id is rejected."""
+        with self.assertRaises(ValueError):
+            self.manager.rollback("nope")
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)
@@ -0,0 +1,127 @@
+#!/usr/bin/env python3
+
+import unittest
+import os
+import random
+import sys
+import tempfile
+import shutil
+from datetime import date, timedelta
+from pathlib import Path
+
+project_root = Path(__file__).resolve().parent.parent.parent
+sys.path.insert(0, str(project_root / 'src'))
+
+from backend.lib.catalog_manager import CatalogManager, PricingTier, ValidationError
+from backend.lib.validity_index import ValidityIndex
+from helpers import make_product, tiers
+
+
+def valid_between(*windows):
+    """One tier per ``(validity_start, validity_end)`` pair in ``windows``."""
+    return [dict(tier, validity_start=start, validity_end=end)
+            for tier, (start, end) in zip(tiers(*[100] * len(windows)), windows)]
+
+
+class TestPricingTierDates(unittest.TestCase):
+    """Test suite for validity date validation at write time."""
+
+    def test_accepts_iso_dates_and_open_ends(self):
+        """Test that ISO dates and missing bounds are accepted."""
+        tier = PricingTier(tier_name="Adult", price_aed=10, validity_start="2025-12-12", validity_end=None)
+        self.assertEqual(tier.validity_start, "2025-12-12")
+
+    def test_rejects_malformed_dates(self):
+        """Test that non-ISO dates are rejected."""
+        with self.assertRaises(ValidationError):
+            PricingTier(tier_name="Adult", price_aed=10, validity_start="31/12/2026")
+
+    def test_rejects_inverted_window(self):
+        """Test that validity_end before validity_start is rejected."""
+        with self.assertRaises(ValidationError):
+            PricingTier(tier_name="Adult", price_aed=10, validity_start="2026-02-01", validity_end="2026-01-01")
+
+
+class TestValidityIndex(unittest.TestCase):
+    """Test suite for the validity interval index."""
+
+    def test_matches_linear_scan(self):
+        """Test stabbing queries against a brute-force scan over random windows."""
+        rng = random.Random(3)
+        base = date(2025, 1, 1)
+        products = []
+        for i in range(200):
+            windows = []
+            for _ in range(rng.randint(1, 3)):
+                start = base + timedelta(days=rng.randint(0, 700))
+                end = start + timedelta(days=rng.randint(0, 200))
+                windows.append((
+                    None if rng.random() < 0.1 else start.isoformat(),
+                    None if rng.random() < 0.1 else end.isoformat(),
+                ))
+            products.append(make_product(f"P{i}", pricing=valid_between(*windows)))
+
+        index = ValidityIndex()
+        index.build(products)
+        for p in products[:50]:
+            index.remove(p)
+            index.add(p)
+
+        for offset in range(-30, 960, 17):
+            day = base + timedelta(days=offset)
+            expected = {
+                p["product_id"] for p in products
+                if any((t["validity_start"] or "0000") <= day.isoformat() <= (t["validity_end"] or "9999")
+                       for t in p["pricing"])
+            }
+            self.assertEqual(index.products_on(day), expected, day)
+
+    def test_valid_tiers(self):
+        """Test that per-tier lookups return the indexes of matching tiers."""
+        index = ValidityIndex()
+        index.add(make_product("A", pricing=valid_between(("2026-01-01", "2026-03-31"), ("2026-04-01", None))))
+        self.assertEqual(index.valid_tiers("A", "2026-02-14"), [0])
+        self.assertEqual(index.valid_tiers("A", date(2030, 1, 1)), [1])
+        self.assertEqual(index.valid_tiers("A", "2025-12-31"), [])
+
+
+class TestAvailableOn(unittest.TestCase):
+    """Test suite for CatalogManager.available_on()."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.temp_dir, 'products.json')
+        self.manager = CatalogManager(db_path=self.db_path)
+        self.manager.upsert_batch([
+            make_product("Winter", pricing=valid_between(("2025-11-01", "2026-03-31")), category="Adventure"),
+            make_product("AllYear", pricing=valid_between((None, None))),
+            make_product("Summer", pricing=valid_between(("2026-06-01", "2026-08-31")), category="Adventure"),
+        ])
+
+    def tearDown(self):
+        if os.path.exists(self.temp_dir):
+            shutil.rmtree(self.temp_dir)
+
+    def test_returns_sellable_products(self):
+        """Test that only products with a valid tier on the date are returned."""
+        ids = [p["product_id"] for p in self.manager.available_on("2026-01-15")]
+        self.assertEqual(ids, ["AllYear", "Winter"])
+
+    def test_inactive_products_are_opt_in(self):
+        """Test that inactive products are left out unless asked for."""
+        self.manager.upsert_batch([{"product_id": "Winter", "active": False}])
+        self.assertEqual([p["product_id"] for p in self.manager.available_on("2026-01-15")], ["AllYear"])
+        ids = [p["product_id"] for p in self.manager.available_on("2026-01-15", include_inactive=True)]
+        self.assertEqual(ids, ["AllYear", "Winter"])
+
+    def test_applies_filters_and_follows_upserts(self):
+        """Test filters and that re-dated tiers move between dates."""
+        result = self.manager.available_on("2026-07-01", filters={"category": "Adventure"}, fields=["product_name"])
+        self.assertEqual(result, [{"product_id": "Summer", "product_name": "Summer"}])
+
+        self.manager.upsert_batch([make_product("Summer", pricing=valid_between(("2027-06-01", "2027-08-31")))])
+        self.assertEqual([p["product_id"] for p in self.manager.available_on("2026-07-01")], ["AllYear"])
+
+
+if __name__ == '__main__':
+    unittest.main(verbosity=2)